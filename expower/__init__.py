@@ -2,7 +2,23 @@
 Imports:
     .bulbs.Bulb
     .bulbs.BulbDevice
+    .bulbs.AsyncBulb
+    .bulbs.AsyncBulbDevice
+    .bulbs.BulbGroup
+    .bulbs.BulbResult
+    .bulbs.Poller
+    .bulbs.Transaction
+    .bulbs.StateCache
+    .bulbs.State
+    .bulbs.DeviceHealth
+    .bulbs.CircuitOpenError
+    .bulbs.CommandQueue
+    .bulbs.QueueFullError
+    .bulbs.Subscription
     .constants.*
+    .discovery.Discovery
+    .discovery.DeviceRegistry
+    .discovery.DiscoveredDevice
     .schemas.BaseSchema
     .schemas.schemas.*
     .utils.*
@@ -10,7 +26,23 @@ Imports:
 
 from .bulbs import Bulb
 from .bulbs import BulbDevice
+from .bulbs import AsyncBulb
+from .bulbs import AsyncBulbDevice
+from .bulbs import BulbGroup
+from .bulbs import BulbResult
+from .bulbs import Poller
+from .bulbs import Transaction
+from .bulbs import StateCache
+from .bulbs import State
+from .bulbs import DeviceHealth
+from .bulbs import CircuitOpenError
+from .bulbs import CommandQueue
+from .bulbs import QueueFullError
+from .bulbs import Subscription
 from .constants import *
+from .discovery import Discovery
+from .discovery import DeviceRegistry
+from .discovery import DiscoveredDevice
 from .schemas import BaseSchema
 from .schemas.schemas import *
 from .utils import *
@@ -0,0 +1,21 @@
+from . import AsyncBulbDevice
+from . import Bulb
+
+"""
+Imports:
+    .AsyncBulbDevice
+    .Bulb
+
+Contains:
+    <AsyncBulb>
+"""
+
+class AsyncBulb(Bulb):
+    """
+    asyncio counterpart to <Bulb>
+
+    Every method (including the generated set_{colour} helpers)
+    ... returns an awaitable, except ping
+    """
+
+    _device_class = AsyncBulbDevice
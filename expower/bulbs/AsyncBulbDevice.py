@@ -0,0 +1,594 @@
+from .. import pytuya
+from .. import constants
+from . import BulbDevice
+from . import Transaction
+import asyncio
+import time
+
+"""
+Imports:
+    ..pytuya
+    ..constants
+    .BulbDevice
+    .Transaction
+    asyncio
+    time
+
+Contains:
+    <AsyncBulbDevice>
+"""
+
+class AsyncBulbDevice(object):
+    """
+    asyncio counterpart to <BulbDevice>
+
+    Runs the very same operations as <BulbDevice> (so payloads are
+    ... generated and responses decoded by the same code), but sends
+    ... them over a connection opened with asyncio.open_connection
+
+    Every method accepts a keyword-only {timeout} (seconds) which
+    ... bounds the whole call, defaulting to self.timeout
+    """
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        """
+        Initialise <BulbDevice> and self
+
+        :param *args - *args to be passed to <BulbDevice>.__init__
+        :param(float) timeout - Default per-call timeout (seconds)
+            ... Defaults to the <BulbDevice>'s connection_timeout
+        :param **kwargs - **kwargs to be passed to <BulbDevice>.__init__
+
+        :returns - None
+        """
+
+        self.BulbDevice = BulbDevice(*args, **kwargs)
+
+        if timeout is None:
+            timeout = self.BulbDevice.connection_timeout
+
+        self.timeout = timeout
+
+        self._connection = None
+        self._heartbeat = None
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <class_name(tcp://host:port)[device_id=...,local_key=...]>
+        """
+
+        data = \
+        (
+            '<'
+                f'{self.__class__.__name__}'
+                '('
+                    f'{self.protocol}://{self.host}:{self.port}'
+                ')'
+                '['
+                    f'device_id={self.device_id},'
+                    f'local_key={self.local_key.decode()}'
+                ']'
+            '>'
+        )
+
+        return data
+
+    @property
+    def device_id(self):
+        """
+        The Bulb's device ID, from self.BulbDevice
+        """
+
+        return self.BulbDevice.device_id
+
+    @property
+    def local_key(self):
+        """
+        The Bulb's local key (bytes), from self.BulbDevice
+        """
+
+        return self.BulbDevice.local_key
+
+    @property
+    def protocol(self):
+        """
+        The protocol spoken to the Bulb, from self.BulbDevice
+        """
+
+        return self.BulbDevice.protocol
+
+    @property
+    def host(self):
+        """
+        The Bulb's IP address, read from self.BulbDevice so it follows
+        ... the Bulb when it moves
+        """
+
+        return self.BulbDevice.host
+
+    @host.setter
+    def host(self, host):
+        """
+        Point self at the Bulb's new {host}
+        """
+
+        self.move(host)
+
+    @property
+    def port(self):
+        """
+        The Bulb's port, read from self.BulbDevice
+        """
+
+        return self.BulbDevice.port
+
+    @port.setter
+    def port(self, port):
+        """
+        Point self at the Bulb's new {port}
+        """
+
+        self.BulbDevice.port = port
+
+    async def __aenter__(self):
+        """
+        Enter an 'async with' block
+        """
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """
+        Exit an 'async with' block, closing the connection
+        """
+
+        await self.close()
+
+    async def close(self):
+        """
+        Close the connection to the Bulb, if open
+        """
+
+        if self._heartbeat is not None \
+                and self._heartbeat is not asyncio.current_task():
+            self._heartbeat.cancel()
+
+            self._heartbeat = None
+
+        if self._connection is not None:
+            await self._connection.close()
+
+    def move(self, address):
+        """
+        Point self at the Bulb's new {address}, e.g. after a DHCP change
+
+        The connection to the old address is replaced on the next call
+
+        :param(str) address - The Bulb's new IP address
+
+        :returns - None
+        """
+
+        self.BulbDevice.move(address)
+
+    async def get_brightness(self, state=None, *, timeout=None):
+        """
+        Async self.BulbDevice.get_brightness
+        """
+
+        return await self._execute(self.BulbDevice._get_brightness(state), timeout)
+
+    async def get_colour(self, state=None, *, timeout=None):
+        """
+        Async self.BulbDevice.get_colour
+        """
+
+        return await self._execute(self.BulbDevice._get_colour(state), timeout)
+
+    async def get_temperature(self, state=None, *, timeout=None):
+        """
+        Async self.BulbDevice.get_temperature
+        """
+
+        return await self._execute(self.BulbDevice._get_temperature(state), timeout)
+
+    async def set_colour(self, r=None, g=None, b=None, *, timeout=None):
+        """
+        Async self.BulbDevice.set_colour
+        """
+
+        return await self._execute(self.BulbDevice._set_colour(r, g, b), timeout)
+
+    async def set_temperature(self, temperature, *, timeout=None):
+        """
+        Async self.BulbDevice.set_temperature
+        """
+
+        return await self._execute(self.BulbDevice._set_temperature(temperature), timeout)
+
+    async def set_brightness(self, brightness, *, timeout=None):
+        """
+        Async self.BulbDevice.set_brightness
+        """
+
+        return await self._execute(self.BulbDevice._set_brightness(brightness), timeout)
+
+    async def set_white(self, brightness=None, temperature=None, *, timeout=None):
+        """
+        Async self.BulbDevice.set_white
+        """
+
+        return await self._execute \
+        (
+            self.BulbDevice._set_white(brightness, temperature),
+            timeout,
+        )
+
+    async def set_scene(self, scene=0, *, timeout=None):
+        """
+        Async self.BulbDevice.set_scene
+        """
+
+        return await self._execute(self.BulbDevice._set_scene(scene), timeout)
+
+    def transaction(self):
+        """
+        Start a <Transaction> which sends many changes as one SET
+
+        :returns(Transaction) - Commits on leaving an 'async with' block
+
+        E.g:
+            >>> async with bulb.transaction() as transaction:
+            ...     transaction.turn_on().set_colour(0, 255, 255)
+        """
+
+        return Transaction(self.BulbDevice, self._execute)
+
+    batch = transaction
+
+    async def turn_on(self, switch=1, *, timeout=None):
+        """
+        Async self.BulbDevice.turn_on
+        """
+
+        return await self._execute(self.BulbDevice._set_status(True, switch), timeout)
+
+    async def turn_off(self, switch=1, *, timeout=None):
+        """
+        Async self.BulbDevice.turn_off
+        """
+
+        return await self._execute(self.BulbDevice._set_status(False, switch), timeout)
+
+    async def state(self, *, timeout=None):
+        """
+        Async self.BulbDevice.state
+        """
+
+        return await self._execute(self.BulbDevice._state(), timeout)
+
+    async def schema(self, *, timeout=None):
+        """
+        Async self.BulbDevice.schema
+        """
+
+        return await self._execute(self.BulbDevice._schema(), timeout)
+
+    async def status(self, *, timeout=None):
+        """
+        Async self.BulbDevice.status
+        """
+
+        return await self._execute(self.BulbDevice._status(), timeout)
+
+    async def refresh(self, *, timeout=None):
+        """
+        Async self.BulbDevice.refresh
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        status = await asyncio.wait_for \
+        (
+            self._request(pytuya.STATUS, cached=False),
+            timeout,
+        )
+
+        return self.BulbDevice._format_status(status)
+
+    async def subscribe \
+            (
+                self,
+                callback,
+                heartbeat_interval = constants.networking.HEARTBEAT_INTERVAL,
+                *,
+                timeout = None,
+            ):
+        """
+        Async self.BulbDevice.subscribe
+
+        The Bulb pushes its changes down self's own connection, which is
+        ... kept open by a heartbeat task while there are subscriptions
+
+        :returns(Subscription) - Close it to unsubscribe
+        """
+
+        subscription = self.BulbDevice._subscribe(callback)
+
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.ensure_future \
+            (
+                self._send_heartbeats(heartbeat_interval)
+            )
+
+        try:
+            await self.refresh(timeout = timeout) # Opens the connection
+        except BaseException:
+            subscription.close()
+
+            raise
+
+        return subscription
+
+    async def watch \
+            (
+                self,
+                heartbeat_interval = constants.networking.HEARTBEAT_INTERVAL,
+                *,
+                timeout = None,
+            ):
+        """
+        Iterate over the Bulb's state changes as they happen
+
+        :yields(dict) - Just the state fields which changed
+
+        E.g:
+            >>> async for changes in bulb.watch():
+            ...     print(changes)
+            {'on': False}
+        """
+
+        changes: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        def put(change):
+            """
+            Nested callback to queue {change}, from any thread
+
+            Level: watch.put
+            """
+
+            loop.call_soon_threadsafe(changes.put_nowait, change)
+
+        subscription = await self.subscribe(put, heartbeat_interval, timeout = timeout)
+
+        try:
+            while True:
+                yield await changes.get()
+        finally:
+            subscription.close()
+
+    async def edit_soft \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colour = None,
+                *,
+                timeout = None,
+            ):
+        """
+        Async self.BulbDevice.edit_soft
+        """
+
+        return await self._execute \
+        (
+            self.BulbDevice._edit_soft(saturation, brightness, speed, colour),
+            timeout,
+        )
+
+    async def edit_colourful \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colours = (),
+                *,
+                timeout = None,
+            ):
+        """
+        Async self.BulbDevice.edit_colourful
+        """
+
+        return await self._execute \
+        (
+            self.BulbDevice._edit_colourful(saturation, brightness, speed, colours),
+            timeout,
+        )
+
+    async def edit_exciting \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colour = None,
+                *,
+                timeout = None,
+            ):
+        """
+        Async self.BulbDevice.edit_exciting
+        """
+
+        return await self._execute \
+        (
+            self.BulbDevice._edit_exciting(saturation, brightness, speed, colour),
+            timeout,
+        )
+
+    async def edit_wonderful \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colours = (),
+                *,
+                timeout = None,
+            ):
+        """
+        Async self.BulbDevice.edit_wonderful
+        """
+
+        return await self._execute \
+        (
+            self.BulbDevice._edit_wonderful(saturation, brightness, speed, colours),
+            timeout,
+        )
+
+    async def _execute(self, operation, timeout=None):
+        """
+        Run {operation} to completion, awaiting each request it yields
+
+        :param(generator) operation - A <BulbDevice> operation
+        :param(float) timeout - Time limit for the whole operation
+            ... Defaults to self.timeout
+
+        :returns - Return value of {operation}
+
+        Raises asyncio.TimeoutError if {timeout} elapses
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        return await asyncio.wait_for(self._run(operation), timeout)
+
+    async def _run(self, operation):
+        """
+        Async equivalent of <BulbDevice>._execute
+        """
+
+        response = None
+
+        try:
+            while True:
+                try:
+                    command, data = operation.send(response)
+                except StopIteration as stop:
+                    return stop.value
+
+                response = await self._request(command, data)
+        finally:
+            operation.close()
+
+    async def _request(self, command, data=None, cached=True):
+        """
+        Async equivalent of <BulbDevice>._request
+        """
+
+        if cached:
+            response = self.BulbDevice._cached_response(command)
+
+            if response is not None:
+                return response
+
+        if command != pytuya.STATUS:
+            return await self._send_request(command, data)
+
+        return await self.BulbDevice.flights.run_async \
+        (
+            (command, self.BulbDevice.cache.generation),
+            lambda: self._send_request(command, data),
+        )
+
+    async def _send_request(self, command, data=None):
+        """
+        Async equivalent of <BulbDevice>._send_request
+        """
+
+        generation = self.BulbDevice.cache.generation
+
+        payload = self.BulbDevice.generate_payload(command, data)
+
+        response = await self._send_receive(payload)
+
+        return self.BulbDevice._handle_response(command, data, response, generation)
+
+    async def _send_heartbeats(self, interval):
+        """
+        Send a heartbeat every {interval} seconds while there are
+        ... subscriptions, keeping the connection (and pushes) alive
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+
+            if not self.BulbDevice._subscriptions:
+                break
+
+            try:
+                await asyncio.wait_for \
+                (
+                    self._request(pytuya.HEARTBEAT, cached=False),
+                    self.timeout,
+                )
+            except Exception:
+                pass # The connection is reopened on the next heartbeat
+
+    async def _send_receive(self, payload):
+        """
+        Async equivalent of <BulbDevice>._send_receive
+
+        :returns(bytes) - Success: Bulb response
+            ... Failure: None (the connection kept getting reset)
+        """
+
+        health = self.BulbDevice.health
+
+        health.check()
+
+        if self._connection is not None \
+                and self._connection.address != self.BulbDevice.address:
+            await self._connection.close() # The Bulb has moved, keep the heartbeat
+
+            self._connection = None
+
+        if self._connection is None:
+            self._connection = pytuya.AsyncConnection \
+            (
+                self.BulbDevice.address,
+                self.BulbDevice.port,
+                on_unsolicited = self.BulbDevice._unsolicited,
+                rtt = self.BulbDevice.rtt,
+                connect_rtt = self.BulbDevice.connect_rtt,
+            )
+
+        start = time.perf_counter()
+
+        try:
+            response = await self._connection.send_receive \
+            (
+                payload,
+                retry_policy = self.BulbDevice.retry_policy,
+                timeout = self.BulbDevice._read_timeout(),
+                connect_timeout = self.BulbDevice._connect_timeout(),
+                hedge_policy = self.BulbDevice.hedge_policy,
+            )
+        except ConnectionResetError:
+            health.record_failure()
+
+            return None
+        except BaseException:
+            health.record_failure() # Including being cancelled, or a half open trial never ends
+
+            raise
+
+        health.record_success(time.perf_counter() - start)
+
+        return response
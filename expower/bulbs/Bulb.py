@@ -20,6 +20,8 @@ class Bulb(object):
     ... the class neat and tidy
     """
 
+    _device_class = BulbDevice
+
     def __init__(self, *args, **kwargs):
         """
         Initialise <BulbDevice> and self
@@ -30,7 +32,7 @@ class Bulb(object):
         :returns None
         """
 
-        self.BulbDevice = BulbDevice(*args, **kwargs)
+        self.BulbDevice = self._device_class(*args, **kwargs)
 
         for colour_name, colour_rgb in constants.rgb_colours.RGB_COLOURS.items():
             func_name = f'set_{colour_name}'
@@ -109,13 +111,16 @@ class Bulb(object):
             dst = self,
             attrs = \
             (
+                'batch',
+                'close',
+                'command_queue',
                 'device_id',
                 'get_brightness',
                 'get_colour',
                 'get_temperature',
-                'host',
                 'local_key',
-                'port',
+                'move',
+                'refresh',
                 'set_brightness',
                 'set_colour',
                 'set_temperature',
@@ -124,8 +129,11 @@ class Bulb(object):
                 'state',
                 'status',
                 'schema',
+                'subscribe',
                 'turn_on',
+                'transaction',
                 'turn_off',
+                'watch',
                 'edit_soft',
                 'edit_colourful',
                 'edit_wonderful',
@@ -140,12 +148,49 @@ class Bulb(object):
 
         return self._super().__repr__()
 
-    def ping(self):
+    @property
+    def host(self):
+        """
+        The Bulb's IP address, read from self.BulbDevice so it follows
+        ... the Bulb when it moves
+        """
+
+        return self._super().host
+
+    @host.setter
+    def host(self, host):
+        """
+        Point self at the Bulb's new {host}
+        """
+
+        self._super().move(host)
+
+    @property
+    def port(self):
+        """
+        The Bulb's port, read from self.BulbDevice
+        """
+
+        return self._super().port
+
+    @port.setter
+    def port(self, port):
+        """
+        Point self at the Bulb's new {port}
+        """
+
+        self._super().port = port
+
+    def ping(self, timeout=constants.networking.PROBE_TIMEOUT):
         """
         Ping port 6668 on the Bulb
+
+        :param(float) timeout - Seconds to wait for the connection
+
+        :returns(bool) - Whether the Bulb accepts a connection
         """
 
-        return utils.ping(self.host, self.port)
+        return utils.ping(self.host, self.port, timeout)
 
     def _super(self):
         """
@@ -1,19 +1,45 @@
 from .. import pytuya
 from .. import constants
+from .. import codec
 from .. import utils
-from . import decorators
+from . import Transaction
+from . import StateCache
+from . import State
+from . import DeviceHealth
+from . import CommandQueue
+from . import SingleFlight
+from . import Subscription
+from . import Watcher
+import logging
+import queue
+import threading
+import time
 
 """
 Imports:
     ..pytuya
     ..constants
+    ..codec
     ..utils
-    .decorators
+    .Transaction
+    .StateCache
+    .State
+    .DeviceHealth
+    .CommandQueue
+    .SingleFlight
+    .Subscription
+    .Watcher
+    logging
+    queue
+    threading
+    time
 
 Contains:
     <BulbDevice>
 """
 
+log = logging.getLogger(__name__)
+
 class BulbDevice(pytuya.BulbDevice):
     """
     Inherits from pytuya.BulbDevice
@@ -21,23 +47,72 @@ class BulbDevice(pytuya.BulbDevice):
     Tailored to Expower Bulbs, with some improvements
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__ \
+            (
+                self,
+                *args,
+                cache_ttl = 0,
+                stale_while_revalidate = False,
+                health = None,
+                **kwargs,
+            ):
         """
         Initialise self and super
 
         :param *args - *args to be passed to <pytuya.BulbDevice>.__init__
-        :param *args - *args to be passed to <pytuya.BulbDevice>.__init__
+        :param(float) cache_ttl - Seconds to cache the Bulb's status for
+            ... 0 (the default) reads it afresh every time
+        :param(bool) stale_while_revalidate - Serve an expired cached
+            ... status while refreshing it in the background
+        :param(DeviceHealth) health - Tracks the Bulb's health and
+            ... fails requests fast while it is down
+            ... Defaults to a <DeviceHealth> probing the Bulb with utils.ping
+        :param **kwargs - **kwargs to be passed to <pytuya.BulbDevice>.__init__
+            ... retry_policy defaults to MAX_CONNECTION_ATTEMPTS attempts
+            ... with exponential backoff, within RETRY_DEADLINE seconds
 
         :returns - None
         """
 
         self._init_attrs()
 
+        kwargs.setdefault \
+        (
+            'connection_attempts',
+            constants.networking.MAX_CONNECTION_ATTEMPTS,
+        )
+
+        if kwargs.get('retry_policy') is None:
+            kwargs['retry_policy'] = pytuya.RetryPolicy \
+            (
+                attempts = kwargs['connection_attempts'],
+                backoff = constants.networking.RETRY_BACKOFF,
+                max_backoff = constants.networking.RETRY_MAX_BACKOFF,
+                deadline = constants.networking.RETRY_DEADLINE,
+            )
+
         super().__init__(*args, **kwargs)
 
         self.host = self.address
         self.device_id = self.id
 
+        self.cache = StateCache(cache_ttl, stale_while_revalidate)
+
+        if health is None:
+            health = DeviceHealth(probe = self._probe)
+
+        self.health = health
+
+        self.flights = SingleFlight()
+
+        self._command_queue = None
+        self._command_queue_lock = threading.Lock()
+
+        self._subscriptions = []
+        self._published = None
+        self._watcher = None
+        self._subscriptions_lock = threading.Lock()
+
     def __repr__(self):
         """
         Returns a string representation of the object
@@ -75,8 +150,15 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This value is only used by 'white' mode
         """
 
+        return self._execute(self._get_brightness(state))
+
+    def _get_brightness(self, state=None):
+        """
+        Operation behind self.get_brightness
+        """
+
         if state is None:
-            state = self.state()
+            state = yield from self._state()
 
         brightness = state.get(constants.state_keys.BRIGHTNESS, None)
 
@@ -96,8 +178,15 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This value is only used by 'colour' mode
         """
 
+        return self._execute(self._get_colour(state))
+
+    def _get_colour(self, state=None):
+        """
+        Operation behind self.get_colour
+        """
+
         if state is None:
-            state = self.state()
+            state = yield from self._state()
 
         colour = state.get(constants.state_keys.COLOUR, None)
 
@@ -118,8 +207,15 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This is NOT temperature as in heat
         """
 
+        return self._execute(self._get_temperature(state))
+
+    def _get_temperature(self, state=None):
+        """
+        Operation behind self.get_temperature
+        """
+
         if state is None:
-            state = self.state()
+            state = yield from self._state()
 
         temperature = state.get(constants.state_keys.TEMPERATURE, None)
 
@@ -145,6 +241,13 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This value is only used by 'colour' mode
         """
 
+        return self._execute(self._set_colour(r, g, b))
+
+    def _set_colour(self, r=None, g=None, b=None):
+        """
+        Operation behind self.set_colour
+        """
+
         if isinstance(r, tuple) or isinstance(r, list):
             r, g, b, *_ = r
 
@@ -153,7 +256,7 @@ class BulbDevice(pytuya.BulbDevice):
         if any(colour is None for colour in rgb):
             return
 
-        return super().set_colour(*rgb)
+        return (yield (pytuya.SET, self._colour_dps(*rgb)))
 
     def set_temperature(self, temperature):
         """
@@ -167,7 +270,14 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This is NOT temperature as in heat
         """
 
-        return super().set_colourtemp(temperature)
+        return self._execute(self._set_temperature(temperature))
+
+    def _set_temperature(self, temperature):
+        """
+        Operation behind self.set_temperature
+        """
+
+        return (yield (pytuya.SET, self._colourtemp_dps(temperature)))
 
     def set_brightness(self, brightness):
         """
@@ -180,7 +290,14 @@ class BulbDevice(pytuya.BulbDevice):
         Note: This value is only used by 'white' mode
         """
 
-        return super().set_brightness(brightness)
+        return self._execute(self._set_brightness(brightness))
+
+    def _set_brightness(self, brightness):
+        """
+        Operation behind self.set_brightness
+        """
+
+        return (yield (pytuya.SET, self._brightness_dps(brightness)))
 
     def set_white(self, brightness=None, temperature=None):
         """
@@ -192,14 +309,21 @@ class BulbDevice(pytuya.BulbDevice):
         :returns(bytes) - Bulb response
         """
 
-        state = self.state()
+        return self._execute(self._set_white(brightness, temperature))
+
+    def _set_white(self, brightness=None, temperature=None):
+        """
+        Operation behind self.set_white
+        """
+
+        state = yield from self._state()
 
         if brightness is None:
             brightness = state[constants.state_keys.BRIGHTNESS]
         if temperature is None:
             temperature = state[constants.state_keys.TEMPERATURE]
 
-        return super().set_white(brightness, temperature)
+        return (yield (pytuya.SET, self._white_dps(brightness, temperature)))
 
     def set_scene(self, scene=0):
         """
@@ -210,6 +334,13 @@ class BulbDevice(pytuya.BulbDevice):
         :returns(bytes) - Bulb response
         """
 
+        return self._execute(self._set_scene(scene))
+
+    def _set_scene(self, scene=0):
+        """
+        Operation behind self.set_scene
+        """
+
         if scene < 0 or scene > 4:
             return
 
@@ -218,7 +349,7 @@ class BulbDevice(pytuya.BulbDevice):
         if scene > 0:
             scene_id += f'_{scene}'
 
-        payload = self.generate_payload \
+        data = yield \
         (
             pytuya.SET,
             {
@@ -226,17 +357,61 @@ class BulbDevice(pytuya.BulbDevice):
             }
         )
 
-        data = self._send_receive(payload)
-
         return data
 
+    def transaction(self):
+        """
+        Start a <Transaction> which sends many changes as one SET
+
+        :returns(Transaction) - Commits on leaving a 'with' block
+
+        E.g:
+            >>> with bulb.transaction() as transaction:
+            ...     transaction.turn_on().set_colour(0, 255, 255)
+        """
+
+        return Transaction(self)
+
+    batch = transaction
+
+    def turn_on(self, switch=1):
+        """
+        Turn the Bulb on
+
+        :param(int) switch - Switch to set
+
+        :returns(bytes) - Bulb response
+        """
+
+        return self._execute(self._set_status(True, switch))
+
+    def turn_off(self, switch=1):
+        """
+        Turn the Bulb off
+
+        :param(int) switch - Switch to set
+
+        :returns(bytes) - Bulb response
+        """
+
+        return self._execute(self._set_status(False, switch))
+
+    def _set_status(self, on, switch=1):
+        """
+        Operation behind self.turn_on and self.turn_off
+        """
+
+        return (yield (pytuya.SET, {str(switch): on}))
+
     def state(self):
         """
         Get the Bulb's state as (decoded) readable values
 
-        :returns(dict) - Bulb state
+        :returns(State) - Bulb state, a read-only mapping whose fields
+            ... (and scenes) are only decoded when looked up
+            ... ({} if the Bulb didn't respond)
 
-        Example output:
+        Example output (as state().to_dict()):
             {'brightness': 100,
              'colour': (50, 10, 50),
              'mode': 'white',
@@ -271,12 +446,19 @@ class BulbDevice(pytuya.BulbDevice):
              'temperature': 100}
         """
 
-        schema = self.schema()
+        return self._execute(self._state())
+
+    def _state(self):
+        """
+        Operation behind self.state
+        """
+
+        schema = yield from self._schema()
 
         if not schema:
             return {}
 
-        state = {}
+        raw = {}
 
         for state_key in constants.state_keys.STATE_KEYS:
             if state_key == constants.state_keys.SCENES:
@@ -284,41 +466,43 @@ class BulbDevice(pytuya.BulbDevice):
 
             schema_key = constants.maps.STATE_KEY_TO_SCHEMA_KEY[state_key]
 
-            value = schema.get(schema_key, None)
+            raw[state_key] = schema.get(schema_key, None)
 
-            state[state_key] = value
+        raw[constants.state_keys.SCENES] = \
+            schema.get(constants.schema_keys.FLASH_SCENES, ())
 
-        if state.get(constants.state_keys.COLOUR, None) is not None:
-            state[constants.state_keys.COLOUR] = self._hexvalue_to_rgb \
-            (
-                state[constants.state_keys.COLOUR]
-            )
-        if state.get(constants.state_keys.SCENE, None) is not None:
-            state[constants.state_keys.SCENE] = self._hexvalue_to_rgb \
-            (
-                state[constants.state_keys.SCENE]
-            )
+        decoders = \
+        {
+            constants.state_keys.COLOUR: self._hexvalue_to_rgb,
+            constants.state_keys.SCENE: self._hexvalue_to_rgb,
+            constants.state_keys.SCENES: self._scenes_state,
+        }
 
-        state[constants.state_keys.SCENES] = {}
+        return State(raw, decoders)
 
-        flash_scenes = schema.get(constants.schema_keys.FLASH_SCENES, ())
+    def _scenes_state(self, flash_scenes):
+        """
+        Wrap the raw {flash_scenes} in a <State> keyed by scene name,
+        ... so each one is only decoded when looked up
 
-        for index, flash_scene in enumerate(flash_scenes):
-            flash_scene_name = constants.schema_keys.FLASH_SCENES_LIST[index]
+        :param(list) flash_scenes - Flash scene hexvalues (schema order)
 
-            if flash_scene is not None:
-                decoder = self._map_flash_scene_to_decoder[flash_scene_name]
+        :returns(State) - Scene name -> decoded flash scene
+        """
 
-                decoded_flash_scene = decoder(flash_scene)
-            else:
-                decoded_flash_scene = None
+        raw = {}
+        decoders = {}
+
+        for index, flash_scene in enumerate(flash_scenes):
+            flash_scene_name = constants.schema_keys.FLASH_SCENES_LIST[index]
 
             scene_key = constants.maps.FLASH_SCENE_TO_SCENE[flash_scene_name]
             scene_name = constants.maps.SCENE_TO_NAME[scene_key]
 
-            state[constants.state_keys.SCENES][scene_name] = decoded_flash_scene
+            raw[scene_name] = flash_scene
+            decoders[scene_name] = self._map_flash_scene_to_decoder[flash_scene_name]
 
-        return state
+        return State(raw, decoders)
 
     def schema(self):
         """
@@ -341,7 +525,14 @@ class BulbDevice(pytuya.BulbDevice):
         Note: values are not decoded
         """
 
-        status = self.status()
+        return self._execute(self._schema())
+
+    def _schema(self):
+        """
+        Operation behind self.schema
+        """
+
+        status = yield from self._status()
 
         if not status:
             return {}
@@ -387,7 +578,246 @@ class BulbDevice(pytuya.BulbDevice):
                      'ffff0106ff0000ffe60009ff0000f7fffffffff700ff']}
         """
 
-        super_status = super().status()
+        return self._execute(self._status())
+
+    def refresh(self):
+        """
+        Re-read the Bulb's status, bypassing (and then updating) the cache
+
+        :returns(dict) - Bulb's status, as self.status
+        """
+
+        return self._format_status(self._request(pytuya.STATUS, cached=False))
+
+    def command_queue(self, **kwargs):
+        """
+        Returns the Bulb's <CommandQueue>, which runs commands one at a
+        ... time on a worker thread and returns futures
+
+        :param **kwargs - **kwargs to be passed to <CommandQueue>.__init__
+            ... (only when first creating it)
+
+        :returns(CommandQueue) - The same queue on every call, so every
+            ... caller's commands are run in turn
+
+        E.g:
+            >>> future = bulb.command_queue().set_colour(255, 0, 0)
+        """
+
+        with self._command_queue_lock:
+            if self._command_queue is None:
+                self._command_queue = CommandQueue(self, **kwargs)
+
+            return self._command_queue
+
+    def subscribe \
+            (
+                self,
+                callback,
+                heartbeat_interval = constants.networking.HEARTBEAT_INTERVAL,
+            ):
+        """
+        Call {callback} whenever the Bulb's state changes, rather than
+        ... polling self.status
+
+        A <Watcher> holds a connection open (heartbeating every
+        ... {heartbeat_interval} seconds) for the Bulb to push its
+        ... changes down, while there are subscriptions
+
+        :param(function) callback - Called with a dict of just the
+            ... state fields which changed, e.g. {'brightness': 40}
+        :param(float) heartbeat_interval - Seconds between heartbeats
+
+        :returns(Subscription) - Close it to unsubscribe
+        """
+
+        subscription = self._subscribe(callback)
+
+        with self._subscriptions_lock:
+            if self._watcher is None and self._subscriptions:
+                self._watcher = Watcher(self, heartbeat_interval)
+                self._watcher.start()
+
+        return subscription
+
+    def watch \
+            (
+                self,
+                heartbeat_interval = constants.networking.HEARTBEAT_INTERVAL,
+            ):
+        """
+        Iterate over the Bulb's state changes as they happen,
+        ... blocking until each arrives
+
+        Closing the iterator (or leaving the loop) unsubscribes
+
+        :param(float) heartbeat_interval - Seconds between heartbeats
+
+        :yields(dict) - Just the state fields which changed
+
+        E.g:
+            >>> for changes in bulb.watch():
+            ...     print(changes)
+            {'on': False}
+        """
+
+        changes: queue.Queue = queue.Queue()
+
+        subscription = self.subscribe(changes.put, heartbeat_interval)
+
+        try:
+            while True:
+                yield changes.get()
+        finally:
+            subscription.close()
+
+    def _subscribe(self, callback):
+        """
+        Register {callback} for state changes, without starting a <Watcher>
+
+        :returns(Subscription) - The new subscription
+        """
+
+        subscription = Subscription(self, callback)
+
+        with self._subscriptions_lock:
+            if not self._subscriptions and self.cache.value:
+                self._published = self._state_from(self.cache.value)
+
+            self._subscriptions.append(subscription)
+
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        """
+        Remove {subscription}, stopping the <Watcher> after the last one
+
+        :returns - None
+        """
+
+        with self._subscriptions_lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+            if self._subscriptions:
+                return
+
+            self._published = None
+
+            watcher, self._watcher = self._watcher, None
+
+        if watcher is not None:
+            watcher.stop()
+
+    def _is_subscribed(self, subscription):
+        """
+        Returns whether {subscription} is still registered
+        """
+
+        return subscription in self._subscriptions
+
+    def _publish(self):
+        """
+        Send the state fields changed since last time to the subscribers
+
+        The first state seen (after subscribing) is only remembered,
+        ... to compare later ones to
+
+        :returns - None
+        """
+
+        if not self._subscriptions:
+            return
+
+        status = self.cache.value
+
+        if not status:
+            return
+
+        state = self._state_from(status)
+
+        with self._subscriptions_lock:
+            previous, self._published = self._published, state
+
+            subscriptions = list(self._subscriptions)
+
+        if previous is None or not state:
+            return
+
+        changes = state.diff(previous)
+
+        if not changes:
+            return
+
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(changes)
+            except Exception:
+                log.exception('Subscriber %r failed', subscription) # Not the caller's problem
+
+    def _pushed(self, frame, generation=None):
+        """
+        Handle a {frame} received on a <Watcher>'s connection
+
+        :param(bytes) frame - Frame the Bulb sent
+        :param(int) generation - self.cache.generation when the status
+            ... request on the connection was sent, None once it has
+            ... been answered
+
+        :returns(bool) - Whether {frame} answered the status request
+            ... (later status frames are applied as pushes)
+        """
+
+        command = pytuya.unpack_frame(frame).command
+
+        if command == pytuya.HEARTBEAT_COMMAND:
+            return False
+
+        if command == pytuya.STATUS_COMMAND and generation is not None:
+            self._handle_response(pytuya.STATUS, None, frame, generation)
+
+            return True
+
+        self._unsolicited(frame)
+
+        return False
+
+    def _state_from(self, status):
+        """
+        Work out the state from a (decoded pytuya) {status}, as self.state
+
+        :returns(State) - Bulb state ({} for an empty status)
+        """
+
+        operation = self._state()
+
+        try:
+            operation.send(None)
+
+            while True:
+                operation.send(status)
+        except StopIteration as stop:
+            return stop.value
+        except (KeyError, IndexError):
+            return {} # Not a complete status
+
+    def _status(self):
+        """
+        Operation behind self.status
+        """
+
+        super_status = yield (pytuya.STATUS, None)
+
+        return self._format_status(super_status)
+
+    def _format_status(self, super_status):
+        """
+        Format the decoded pytuya status as self.status
+
+        :param(dict) super_status - Decoded pytuya status
+
+        :returns(dict) - Bulb's status
+        """
 
         if not super_status:
             return {}
@@ -447,7 +877,24 @@ class BulbDevice(pytuya.BulbDevice):
         Note: Only use to set colour and speed
         """
 
-        state = self.state()
+        return self._execute \
+        (
+            self._edit_soft(saturation, brightness, speed, colour)
+        )
+
+    def _edit_soft \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colour = None,
+            ):
+        """
+        Operation behind self.edit_soft
+        """
+
+        state = yield from self._state()
 
         scenes = state[constants.state_keys.SCENES]
 
@@ -471,21 +918,15 @@ class BulbDevice(pytuya.BulbDevice):
         if colour is None:
             colour = scene[constants.state_keys.COLOUR]
 
-        int_saturation = self._saturation_to_hexvalue(saturation)
-        int_brightness = self._brightness_to_hexvalue(brightness)
-        int_speed = self._speed_to_hexvalue(speed)
-
-        hex_saturation = utils.int_to_hex(int_saturation)
-        hex_brightness = utils.int_to_hex(int_brightness)
-        hex_speed = utils.int_to_hex(int_speed)
-
-        hex_colour = super()._rgb_to_hexvalue(*colour)[:6] # Only get rgb
-
-        hexvalue = f'{hex_brightness}{hex_saturation}{hex_speed}01{hex_colour}'
-
-        payload = super().generate_payload(pytuya.SET, {str_flash_scene_index: hexvalue})
+        hexvalue = codec.encode_one_colour_flash_scene \
+        (
+            saturation,
+            brightness,
+            speed,
+            colour,
+        )
 
-        data = super()._send_receive(payload)
+        data = yield (pytuya.SET, {str_flash_scene_index: hexvalue})
 
         return data
 
@@ -512,7 +953,24 @@ class BulbDevice(pytuya.BulbDevice):
         Note: Only use to set colours and speed
         """
 
-        state = self.state()
+        return self._execute \
+        (
+            self._edit_colourful(saturation, brightness, speed, colours)
+        )
+
+    def _edit_colourful \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colours = (),
+            ):
+        """
+        Operation behind self.edit_colourful
+        """
+
+        state = yield from self._state()
 
         scenes = state[constants.state_keys.SCENES]
 
@@ -534,22 +992,7 @@ class BulbDevice(pytuya.BulbDevice):
         if speed is None:
             speed = scene[constants.state_keys.SPEED]
 
-        int_saturation = self._saturation_to_hexvalue(saturation)
-        int_brightness = self._brightness_to_hexvalue(brightness)
-        int_speed = self._speed_to_hexvalue(speed)
-
-        hex_saturation = utils.int_to_hex(int_saturation)
-        hex_brightness = utils.int_to_hex(int_brightness)
-        hex_speed = utils.int_to_hex(int_speed)
-
-        colours_hexvalues = []
-
-        pre_colours = scene[constants.state_keys.COLOURS]
-
-        for index in range(len(pre_colours)):
-            colour_hexvalue = super()._rgb_to_hexvalue(*pre_colours[index])[:6] # Only get rgb
-
-            colours_hexvalues.append(colour_hexvalue)
+        scene_colours = list(scene[constants.state_keys.COLOURS])
 
         if isinstance(colours, list) or isinstance(colours, tuple):
             colours = {index + 1: colour for index, colour in enumerate(colours)}
@@ -560,19 +1003,17 @@ class BulbDevice(pytuya.BulbDevice):
             elif not isinstance(index, int):
                 continue
 
-            index -= 1
-
-            colour_hexvalue = super()._rgb_to_hexvalue(*colour_rgb)[:6]
-
-            colours_hexvalues[index] = colour_hexvalue
-
-        colours_hexvalue = ''.join(colours_hexvalues)
-
-        hexvalue = f'{hex_brightness}{hex_saturation}{hex_speed}06{colours_hexvalue}'
+            scene_colours[index - 1] = colour_rgb
 
-        payload = super().generate_payload(pytuya.SET, {str_flash_scene_index: hexvalue})
+        hexvalue = codec.encode_six_colour_flash_scene \
+        (
+            saturation,
+            brightness,
+            speed,
+            scene_colours,
+        )
 
-        data = super()._send_receive(payload)
+        data = yield (pytuya.SET, {str_flash_scene_index: hexvalue})
 
         return data
 
@@ -597,7 +1038,24 @@ class BulbDevice(pytuya.BulbDevice):
         Note: Only use to set colour and speed
         """
 
-        state = self.state()
+        return self._execute \
+        (
+            self._edit_exciting(saturation, brightness, speed, colour)
+        )
+
+    def _edit_exciting \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colour = None,
+            ):
+        """
+        Operation behind self.edit_exciting
+        """
+
+        state = yield from self._state()
 
         scenes = state[constants.state_keys.SCENES]
 
@@ -621,23 +1079,17 @@ class BulbDevice(pytuya.BulbDevice):
         if colour is None:
             colour = scene[constants.state_keys.COLOUR]
 
-        int_saturation = self._saturation_to_hexvalue(saturation)
-        int_brightness = self._brightness_to_hexvalue(brightness)
-        int_speed = self._speed_to_hexvalue(speed)
-
-        hex_saturation = utils.int_to_hex(int_saturation)
-        hex_brightness = utils.int_to_hex(int_brightness)
-        hex_speed = utils.int_to_hex(int_speed)
-
         # colour = colour[::-1] ## Why is this not flipped here, but is in decoding???
 
-        hex_colour = super()._rgb_to_hexvalue(*colour)[:6] # Only rgb
-
-        hexvalue = f'{hex_brightness}{hex_saturation}{hex_speed}01{hex_colour}'
-
-        payload = super().generate_payload(pytuya.SET, {str_flash_scene_index: hexvalue})
+        hexvalue = codec.encode_one_colour_flash_scene \
+        (
+            saturation,
+            brightness,
+            speed,
+            colour,
+        )
 
-        data = super()._send_receive(payload)
+        data = yield (pytuya.SET, {str_flash_scene_index: hexvalue})
 
         return data
 
@@ -664,7 +1116,24 @@ class BulbDevice(pytuya.BulbDevice):
         Note: Only use to set colours and speed
         """
 
-        state = self.state()
+        return self._execute \
+        (
+            self._edit_wonderful(saturation, brightness, speed, colours)
+        )
+
+    def _edit_wonderful \
+            (
+                self,
+                saturation = None,
+                brightness = None,
+                speed = None,
+                colours = (),
+            ):
+        """
+        Operation behind self.edit_wonderful
+        """
+
+        state = yield from self._state()
 
         scenes = state[constants.state_keys.SCENES]
 
@@ -686,22 +1155,7 @@ class BulbDevice(pytuya.BulbDevice):
         if speed is None:
             speed = scene[constants.state_keys.SPEED]
 
-        int_saturation = self._saturation_to_hexvalue(saturation)
-        int_brightness = self._brightness_to_hexvalue(brightness)
-        int_speed = self._speed_to_hexvalue(speed)
-
-        hex_saturation = utils.int_to_hex(int_saturation)
-        hex_brightness = utils.int_to_hex(int_brightness)
-        hex_speed = utils.int_to_hex(int_speed)
-
-        colours_hexvalues = []
-
-        pre_colours = scene[constants.state_keys.COLOURS]
-
-        for index in range(len(pre_colours)):
-            colour_hexvalue = super()._rgb_to_hexvalue(*pre_colours[index])[:6] # Only get rgb
-
-            colours_hexvalues.append(colour_hexvalue)
+        scene_colours = list(scene[constants.state_keys.COLOURS])
 
         if isinstance(colours, list) or isinstance(colours, tuple):
             colours = {index + 1: colour for index, colour in enumerate(colours)}
@@ -712,21 +1166,39 @@ class BulbDevice(pytuya.BulbDevice):
             elif not isinstance(index, int):
                 continue
 
-            index -= 1
+            scene_colours[index - 1] = colour_rgb
 
-            colour_hexvalue = super()._rgb_to_hexvalue(*colour_rgb)[:6] # Only get RGB
+        hexvalue = codec.encode_six_colour_flash_scene \
+        (
+            saturation,
+            brightness,
+            speed,
+            scene_colours,
+        )
 
-            colours_hexvalues[index] = colour_hexvalue
+        data = yield (pytuya.SET, {str_flash_scene_index: hexvalue})
 
-        colours_hexvalue = ''.join(colours_hexvalues)
+        return data
 
-        hexvalue = f'{hex_brightness}{hex_saturation}{hex_speed}06{colours_hexvalue}'
+    @staticmethod
+    def _rgb_to_hexvalue(r, g, b):
+        """
+        Encode an RGB colour as colour_data
 
-        payload = super().generate_payload(pytuya.SET, {str_flash_scene_index: hexvalue})
+        Uses: codec.encode_colour
+        """
 
-        data = super()._send_receive(payload)
+        return codec.encode_colour(r, g, b)
 
-        return data
+    @staticmethod
+    def _hexvalue_to_rgb(hexvalue):
+        """
+        Decode colour_data (or scene_data) to (r, g, b)
+
+        Uses: codec.decode_colour
+        """
+
+        return codec.decode_colour(hexvalue)
 
     def _decode_flash_scene_1(self, hexvalue):
         """
@@ -794,32 +1266,7 @@ class BulbDevice(pytuya.BulbDevice):
                 {bb} -> blue
         """
 
-        if len(hexvalue) != 14:
-            return {}
-
-        br, sa, sp, _01, rr, gg, bb = utils.chunk(hexvalue, 2)
-
-        red = utils.hex_to_int(rr)
-        green = utils.hex_to_int(gg)
-        blue = utils.hex_to_int(bb)
-
-        rgb = (red, green, blue)
-
-        speed = self._hexvalue_to_speed(utils.hex_to_int(sp))
-
-        brightness = self._hexvalue_to_brightness(utils.hex_to_int(br))
-
-        saturation = self._hexvalue_to_saturation(utils.hex_to_int(sa))
-
-        data = \
-        {
-            constants.state_keys.COLOUR: rgb,
-            constants.state_keys.SPEED: speed,
-            constants.state_keys.BRIGHTNESS: brightness,
-            constants.state_keys.SATURATION: saturation,
-        }
-
-        return data
+        return codec.decode_one_colour_flash_scene(hexvalue)
 
     def _decode_one_colour_flash_scene_flipped(self, hexvalue):
         """
@@ -844,32 +1291,7 @@ class BulbDevice(pytuya.BulbDevice):
                 {bb} -> blue
         """
 
-        if len(hexvalue) != 14:
-            return {}
-
-        br, sa, sp, _01, bb, gg, rr = utils.chunk(hexvalue, 2)
-
-        red = utils.hex_to_int(rr)
-        green = utils.hex_to_int(gg)
-        blue = utils.hex_to_int(bb)
-
-        rgb = (red, green, blue)
-
-        speed = self._hexvalue_to_speed(utils.hex_to_int(sp))
-
-        brightness = self._hexvalue_to_brightness(utils.hex_to_int(br))
-
-        saturation = self._hexvalue_to_saturation(utils.hex_to_int(sa))
-
-        data = \
-        {
-            constants.state_keys.COLOUR: rgb,
-            constants.state_keys.SPEED: speed,
-            constants.state_keys.BRIGHTNESS: brightness,
-            constants.state_keys.SATURATION: saturation,
-        }
-
-        return data
+        return codec.decode_one_colour_flash_scene(hexvalue, flipped = True)
 
     def _decode_six_colour_flash_scene(self, hexvalue):
         """
@@ -907,44 +1329,7 @@ class BulbDevice(pytuya.BulbDevice):
             4 5 6
         """
 
-        if len(hexvalue) != 44:
-            return {}
-
-        hex_values = utils.chunk(hexvalue, 2)
-
-        br, sa, sp, _06, *cs = hex_values
-
-        brightness = self._hexvalue_to_brightness(utils.hex_to_int(br))
-
-        saturation = self._hexvalue_to_saturation(utils.hex_to_int(sa))
-
-        speed = self._hexvalue_to_speed(utils.hex_to_int(sp))
-
-        colours = []
-
-        for cn in utils.chunk(cs, 3):
-            if len(cn) != 3:
-                continue
-
-            rr, gg, bb = cn
-
-            red = utils.hex_to_int(rr)
-            green = utils.hex_to_int(gg)
-            blue = utils.hex_to_int(bb)
-
-            rgb = (red, green, blue)
-
-            colours.append(rgb)
-
-        data = \
-        {
-            constants.state_keys.SPEED: speed,
-            constants.state_keys.BRIGHTNESS: brightness,
-            constants.state_keys.SATURATION: saturation,
-            constants.state_keys.COLOURS: colours,
-        }
-
-        return data
+        return codec.decode_six_colour_flash_scene(hexvalue)
 
     def _brightness_to_hexvalue(self, brightness, u=26.9):
         """
@@ -963,11 +1348,7 @@ class BulbDevice(pytuya.BulbDevice):
             ... But ~27 seemed to work
         """
 
-        brightness = self._in_range(brightness, min = 0, max = 100)
-
-        hexvalue = int(u + ((255 - u) / 100) * brightness)
-
-        return hexvalue
+        return codec.encode_brightness(brightness, u)
 
     def _hexvalue_to_brightness(self, hexvalue, u=26.9):
         """
@@ -985,11 +1366,7 @@ class BulbDevice(pytuya.BulbDevice):
             ... But ~27 seemed to work
         """
 
-        brightness = int((hexvalue - u) / ((255 - u) / 100)) + 1
-
-        brightness = self._in_range(brightness, min = 0, max = 100)
-
-        return brightness
+        return codec.decode_brightness(hexvalue, u)
 
     def _saturation_to_hexvalue(self, saturation, u=27):
         """
@@ -1008,11 +1385,7 @@ class BulbDevice(pytuya.BulbDevice):
             ... But ~27 seemed to work
         """
 
-        saturation = self._in_range(saturation, min = 0, max = 100)
-
-        hexvalue = int(u + ((255 - u) / 100) * saturation + 0.00001)
-
-        return hexvalue
+        return codec.encode_saturation(saturation, u)
 
     def _hexvalue_to_saturation(self, hexvalue, u=27):
         """
@@ -1031,11 +1404,7 @@ class BulbDevice(pytuya.BulbDevice):
             ... But ~27 seemed to work
         """
 
-        saturation = int((hexvalue - u) / ((255 - u) / 100) + 0.5)
-
-        saturation = self._in_range(saturation, min = 0, max = 100)
-
-        return saturation
+        return codec.decode_saturation(hexvalue, u)
 
     def _hexvalue_to_speed(self, hexvalue):
         """
@@ -1051,11 +1420,7 @@ class BulbDevice(pytuya.BulbDevice):
             ... But this seems to work
         """
 
-        speed = 101 - hexvalue
-
-        speed = self._in_range(speed, min = 0, max = 100)
-
-        return speed
+        return codec.decode_speed(hexvalue)
 
     def _speed_to_hexvalue(self, speed):
         """
@@ -1072,21 +1437,260 @@ class BulbDevice(pytuya.BulbDevice):
             ... But this seems to work
         """
 
-        speed = self._in_range(speed, 0, 100)
+        return codec.encode_speed(speed)
+
+    def _execute(self, operation):
+        """
+        Run {operation} to completion, performing each request it yields
+
+        :param(generator) operation - Operation, e.g. self._state()
+            ... Yields (command, data) requests and is sent the
+            ... Bulb's response to each (decoded, for status requests)
+
+        :returns - Return value of {operation}
+
+        Note: Operations hold all the logic but do no I/O, so
+            ... <AsyncBulbDevice> runs the same operations
+        """
+
+        response = None
+
+        while True:
+            try:
+                command, data = operation.send(response)
+            except StopIteration as stop:
+                return stop.value
+
+            response = self._request(command, data)
+
+    def _request(self, command, data=None, cached=True):
+        """
+        Send a single {command} request to the Bulb
+
+        :param(str) command - pytuya command, e.g. pytuya.SET
+        :param(dict) data - dps to send, if any
+        :param(bool) cached - Whether a status may come from self.cache
+
+        :returns - Status requests: Decoded pytuya status
+            ... Other requests: Bulb response (bytes)
+
+        Note: Concurrent status requests (from status, schema, state,
+            ... etc.) share a single request to the Bulb, unless a write
+            ... was made in between
+        """
+
+        if cached:
+            response = self._cached_response(command)
+
+            if response is not None:
+                return response
+
+        if command != pytuya.STATUS:
+            return self._send_request(command, data)
+
+        return self.flights.run \
+        (
+            (command, self.cache.generation),
+            lambda: self._send_request(command, data),
+        )
+
+    def _send_request(self, command, data=None):
+        """
+        Send a single {command} request to the Bulb, as self._request
+        ... but always over the network
+        """
+
+        generation = self.cache.generation
 
-        hexvalue = 101 - speed
+        payload = self.generate_payload(command, data)
+
+        response = self._send_receive(payload)
+
+        return self._handle_response(command, data, response, generation)
+
+    def _cached_response(self, command):
+        """
+        Look up a response to {command} in self.cache
+
+        Starts a background refresh if the cached status is stale
+
+        :returns(dict) - Decoded pytuya status, or None
+        """
 
-        return hexvalue
+        if command != pytuya.STATUS:
+            return None
+
+        status, fresh = self.cache.get()
+
+        if status is not None and not fresh:
+            self._revalidate()
+
+        return status
+
+    def _handle_response(self, command, data, response, generation):
+        """
+        Decode the Bulb's {response} to {command} and keep self.cache
+        ... up to date
+
+        :param(str) command - pytuya command which was sent
+        :param(dict) data - dps which were sent, if any
+        :param(bytes) response - Bulb response
+        :param(int) generation - self.cache.generation before sending
+
+        :returns - As self._request
+        """
+
+        if command == pytuya.STATUS:
+            status = self._decode_status(response)
+
+            if status and self.cache.set(status, generation):
+                self._publish()
+
+            return status
+
+        if command == pytuya.SET:
+            dps = self._written_dps(data, response)
+
+            if dps is None:
+                self.cache.invalidate()
+            else:
+                self.cache.apply(dps)
+
+                self._publish()
+
+        return response
+
+    def _written_dps(self, data, response):
+        """
+        Work out which dps the Bulb took on from its {response} to a SET
+
+        :param(dict) data - dps which were sent
+        :param(bytes) response - Bulb response
+
+        :returns(dict) - Success: {data}, updated with any dps the Bulb
+            ... echoed back
+            ... Failure: None
+        """
+
+        if not response:
+            return None
+
+        frame = pytuya.unpack_frame(response)
+
+        if frame.retcode:
+            return None
+
+        if not frame.payload:
+            return data
+
+        status = self._decode_status(response) or {}
+
+        return {**data, **status.get(constants.status_keys.DPS, {})}
+
+    def _unsolicited(self, frame):
+        """
+        Apply the dps in a {frame} the Bulb pushed to self.cache
+        ... (and let the subscribers know)
+
+        :param(bytes) frame - Frame the Bulb sent unprompted
+
+        :returns - None
+        """
+
+        command = pytuya.unpack_frame(frame).command
+
+        if command not in (pytuya.PUSH_COMMAND, pytuya.STATUS_COMMAND):
+            return super()._unsolicited(frame)
+
+        status = self._decode_status(frame) or {}
+
+        dps = status.get(constants.status_keys.DPS)
+
+        if dps:
+            self.cache.apply(dps)
+
+            self._publish()
+
+    def _revalidate(self):
+        """
+        Refresh self.cache on a background thread (unless already doing so)
+        """
+
+        if not self.cache.begin_revalidate():
+            return
+
+        def revalidate():
+            """
+            Nested function to run self.refresh
+
+            Level: _revalidate.revalidate
+            """
+
+            try:
+                self.refresh()
+            except Exception:
+                pass # Keep serving the stale status
+            finally:
+                self.cache.end_revalidate()
+
+        threading.Thread(target=revalidate, daemon=True).start()
 
-    @decorators.on_connection_reset(None)
     def _send_receive(self, *args, **kwargs):
         """
         Wrapper for super()._send_receive
 
-        Implements: @decorators.on_connection_reset(None)
+        Connections are pooled by super(), and failed requests (including
+        ... reset connections) retried as self.retry_policy says
+
+        Raises <CircuitOpenError> straight away while self.health
+        ... knows the Bulb to be down
+
+        :returns(bytes) - Success: Bulb response
+            ... Failure: None (the connection kept getting reset)
+        """
+
+        self.health.check()
+
+        start = time.perf_counter()
+
+        try:
+            response = super()._send_receive(*args, **kwargs)
+        except ConnectionResetError:
+            self.health.record_failure()
+
+            return None
+        except BaseException:
+            self.health.record_failure() # Anything else too, or a half open trial never ends
+
+            raise
+
+        self.health.record_success(time.perf_counter() - start)
+
+        return response
+
+    def move(self, address):
+        """
+        Point self at the Bulb's new {address}, e.g. after a DHCP change
+
+        :param(str) address - The Bulb's new IP address
+
+        :returns - None
+        """
+
+        previous = self.address
+
+        self.address = self.host = address
+
+        self.connection_pool.close(previous, self.port)
+
+    def _probe(self):
+        """
+        Check whether the Bulb is reachable, for self.health
+
+        :returns(bool) - Whether the Bulb accepts a connection
         """
 
-        return super()._send_receive(*args, **kwargs)
+        return utils.ping(self.address, self.port, constants.networking.PROBE_TIMEOUT)
 
     def _super(self):
         """
@@ -0,0 +1,258 @@
+from .. import constants
+from .. import utils
+import collections
+import concurrent.futures
+import time
+
+"""
+Imports:
+    ..constants
+    ..utils
+    collections
+    concurrent.futures
+    time
+
+Contains:
+    <BulbResult>
+    <BulbGroup>
+"""
+
+class BulbResult(collections.namedtuple('BulbResult', ('bulb', 'result', 'error', 'elapsed'))):
+    """
+    Outcome of running a command on one bulb in a <BulbGroup>
+
+    :attr bulb - The <Bulb>/<BulbDevice>
+    :attr result - What the command returned (None on error)
+    :attr error - Exception raised, if any
+        ... concurrent.futures.TimeoutError if the bulb was too slow
+    :attr elapsed - Seconds the command took (None if it didn't finish)
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """
+        Whether the command completed without error
+        """
+
+        return self.error is None
+
+class BulbGroup(object):
+    """
+    Fans commands out to many bulbs at once
+
+    Offers the same commands as <Bulb> (including the generated
+    ... set_{colour}, set_{theme} and set_{scene} helpers), but runs
+    ... them concurrently on a thread pool and returns a list of
+    ... <BulbResult>, one per bulb, in the order the bulbs were given
+
+    E.g:
+        >>> group = expower.BulbGroup(bulbs, concurrency = 16, timeout = 3)
+        >>> failed = [result.bulb for result in group.set_red() if not result.ok]
+    """
+
+    _commands = \
+    (
+        'get_brightness',
+        'get_colour',
+        'get_temperature',
+        'set_brightness',
+        'set_colour',
+        'set_temperature',
+        'set_white',
+        'set_scene',
+        'state',
+        'status',
+        'schema',
+        'turn_on',
+        'turn_off',
+        'edit_soft',
+        'edit_colourful',
+        'edit_wonderful',
+        'edit_exciting',
+    )
+
+    def __init__(self, bulbs=(), concurrency=32, timeout=None):
+        """
+        Initialise self
+
+        :param(iterable) bulbs - <Bulb> and/or <BulbDevice> instances
+        :param(int) concurrency - Most bulbs to talk to at once
+        :param(float) timeout - Seconds to wait for the whole group
+            ... Bulbs still running after this are reported as errors,
+            ... None to wait for every bulb
+
+        :returns - None
+        """
+
+        self.bulbs = list(bulbs)
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+        self._executor = None
+
+        for command in self._commands:
+            setattr(self, command, self._command(command))
+
+        for colour_name, colour_rgb in constants.rgb_colours.RGB_COLOURS.items():
+            setattr(self, f'set_{colour_name}', self._command('set_colour', colour_rgb))
+
+        for theme_name, theme_colour in constants.themes.THEMES.items():
+            setattr(self, f'set_{theme_name}', self._command('set_colour', theme_colour))
+
+        for scene_name in constants.scenes.SCENES:
+            scene_index = constants.maps.SCENE_TO_INDEX[scene_name]
+
+            setattr(self, f'set_{scene_name}', self._command('set_scene', scene_index))
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <BulbGroup(n bulbs)>
+        """
+
+        return f'<{self.__class__.__name__}({len(self.bulbs)} bulbs)>'
+
+    def __len__(self):
+        """
+        Returns the number of bulbs in the group
+        """
+
+        return len(self.bulbs)
+
+    def __iter__(self):
+        """
+        Iterate over the bulbs in the group
+        """
+
+        return iter(self.bulbs)
+
+    def __enter__(self):
+        """
+        Enter a 'with' block
+        """
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Exit a 'with' block, shutting down the thread pool
+        """
+
+        self.close()
+
+    def add(self, bulb):
+        """
+        Add {bulb} to the group
+        """
+
+        self.bulbs.append(bulb)
+
+    def close(self):
+        """
+        Shut down the thread pool (without waiting on slow bulbs)
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+            self._executor = None
+
+    def map(self, command, *args, **kwargs):
+        """
+        Call {command} on every bulb concurrently
+
+        :param(str) command - Method name, e.g. 'set_colour'
+        :param *args - *args to be passed to each bulb's {command}
+        :param **kwargs - **kwargs to be passed to each bulb's {command}
+
+        :returns(list[BulbResult]) - One result per bulb
+        """
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor \
+            (
+                max_workers = self.concurrency,
+                thread_name_prefix = self.__class__.__name__,
+            )
+
+        futures = \
+        [
+            self._executor.submit(self._call, bulb, command, args, kwargs)
+                for bulb in self.bulbs
+        ]
+
+        concurrent.futures.wait(futures, timeout=self.timeout)
+
+        results = []
+
+        for bulb, future in zip(self.bulbs, futures):
+            if future.done():
+                results.append(future.result())
+            else:
+                future.cancel()
+
+                error = concurrent.futures.TimeoutError \
+                (
+                    f'{command} did not finish within {self.timeout}s'
+                )
+
+                results.append(BulbResult(bulb, None, error, None))
+
+        return results
+
+    def ping(self, timeout=1):
+        """
+        Check which bulbs are reachable, probing {concurrency} at once
+
+        :param(float) timeout - Seconds to wait for each bulb
+
+        :returns(list[ScanResult]) - One result per bulb
+        """
+
+        return utils.scan \
+        (
+            [(bulb.host, bulb.port) for bulb in self.bulbs],
+            timeout = timeout,
+            concurrency = self.concurrency,
+        )
+
+    def _command(self, command, *bound_args):
+        """
+        Create a group-wide version of {command}
+
+        :param(str) command - Method name, e.g. 'set_colour'
+        :param *bound_args - Leading arguments to always pass
+
+        :returns(function) - Calls self.map
+        """
+
+        def wrapper(*args, **kwargs):
+            """
+            Nested wrapper to call self.map
+
+            Level: _command.wrapper
+            """
+
+            return self.map(command, *bound_args, *args, **kwargs)
+
+        return wrapper
+
+    @staticmethod
+    def _call(bulb, command, args, kwargs):
+        """
+        Run {command} on {bulb}, capturing its result, error and timing
+
+        :returns(BulbResult) - Outcome for {bulb}
+        """
+
+        start = time.perf_counter()
+
+        try:
+            result = getattr(bulb, command)(*args, **kwargs)
+        except Exception as error:
+            return BulbResult(bulb, None, error, time.perf_counter() - start)
+
+        return BulbResult(bulb, result, None, time.perf_counter() - start)
@@ -0,0 +1,517 @@
+from .. import constants
+import collections
+import concurrent.futures
+import threading
+import time
+
+"""
+Imports:
+    ..constants
+    collections
+    concurrent.futures
+    threading
+    time
+
+Contains:
+    <QueueFullError>
+    <CommandQueue>
+"""
+
+class QueueFullError(Exception):
+    """
+    Raised on submitting a command to a full <CommandQueue> which
+    ... rejects (or has waited too long for space)
+    """
+
+class CommandQueue(object):
+    """
+    Runs commands on a Bulb one at a time, in the order submitted, on
+    ... a dedicated worker thread, so callers never collide on the
+    ... Bulb's single connection
+
+    Offers the same commands as <Bulb> (including the generated
+    ... set_{colour}, set_{theme} and set_{scene} helpers), but each
+    ... returns a concurrent.futures.Future straight away
+    ... (asyncio code can await asyncio.wrap_future(future))
+
+    Commands wait in priority lanes. Writes go in the INTERACTIVE lane
+    ... and reads (state, status, get_*, etc.) in the BACKGROUND lane
+    ... by default, and the worker always takes from the most urgent
+    ... lane first, so a user's click doesn't wait behind polls.
+    ... Queueing an INTERACTIVE write also cancels the supersedable
+    ... BACKGROUND reads still waiting (e.g. a <Poller>'s polls), as the
+    ... write changes what they would read (see {supersede_reads})
+
+    Once {depth} commands are waiting in a lane, a new command:
+        block - Waits for space (up to {block_timeout} seconds)
+        drop_oldest - Cancels the longest-waiting command to make space
+        reject - Raises <QueueFullError>
+
+    E.g:
+        >>> queue = expower.CommandQueue(bulb, depth = 8, overflow = 'drop_oldest')
+        >>> future = queue.set_red()
+        >>> future.result(timeout = 5)
+    """
+
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    REJECT = 'reject'
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    _priority_names = \
+    {
+        INTERACTIVE: 'interactive',
+        BACKGROUND: 'background',
+    }
+
+    _reads = \
+    (
+        'get_brightness',
+        'get_colour',
+        'get_temperature',
+        'state',
+        'status',
+        'schema',
+        'refresh',
+    )
+
+    _commands = \
+    (
+        'get_brightness',
+        'get_colour',
+        'get_temperature',
+        'set_brightness',
+        'set_colour',
+        'set_temperature',
+        'set_white',
+        'set_scene',
+        'state',
+        'status',
+        'schema',
+        'refresh',
+        'turn_on',
+        'turn_off',
+        'edit_soft',
+        'edit_colourful',
+        'edit_wonderful',
+        'edit_exciting',
+    )
+
+    def __init__ \
+            (
+                self,
+                device,
+                depth = constants.networking.COMMAND_QUEUE_DEPTH,
+                overflow = BLOCK,
+                block_timeout = None,
+                supersede_reads = True,
+                window = 1000,
+                clock = time.monotonic,
+            ):
+        """
+        Initialise self
+
+        :param(object) device - A <Bulb> or <BulbDevice>
+        :param(int) depth - Most commands waiting at once in each lane
+        :param(str) overflow - What to do once {depth} commands are
+            ... waiting: 'block', 'drop_oldest' or 'reject'
+        :param(float) block_timeout - Most seconds to block for space
+            ... before raising <QueueFullError>, None to wait forever
+        :param(bool) supersede_reads - Cancel the waiting supersedable
+            ... BACKGROUND reads whenever an INTERACTIVE write is queued
+        :param(int) window - Recent commands the latency metrics cover
+            ... (per lane)
+        :param(function) clock - Returns the current time (seconds)
+
+        :returns - None
+        """
+
+        if overflow not in (self.BLOCK, self.DROP_OLDEST, self.REJECT):
+            raise ValueError(f'Unknown overflow: {overflow!r}')
+
+        self.device = device
+        self.depth = depth
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.supersede_reads = supersede_reads
+        self.window = window
+        self.clock = clock
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.superseded = 0
+
+        self._lanes = {} # priority -> deque
+        self._waits = {} # priority -> deque
+        self._runs = {} # priority -> deque
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        for command in self._commands:
+            setattr(self, command, self._command(command))
+
+        for colour_name, colour_rgb in constants.rgb_colours.RGB_COLOURS.items():
+            setattr(self, f'set_{colour_name}', self._command('set_colour', colour_rgb))
+
+        for theme_name, theme_colour in constants.themes.THEMES.items():
+            setattr(self, f'set_{theme_name}', self._command('set_colour', theme_colour))
+
+        for scene_name in constants.scenes.SCENES:
+            scene_index = constants.maps.SCENE_TO_INDEX[scene_name]
+
+            setattr(self, f'set_{scene_name}', self._command('set_scene', scene_index))
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <CommandQueue(device)[n waiting]>
+        """
+
+        return f'<{self.__class__.__name__}({self.device!r})[{len(self)} waiting]>'
+
+    def __len__(self):
+        """
+        Returns the number of commands waiting
+        """
+
+        return sum(map(len, self._lanes.values()))
+
+    def __enter__(self):
+        """
+        Enter a 'with' block
+        """
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Exit a 'with' block, running the remaining commands and closing
+        """
+
+        self.close()
+
+    def submit(self, command, *args, priority=None, supersedable=False, **kwargs):
+        """
+        Queue {command} to be run on self.device
+
+        :param(str) command - Method name, e.g. 'set_colour'
+        :param *args - *args to be passed to {command}
+        :param(int) priority - Lane to queue in, lower runs first,
+            ... e.g. self.INTERACTIVE. Defaults to self.BACKGROUND for
+            ... reads and self.INTERACTIVE for everything else
+        :param(bool) supersedable - Whether a later INTERACTIVE write
+            ... may cancel {command} while it waits, e.g. for a poll
+            ... which would only be repeated anyway
+        :param **kwargs - **kwargs to be passed to {command}
+
+        :returns(Future) - Resolves to what {command} returns
+            ... (cancelled if dropped to make space, or superseded)
+
+        Raises <QueueFullError> if there is no space (see overflow)
+        """
+
+        is_read = command in self._reads
+
+        if priority is None:
+            priority = self.BACKGROUND if is_read else self.INTERACTIVE
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        item = _Command(command, args, kwargs, future, self.clock(), priority, supersedable)
+
+        dropped = []
+
+        with self._condition:
+            queue = self._lane(priority)
+
+            deadline = None
+
+            if self.block_timeout is not None:
+                deadline = time.monotonic() + self.block_timeout
+
+            while True:
+                if self._closed:
+                    raise RuntimeError('Cannot submit to a closed CommandQueue')
+
+                if len(queue) < self.depth:
+                    break
+
+                if self.overflow == self.DROP_OLDEST:
+                    dropped.append(queue.popleft())
+
+                    self.dropped += 1
+
+                    continue
+
+                if self.overflow == self.BLOCK:
+                    remaining = None
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+
+                    if remaining is None or remaining > 0:
+                        self._condition.wait(remaining)
+
+                        continue
+
+                self.rejected += 1
+
+                raise QueueFullError(f'{self.depth} commands already waiting')
+
+            if self.supersede_reads and not is_read and priority < self.BACKGROUND:
+                for lane_priority, lane in self._lanes.items():
+                    if lane_priority < self.BACKGROUND:
+                        continue
+
+                    reads = \
+                    [
+                        waiting
+                        for waiting in lane
+                        if waiting.supersedable and waiting.command in self._reads
+                    ]
+
+                    for read in reads:
+                        lane.remove(read)
+
+                    dropped.extend(reads)
+
+                    self.superseded += len(reads)
+
+            queue.append(item)
+
+            self.submitted += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+
+            self._condition.notify_all()
+
+        for stale in dropped:
+            stale.cancel()
+
+        return future
+
+    def close(self, wait=True, cancel=False):
+        """
+        Stop accepting commands
+
+        :param(bool) wait - Wait for the worker to finish
+        :param(bool) cancel - Cancel the waiting commands rather than
+            ... run them
+
+        :returns - None
+        """
+
+        with self._condition:
+            self._closed = True
+
+            cancelled = []
+
+            if cancel:
+                for lane in self._lanes.values():
+                    cancelled.extend(lane)
+
+                    lane.clear()
+
+            thread = self._thread
+
+            self._condition.notify_all()
+
+        for item in cancelled:
+            item.cancel()
+
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def stats(self):
+        """
+        Returns the queue counters and latencies (seconds) as a dict
+
+        wait is the time commands spent queued, run the time they took,
+        ... overall and under 'lanes' for each priority class
+        """
+
+        with self._condition:
+            stats: dict = \
+            {
+                'waiting': len(self),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'rejected': self.rejected,
+                'superseded': self.superseded,
+            }
+
+            stats.update \
+            (
+                _latencies \
+                (
+                    [sample for samples in self._waits.values() for sample in samples],
+                    [sample for samples in self._runs.values() for sample in samples],
+                )
+            )
+
+            stats['lanes'] = \
+            {
+                self._priority_names.get(priority, priority): dict \
+                (
+                    waiting = len(self._lanes[priority]),
+                    **_latencies(self._waits[priority], self._runs[priority]),
+                )
+                for priority in sorted(self._lanes)
+            }
+
+        return stats
+
+    def _lane(self, priority):
+        """
+        Returns the lane for {priority}, creating it if need be
+        """
+
+        lane = self._lanes.get(priority)
+
+        if lane is None:
+            lane = self._lanes[priority] = collections.deque()
+
+            self._waits[priority] = collections.deque(maxlen=self.window)
+            self._runs[priority] = collections.deque(maxlen=self.window)
+
+        return lane
+
+    def _command(self, command, *bound_args):
+        """
+        Create a queued version of {command}
+
+        :param(str) command - Method name, e.g. 'set_colour'
+        :param *bound_args - Leading arguments to always pass
+
+        :returns(function) - Calls self.submit
+        """
+
+        def wrapper(*args, **kwargs):
+            """
+            Nested wrapper to call self.submit
+
+            Level: _command.wrapper
+            """
+
+            return self.submit(command, *bound_args, *args, **kwargs)
+
+        wrapper.__name__ = command
+
+        return wrapper
+
+    def _work(self):
+        """
+        Run the queued commands, most urgent lane first and in order
+        ... within a lane, until self.close is called and the queue is
+        ... empty
+        """
+
+        while True:
+            with self._condition:
+                while not len(self) and not self._closed:
+                    self._condition.wait()
+
+                if not len(self):
+                    self._thread = None
+
+                    return
+
+                item = min \
+                (
+                    (lane for lane in self._lanes.values() if lane),
+                    key = lambda lane: lane[0].priority,
+                ).popleft()
+
+                self._condition.notify_all() # There's space
+
+            if not item.future.set_running_or_notify_cancel():
+                continue # Cancelled by the caller
+
+            started = self.clock()
+
+            try:
+                result = getattr(self.device, item.command)(*item.args, **item.kwargs)
+            except Exception as error:
+                item.future.set_exception(error)
+
+                succeeded = False
+            else:
+                item.future.set_result(result)
+
+                succeeded = True
+
+            with self._condition:
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+                self._waits[item.priority].append(started - item.queued)
+                self._runs[item.priority].append(self.clock() - started)
+
+def _latencies(waits, runs):
+    """
+    Returns the percentiles of the {waits} and {runs} samples as a dict
+    """
+
+    latencies = {}
+
+    for name, samples in (('wait', waits), ('run', runs)):
+        ordered = sorted(samples)
+
+        for percentile in (50, 95, 99):
+            latencies[f'{name}_p{percentile}'] = _quantile(ordered, percentile)
+
+        latencies[f'{name}_max'] = ordered[-1] if ordered else None
+
+    return latencies
+
+def _quantile(ordered, percentile):
+    """
+    Returns the {percentile} of the sorted samples {ordered}, or None
+    """
+
+    if not ordered:
+        return None
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+class _Command(object):
+    """
+    A command waiting in a <CommandQueue>
+    """
+
+    __slots__ = ('command', 'args', 'kwargs', 'future', 'queued', 'priority', 'supersedable')
+
+    def __init__(self, command, args, kwargs, future, queued, priority, supersedable=False):
+        """
+        Initialise self
+        """
+
+        self.command = command
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.queued = queued
+        self.priority = priority
+        self.supersedable = supersedable
+
+    def cancel(self):
+        """
+        Cancel self.future, notifying anything waiting on it
+        ... (e.g. concurrent.futures.wait)
+        """
+
+        if self.future.cancel():
+            self.future.set_running_or_notify_cancel()
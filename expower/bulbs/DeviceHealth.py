@@ -0,0 +1,255 @@
+from .. import constants
+import threading
+import time
+
+"""
+Imports:
+    ..constants
+    threading
+    time
+
+Contains:
+    <CircuitOpenError>
+    <DeviceHealth>
+"""
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised (without touching the network) for a request to a Bulb
+    ... whose circuit breaker is open, i.e. which is known to be down
+    """
+
+class DeviceHealth(object):
+    """
+    Tracks a Bulb's health and acts as its circuit breaker
+
+    Closed (the Bulb is up): requests go through. {failure_threshold}
+    ... consecutive failed requests open the breaker
+
+    Open (the Bulb is down): requests fail straight away with
+    ... <CircuitOpenError>. Meanwhile {probe} (a cheap reachability
+    ... check, e.g. utils.ping) runs every {probe_interval} seconds on
+    ... a background thread, and closes the breaker once it succeeds
+
+    Half open: {reset_timeout} seconds after opening, a single request
+    ... is let through to test the Bulb (in case there is no probe,
+    ... or the probe succeeds while requests don't). Its outcome
+    ... closes or re-opens the breaker
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__ \
+            (
+                self,
+                failure_threshold = constants.networking.FAILURE_THRESHOLD,
+                reset_timeout = constants.networking.CIRCUIT_RESET_TIMEOUT,
+                probe = None,
+                probe_interval = constants.networking.PROBE_INTERVAL,
+                clock = time.monotonic,
+            ):
+        """
+        Initialise self
+
+        :param(int) failure_threshold - Consecutive failures which open
+            ... the breaker, 0 disables it (health is still tracked)
+        :param(float) reset_timeout - Seconds until an open breaker
+            ... lets a trial request through
+        :param(function) probe - Returns whether the Bulb is reachable
+        :param(float) probe_interval - Seconds between probes
+        :param(function) clock - Returns the current time (seconds)
+
+        :returns - None
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.clock = clock
+
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.trips = 0
+        self.probes = 0
+
+        self.last_success = None
+        self.last_failure = None
+        self.rtt = None
+
+        self._state = self.CLOSED
+        self._opened = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <DeviceHealth(state, consecutive_failures=...)>
+        """
+
+        return \
+        (
+            f'<{self.__class__.__name__}('
+            f'{self.state},'
+            f'consecutive_failures={self.consecutive_failures}'
+            ')>'
+        )
+
+    @property
+    def state(self):
+        """
+        The breaker's state: CLOSED, OPEN or HALF_OPEN
+        """
+
+        return self._state
+
+    @property
+    def available(self):
+        """
+        Whether the Bulb is thought to be up (the breaker isn't open)
+        """
+
+        return self._state != self.OPEN
+
+    def allow(self):
+        """
+        Claim permission to send a request
+
+        :returns(bool) - False if the request should fail fast
+        """
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN \
+                    and self.clock() - self._opened >= self.reset_timeout:
+                self._state = self.HALF_OPEN # This request is the trial
+
+                return True
+
+            self.rejected += 1
+
+            return False
+
+    def check(self):
+        """
+        As self.allow, raising <CircuitOpenError> rather than returning False
+        """
+
+        if not self.allow():
+            raise CircuitOpenError \
+            (
+                f'circuit open after {self.consecutive_failures} consecutive failures'
+            )
+
+    def record_success(self, rtt=None):
+        """
+        Record a request which succeeded, closing the breaker
+
+        :param(float) rtt - Seconds the request took
+
+        :returns - None
+        """
+
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.last_success = self.clock()
+
+            if rtt is not None:
+                self.rtt = rtt
+
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        """
+        Record a request which failed, opening the breaker once
+        ... self.failure_threshold have failed in a row
+
+        :returns - None
+        """
+
+        probe = False
+
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure = self.clock()
+
+            if self._state == self.HALF_OPEN or \
+                    (
+                        self.failure_threshold
+                        and self.consecutive_failures >= self.failure_threshold
+                    ):
+                if self._state != self.OPEN:
+                    self.trips += 1
+
+                self._state = self.OPEN
+                self._opened = self.clock()
+
+                probe = self.probe is not None and not self._probing
+
+                if probe:
+                    self._probing = True
+
+        if probe:
+            threading.Thread(target=self._run_probe, daemon=True).start()
+
+    def reset(self):
+        """
+        Close the breaker, forgetting any failures
+        """
+
+        with self._lock:
+            self.consecutive_failures = 0
+            self._state = self.CLOSED
+
+    def stats(self):
+        """
+        Returns the health counters as a dict
+        """
+
+        return \
+        {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'successes': self.successes,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'trips': self.trips,
+            'probes': self.probes,
+            'last_success': self.last_success,
+            'last_failure': self.last_failure,
+            'rtt': self.rtt,
+        }
+
+    def _run_probe(self):
+        """
+        Probe the Bulb until it answers (or the breaker closes otherwise)
+        """
+
+        try:
+            while self._state != self.CLOSED:
+                self.probes += 1
+
+                try:
+                    reachable = self.probe()
+                except Exception:
+                    reachable = False
+
+                if reachable:
+                    self.reset()
+
+                    break
+
+                time.sleep(self.probe_interval)
+        finally:
+            with self._lock:
+                self._probing = False
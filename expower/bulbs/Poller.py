@@ -0,0 +1,454 @@
+from .. import constants
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+"""
+Imports:
+    ..constants
+    concurrent.futures
+    heapq
+    itertools
+    logging
+    threading
+    time
+
+Contains:
+    <Poller>
+"""
+
+log = logging.getLogger(__name__)
+
+class Poller(object):
+    """
+    Polls the status() of a fleet of Bulbs which can't push their
+    ... changes, each at its own, adaptive, interval
+
+    A Bulb whose status just changed is polled every {min_interval}
+    ... seconds. Each poll which finds nothing new stretches its
+    ... interval by {backoff}, up to {max_interval}. A Bulb which fails
+    ... to answer is put back to {offline_interval}, doubling with each
+    ... failure up to {max_offline_interval}, so offline Bulbs only
+    ... take up the polls left over
+
+    Every Bulb waits in a single timer heap, which one scheduler thread
+    ... works through, handing due polls to a thread pool of
+    ... {concurrency} workers. However many Bulbs are due, no more than
+    ... {rate} polls are started per second
+
+    With {queued}, polls go through each Bulb's command_queue in the
+    ... BACKGROUND lane, so interactive commands run first. A poll
+    ... superseded by a write is simply retried after {min_interval}
+
+    E.g:
+        >>> with expower.Poller(bulbs, on_change = print):
+        ...     time.sleep(60)
+        <Bulb(...)> {'device_id': '...', 'dps': [False, ...]}
+    """
+
+    def __init__ \
+            (
+                self,
+                bulbs = (),
+                min_interval = constants.networking.POLL_MIN_INTERVAL,
+                max_interval = constants.networking.POLL_MAX_INTERVAL,
+                offline_interval = constants.networking.POLL_OFFLINE_INTERVAL,
+                max_offline_interval = constants.networking.POLL_MAX_OFFLINE_INTERVAL,
+                backoff = constants.networking.POLL_BACKOFF,
+                rate = constants.networking.POLL_RATE,
+                concurrency = 32,
+                queued = False,
+                on_change = None,
+                on_error = None,
+                clock = time.monotonic,
+            ):
+        """
+        Initialise self
+
+        :param(iterable) bulbs - <Bulb> and/or <BulbDevice> instances
+        :param(float) min_interval - Seconds between polls of a Bulb
+            ... which just changed
+        :param(float) max_interval - Most seconds between polls of a
+            ... Bulb which is up
+        :param(float) offline_interval - Seconds between polls of a Bulb
+            ... which just failed to answer
+        :param(float) max_offline_interval - Most seconds between polls
+            ... of a Bulb which keeps failing to answer
+        :param(float) backoff - Factor an unchanged Bulb's interval
+            ... grows by with each poll
+        :param(float) rate - Most polls started per second, across every
+            ... Bulb, None for no limit
+        :param(int) concurrency - Most polls in flight at once
+        :param(bool) queued - Poll through each Bulb's <CommandQueue>
+            ... at BACKGROUND priority
+        :param(function) on_change - Called with the Bulb and its new
+            ... status whenever a poll finds it has changed
+        :param(function) on_error - Called with the Bulb and the
+            ... exception whenever a poll fails
+        :param(function) clock - Returns the current time (seconds)
+
+        :returns - None
+        """
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.offline_interval = offline_interval
+        self.max_offline_interval = max_offline_interval
+        self.backoff = backoff
+        self.rate = rate
+        self.concurrency = concurrency
+        self.queued = queued
+        self.on_change = on_change
+        self.on_error = on_error
+        self.clock = clock
+
+        self.polls = 0
+        self.changes = 0
+        self.failures = 0
+        self.superseded = 0
+
+        self._entries = {}
+        self._heap = [] # (due, sequence, entry)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._next_start = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._stopping = False
+
+        for bulb in bulbs:
+            self.add(bulb)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <Poller(n bulbs)[running]>
+        """
+
+        status = 'running' if self.running else 'stopped'
+
+        return f'<{self.__class__.__name__}({len(self)} bulbs)[{status}]>'
+
+    def __len__(self):
+        """
+        Returns the number of Bulbs being polled
+        """
+
+        return len(self._entries)
+
+    def __contains__(self, bulb):
+        """
+        Returns whether {bulb} is being polled
+        """
+
+        return bulb in self._entries
+
+    def __enter__(self):
+        """
+        Enter a 'with' block, starting to poll
+        """
+
+        self.start()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Exit a 'with' block, stopping polling
+        """
+
+        self.stop()
+
+    @property
+    def running(self):
+        """
+        Whether self is polling
+        """
+
+        return self._thread is not None
+
+    def add(self, bulb, delay=0):
+        """
+        Start polling {bulb}
+
+        :param(object) bulb - A <Bulb> or <BulbDevice>
+        :param(float) delay - Seconds until the first poll
+
+        :returns - None
+        """
+
+        with self._condition:
+            if bulb in self._entries:
+                return
+
+            entry = _Entry(bulb, self.min_interval)
+
+            self._entries[bulb] = entry
+
+            self._schedule(entry, delay)
+
+    def remove(self, bulb):
+        """
+        Stop polling {bulb} (a poll already in flight still completes)
+
+        :returns - None
+        """
+
+        with self._condition:
+            entry = self._entries.pop(bulb, None)
+
+            if entry is not None:
+                entry.removed = True
+
+    def poll_now(self, bulb):
+        """
+        Poll {bulb} as soon as the rate limit allows, e.g. after it was
+        ... changed from elsewhere, and go back to its shortest interval
+
+        :returns - None
+        """
+
+        with self._condition:
+            entry = self._entries.get(bulb)
+
+            if entry is None:
+                return
+
+            entry.interval = self.min_interval
+
+            if not entry.polling:
+                self._schedule(entry, 0)
+
+    def interval(self, bulb):
+        """
+        Returns the seconds between polls of {bulb}, as things stand
+        """
+
+        return self._entries[bulb].interval
+
+    def start(self):
+        """
+        Start polling on a background thread
+
+        :returns - None
+        """
+
+        if self.running:
+            return
+
+        self._stopping = False
+
+        self._executor = executor = concurrent.futures.ThreadPoolExecutor \
+        (
+            max_workers = self.concurrency,
+            thread_name_prefix = self.__class__.__name__,
+        )
+
+        self._thread = threading.Thread(target=self._run, args=(executor,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop polling (without waiting on slow Bulbs)
+
+        :returns - None
+        """
+
+        thread, executor = self._thread, self._executor
+
+        if thread is None or executor is None:
+            return
+
+        with self._condition:
+            self._stopping = True
+
+            self._condition.notify_all()
+
+        thread.join()
+        self._thread = None
+
+        executor.shutdown(wait=False)
+        self._executor = None
+
+    def stats(self):
+        """
+        Returns the poller counters as a dict
+        """
+
+        with self._condition:
+            offline = sum(entry.failures > 0 for entry in self._entries.values())
+
+            return \
+            {
+                'bulbs': len(self._entries),
+                'offline': offline,
+                'in_flight': self._in_flight,
+                'polls': self.polls,
+                'changes': self.changes,
+                'failures': self.failures,
+                'superseded': self.superseded,
+            }
+
+    def _schedule(self, entry, delay):
+        """
+        Push {entry} onto the timer heap, due in {delay} seconds
+
+        Any earlier heap item for {entry} is left to be skipped
+        """
+
+        entry.due = self.clock() + delay
+
+        heapq.heappush(self._heap, (entry.due, next(self._sequence), entry))
+
+        self._condition.notify()
+
+    def _run(self, executor):
+        """
+        Start each poll as it falls due, on {executor}, until self.stop
+        ... is called
+        """
+
+        with self._condition:
+            while not self._stopping:
+                if not self._heap:
+                    self._condition.wait()
+
+                    continue
+
+                due, _, entry = self._heap[0]
+
+                if entry.removed or entry.polling or due != entry.due:
+                    heapq.heappop(self._heap) # Stale
+
+                    continue
+
+                now = self.clock()
+                start = max(due, self._next_start)
+
+                if start > now:
+                    self._condition.wait(start - now)
+
+                    continue
+
+                if self._in_flight >= self.concurrency:
+                    self._condition.wait()
+
+                    continue
+
+                heapq.heappop(self._heap)
+
+                entry.polling = True
+                self._in_flight += 1
+
+                if self.rate:
+                    self._next_start = now + 1 / self.rate
+
+                executor.submit(self._poll, entry)
+
+    def _poll(self, entry):
+        """
+        Poll {entry}'s Bulb, then work out its next interval and
+        ... reschedule it
+        """
+
+        bulb = entry.bulb
+
+        status = dps = error = None
+        superseded = False
+
+        try:
+            if self.queued:
+                queue = bulb.command_queue()
+
+                status = queue.submit \
+                (
+                    'status',
+                    priority = queue.BACKGROUND,
+                    supersedable = True,
+                ).result()
+            else:
+                status = bulb.status()
+
+            if not status:
+                raise ConnectionResetError('no status received')
+
+            dps = status.get(constants.status_keys.DPS)
+        except concurrent.futures.CancelledError:
+            superseded = True # A write got there first
+        except Exception as exception:
+            error = exception
+
+        changed = False
+
+        with self._condition:
+            self.polls += 1
+
+            if superseded:
+                self.superseded += 1
+
+                entry.interval = self.min_interval
+            elif error is not None:
+                self.failures += 1
+
+                entry.failures += 1
+
+                entry.interval = min \
+                (
+                    self.offline_interval * 2 ** (entry.failures - 1),
+                    self.max_offline_interval,
+                )
+            else:
+                changed = entry.failures > 0 or dps != entry.dps
+
+                entry.dps = dps
+                entry.failures = 0
+
+                if changed:
+                    entry.interval = self.min_interval
+                else:
+                    entry.interval = min(entry.interval * self.backoff, self.max_interval)
+
+            if changed:
+                self.changes += 1
+
+            entry.polling = False
+            self._in_flight -= 1
+
+            if not entry.removed:
+                self._schedule(entry, entry.interval)
+
+            self._condition.notify()
+
+        try:
+            if error is not None:
+                if self.on_error is not None:
+                    self.on_error(bulb, error)
+            elif changed and self.on_change is not None:
+                self.on_change(bulb, status)
+        except Exception:
+            log.exception('Poller callback for %r failed', bulb) # Would vanish into the executor
+
+class _Entry(object):
+    """
+    A Bulb's place in a <Poller>
+    """
+
+    __slots__ = ('bulb', 'interval', 'due', 'dps', 'failures', 'polling', 'removed')
+
+    def __init__(self, bulb, interval):
+        """
+        Initialise self
+        """
+
+        self.bulb = bulb
+        self.interval = interval
+        self.due = None
+        self.dps = None
+        self.failures = 0
+        self.polling = False
+        self.removed = False
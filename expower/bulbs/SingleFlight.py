@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+"""
+Imports:
+    asyncio
+    threading
+
+Contains:
+    <SingleFlight>
+"""
+
+class SingleFlight(object):
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight,
+    ... further calls for the same key wait for it and share its
+    ... result (or exception) rather than making their own
+
+    E.g:
+        >>> flights = SingleFlight()
+        >>> flights.run('status', read_status) # From many threads at once
+        {...}
+    """
+
+    def __init__(self):
+        """
+        Initialise self
+
+        :returns - None
+        """
+
+        self.leaders = 0
+        self.joined = 0
+
+        self._flights = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <SingleFlight(n in flight)>
+        """
+
+        return f'<{self.__class__.__name__}({len(self._flights) + len(self._tasks)} in flight)>'
+
+    def run(self, key, func):
+        """
+        Call {func}, unless a call for {key} is already in flight, in
+        ... which case wait for that call instead
+
+        :param(hashable) key - What the call is for
+        :param(function) func - Makes the call
+
+        :returns - What {func} returned
+
+        Raises whatever {func} raised
+        """
+
+        with self._lock:
+            joined = self._flights.get(key)
+
+            if joined is None:
+                flight = self._flights[key] = _Flight()
+
+                self.leaders += 1
+            else:
+                self.joined += 1
+
+        if joined is not None:
+            joined.done.wait()
+
+            if joined.error is not None:
+                raise joined.error
+
+            return joined.result
+
+        try:
+            flight.result = func()
+        except BaseException as error:
+            flight.error = error
+
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+            flight.done.set()
+
+        return flight.result
+
+    async def run_async(self, key, func):
+        """
+        Async equivalent of self.run
+
+        The call runs as a task of its own, so one caller being
+        ... cancelled (e.g. timing out) doesn't cancel it for the others
+
+        :param(hashable) key - What the call is for
+        :param(function) func - Returns an awaitable which makes the call
+
+        :returns - What {func}'s awaitable returned
+        """
+
+        task = self._tasks.get(key)
+
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+
+            def land(task):
+                """
+                Nested callback to forget {task} once it's done
+
+                Level: run_async.land
+                """
+
+                if self._tasks.get(key) is task:
+                    del self._tasks[key]
+
+                if not task.cancelled():
+                    task.exception() # Retrieved, even if every caller gave up
+
+            task.add_done_callback(land)
+
+            self.leaders += 1
+        else:
+            self.joined += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """
+        Returns the counters as a dict
+        """
+
+        return \
+        {
+            'leaders': self.leaders,
+            'joined': self.joined,
+        }
+
+class _Flight(object):
+    """
+    A call in flight in a <SingleFlight>
+    """
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        """
+        Initialise self
+        """
+
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -0,0 +1,127 @@
+import collections.abc
+
+"""
+Imports:
+    collections.abc
+
+Contains:
+    <State>
+"""
+
+class State(collections.abc.Mapping):
+    """
+    Read-only mapping of a Bulb's state, decoded on access
+
+    Holds each field's raw (schema) value and only decodes a field
+    ... the first time it is looked up, keeping the result. So reading
+    ... the brightness never decodes the colour or the flash scenes
+
+    Supports the usual (read-only) dict access, e.g:
+        >>> state = bulb.state()
+        >>> state['brightness']
+        100
+        >>> state.get('colour')
+        (50, 10, 50)
+    """
+
+    __slots__ = ('_raw', '_decoders', '_values')
+
+    def __init__(self, raw, decoders=None):
+        """
+        Initialise self
+
+        :param(dict) raw - Raw value of each field
+        :param(dict) decoders - Function to decode each field with
+            ... Fields without one (or whose raw value is None) are
+            ... returned as is
+
+        :returns - None
+        """
+
+        self._raw = raw
+        self._decoders = decoders or {}
+        self._values = {}
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <State({...})>
+
+        Note: This decodes every field
+        """
+
+        return f'<{self.__class__.__name__}({self.to_dict()!r})>'
+
+    def __getitem__(self, key):
+        """
+        Return field {key}, decoding it on first access
+        """
+
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        value = self._raw[key]
+
+        decoder = self._decoders.get(key, None)
+
+        if decoder is not None and value is not None:
+            value = decoder(value)
+
+        self._values[key] = value
+
+        return value
+
+    def __iter__(self):
+        """
+        Iterate over the field names
+        """
+
+        return iter(self._raw)
+
+    def __len__(self):
+        """
+        Returns the number of fields
+        """
+
+        return len(self._raw)
+
+    def diff(self, other):
+        """
+        Find the fields which differ from {other}'s
+
+        Fields are compared raw, so only the fields which changed get
+        ... decoded
+
+        :param(State) other - Earlier state (None for no state)
+
+        :returns(dict) - Each changed field's (decoded) value
+            ... (nested States as dicts)
+        """
+
+        changes = {}
+
+        for key, raw in self._raw.items():
+            if other is not None and key in other._raw and other._raw[key] == raw:
+                continue
+
+            value = self[key]
+
+            changes[key] = value.to_dict() if isinstance(value, State) else value
+
+        return changes
+
+    def to_dict(self):
+        """
+        Decode every field into a plain dict (nested States included)
+
+        :returns(dict) - The state, as state() used to return it
+        """
+
+        return \
+        {
+            key: value.to_dict() if isinstance(value, State) else value
+                for key, value in self.items()
+        }
@@ -0,0 +1,234 @@
+from .. import constants
+import threading
+import time
+
+"""
+Imports:
+    ..constants
+    threading
+    time
+
+Contains:
+    <StateCache>
+"""
+
+class StateCache(object):
+    """
+    Caches a Bulb's (decoded) status, which state() and schema()
+    ... are derived from
+
+    A cached status is fresh for {ttl} seconds. Once stale it is either
+    ... dropped, or (with {stale_while_revalidate}) still served while
+    ... a background refresh fetches a new one
+
+    Every write to the Bulb bumps self.generation, so a read which was
+    ... already in flight can't store a status from before the write
+
+    The cached status doubles as the Bulb's local dps model: writes (and
+    ... dps the Bulb pushes) are applied to it, so it is kept even
+    ... while caching is disabled
+    """
+
+    def __init__(self, ttl=0, stale_while_revalidate=False, clock=time.monotonic):
+        """
+        Initialise self
+
+        :param(float) ttl - Seconds a cached status stays fresh
+            ... 0 (the default) disables caching
+        :param(bool) stale_while_revalidate - Serve a stale status
+            ... (and refresh it in the background) rather than wait
+        :param(function) clock - Returns the current time (seconds)
+
+        :returns - None
+        """
+
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.clock = clock
+
+        self.generation = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._value = None
+        self._updated = None
+        self._revalidating = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <StateCache(ttl=..., stale_while_revalidate=...)>
+        """
+
+        return \
+        (
+            f'<{self.__class__.__name__}('
+            f'ttl={self.ttl},'
+            f'stale_while_revalidate={self.stale_while_revalidate}'
+            ')>'
+        )
+
+    @property
+    def enabled(self):
+        """
+        Whether the cache serves anything at all
+        """
+
+        return self.ttl > 0 or self.stale_while_revalidate
+
+    @property
+    def value(self):
+        """
+        The cached status, fresh or not (None if empty)
+        """
+
+        return self._value
+
+    @property
+    def age(self):
+        """
+        Seconds since the cached status was stored (None if empty)
+        """
+
+        updated = self._updated
+
+        if updated is None:
+            return None
+
+        return self.clock() - updated
+
+    @property
+    def hit_ratio(self):
+        """
+        Fraction of lookups served from the cache (fresh or stale)
+        """
+
+        lookups = self.hits + self.stale_hits + self.misses
+
+        if not lookups:
+            return 0.0
+
+        return (self.hits + self.stale_hits) / lookups
+
+    def get(self):
+        """
+        Look up the cached status
+
+        :returns(tuple) - (status, fresh)
+            ... status is None on a miss
+        """
+
+        with self._lock:
+            if self.enabled and self._value is not None:
+                if self.clock() - self._updated <= self.ttl:
+                    self.hits += 1
+
+                    return self._value, True
+
+                if self.stale_while_revalidate:
+                    self.stale_hits += 1
+
+                    return self._value, False
+
+            self.misses += 1
+
+            return None, False
+
+    def set(self, value, generation=None):
+        """
+        Store {value} as the cached status
+
+        :param(dict) value - Decoded status
+        :param(int) generation - self.generation when {value} was
+            ... requested, it is discarded if a write happened since
+
+        :returns(bool) - Whether {value} was stored
+        """
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+
+            self._value = value
+            self._updated = self.clock()
+
+            return True
+
+    def apply(self, dps):
+        """
+        Write {dps} through to the cached status
+
+        :param(dict) dps - dps the Bulb has taken on
+
+        :returns(bool) - Whether there was a status to apply {dps} to
+        """
+
+        with self._lock:
+            self.generation += 1
+
+            if self._value is None:
+                return False
+
+            self._value = \
+            {
+                **self._value,
+                constants.status_keys.DPS: \
+                {
+                    **self._value.get(constants.status_keys.DPS, {}),
+                    **dps,
+                },
+            }
+            self._updated = self.clock()
+
+            return True
+
+    def invalidate(self):
+        """
+        Drop the cached status, e.g. after a write
+        """
+
+        with self._lock:
+            self.generation += 1
+
+            self._value = None
+            self._updated = None
+
+    def begin_revalidate(self):
+        """
+        Claim the (single) background refresh
+
+        :returns(bool) - False if a refresh is already running
+        """
+
+        with self._lock:
+            if self._revalidating:
+                return False
+
+            self._revalidating = True
+
+            return True
+
+    def end_revalidate(self):
+        """
+        Release the background refresh claimed by self.begin_revalidate
+        """
+
+        with self._lock:
+            self._revalidating = False
+
+    def stats(self):
+        """
+        Returns the cache counters as a dict
+        """
+
+        return \
+        {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio,
+        }
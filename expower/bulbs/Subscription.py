@@ -0,0 +1,83 @@
+"""
+Contains:
+    <Subscription>
+"""
+
+class Subscription(object):
+    """
+    A callback receiving a Bulb's state changes, as returned by subscribe
+
+    The callback is called with a dict of just the state fields which
+    ... changed (decoded, as in state()), whether the Bulb pushed them
+    ... or they were read or written through the same <BulbDevice>
+
+    E.g:
+        >>> with bulb.subscribe(print):
+        ...     time.sleep(60)
+        {'on': False}
+        {'on': True, 'brightness': 40}
+    """
+
+    def __init__(self, device, callback):
+        """
+        Initialise self
+
+        :param(BulbDevice) device - Bulb subscribed to
+        :param(function) callback - Called with each dict of changes
+
+        :returns - None
+        """
+
+        self.device = device
+        self.callback = callback
+
+        self.deliveries = 0
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <Subscription(callback)[active]>
+        """
+
+        status = 'active' if self.active else 'closed'
+
+        return f'<{self.__class__.__name__}({self.callback!r})[{status}]>'
+
+    def __enter__(self):
+        """
+        Enter a 'with' block
+        """
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Exit a 'with' block, closing the subscription
+        """
+
+        self.close()
+
+    @property
+    def active(self):
+        """
+        Whether self still receives changes
+        """
+
+        return self.device._is_subscribed(self)
+
+    def close(self):
+        """
+        Stop receiving changes
+        """
+
+        self.device._unsubscribe(self)
+
+    def deliver(self, changes):
+        """
+        Call self.callback with {changes}
+        """
+
+        self.deliveries += 1
+
+        self.callback(changes)
@@ -0,0 +1,300 @@
+from .. import pytuya
+from .. import constants
+
+"""
+Imports:
+    ..pytuya
+    ..constants
+
+Contains:
+    <Transaction>
+"""
+
+class Transaction(object):
+    """
+    Collects many <BulbDevice> operations into a single SET
+
+    Operations are queued and only run on commit, when every dps they
+    ... write is merged into one payload and sent in one frame (the
+    ... Bulb's state is read at most once, for those that need it)
+
+    Later operations win where two write the same dps, and reads see
+    ... the writes queued before them
+
+    E.g:
+        >>> with bulb.transaction() as transaction:
+        ...     transaction.turn_on().set_brightness(50)
+        ...     transaction.edit_soft(speed = 20)
+        >>> transaction.result
+        b'...'
+
+    Note: Invalid values raise ValueError on commit, not when queued
+    """
+
+    def __init__(self, device, execute=None):
+        """
+        Initialise self
+
+        :param(BulbDevice) device - Bulb to run operations against
+        :param(function) execute - Runs an operation on the Bulb
+            ... Defaults to device._execute
+            ... (<AsyncBulbDevice> passes its own, making commit awaitable)
+
+        :returns - None
+        """
+
+        if execute is None:
+            execute = device._execute
+
+        self.device = device
+        self.result = None
+
+        self._execute = execute
+        self._operations = []
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <Transaction(n operations)>
+        """
+
+        return f'<{self.__class__.__name__}({len(self)} operations)>'
+
+    def __len__(self):
+        """
+        Returns the number of queued operations
+        """
+
+        return len(self._operations)
+
+    def __enter__(self):
+        """
+        Enter a 'with' block
+        """
+
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        """
+        Exit a 'with' block, committing unless an exception was raised
+        """
+
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    async def __aenter__(self):
+        """
+        Enter an 'async with' block
+        """
+
+        return self
+
+    async def __aexit__(self, exc_type, *exc_info):
+        """
+        Exit an 'async with' block, committing unless an exception was raised
+        """
+
+        if exc_type is None:
+            await self.commit()
+        else:
+            self.discard()
+
+    def commit(self):
+        """
+        Run the queued operations and send their writes as one SET
+
+        :returns(bytes) - Bulb response (None if nothing was written)
+            ... Awaitable when created by <AsyncBulbDevice>
+        """
+
+        operations, self._operations = self._operations, []
+
+        result = self._execute(self._commit(operations))
+
+        if hasattr(result, '__await__'):
+            return self._await_result(result)
+
+        self.result = result
+
+        return result
+
+    def discard(self):
+        """
+        Drop the queued operations without running them
+        """
+
+        for operation in self._operations:
+            operation.close()
+
+        self._operations = []
+
+    def set_colour(self, r=None, g=None, b=None):
+        """
+        Queue self.device.set_colour
+        """
+
+        return self._queue(self.device._set_colour(r, g, b))
+
+    def set_temperature(self, temperature):
+        """
+        Queue self.device.set_temperature
+        """
+
+        return self._queue(self.device._set_temperature(temperature))
+
+    def set_brightness(self, brightness):
+        """
+        Queue self.device.set_brightness
+        """
+
+        return self._queue(self.device._set_brightness(brightness))
+
+    def set_white(self, brightness=None, temperature=None):
+        """
+        Queue self.device.set_white
+        """
+
+        return self._queue(self.device._set_white(brightness, temperature))
+
+    def set_scene(self, scene=0):
+        """
+        Queue self.device.set_scene
+        """
+
+        return self._queue(self.device._set_scene(scene))
+
+    def turn_on(self, switch=1):
+        """
+        Queue self.device.turn_on
+        """
+
+        return self._queue(self.device._set_status(True, switch))
+
+    def turn_off(self, switch=1):
+        """
+        Queue self.device.turn_off
+        """
+
+        return self._queue(self.device._set_status(False, switch))
+
+    def edit_soft(self, saturation=None, brightness=None, speed=None, colour=None):
+        """
+        Queue self.device.edit_soft
+        """
+
+        return self._queue \
+        (
+            self.device._edit_soft(saturation, brightness, speed, colour)
+        )
+
+    def edit_colourful(self, saturation=None, brightness=None, speed=None, colours=()):
+        """
+        Queue self.device.edit_colourful
+        """
+
+        return self._queue \
+        (
+            self.device._edit_colourful(saturation, brightness, speed, colours)
+        )
+
+    def edit_exciting(self, saturation=None, brightness=None, speed=None, colour=None):
+        """
+        Queue self.device.edit_exciting
+        """
+
+        return self._queue \
+        (
+            self.device._edit_exciting(saturation, brightness, speed, colour)
+        )
+
+    def edit_wonderful(self, saturation=None, brightness=None, speed=None, colours=()):
+        """
+        Queue self.device.edit_wonderful
+        """
+
+        return self._queue \
+        (
+            self.device._edit_wonderful(saturation, brightness, speed, colours)
+        )
+
+    def _queue(self, operation):
+        """
+        Queue {operation} to run on commit
+
+        :returns(Transaction) - self, so calls can be chained
+        """
+
+        self._operations.append(operation)
+
+        return self
+
+    def _commit(self, operations):
+        """
+        Operation behind self.commit
+
+        Runs each of {operations}, collecting the dps they write
+        ... and answering their status reads from a single read
+        ... with the collected dps laid over it
+        """
+
+        dps = {}
+        status = None
+
+        for operation in operations:
+            response = None
+
+            while True:
+                try:
+                    command, data = operation.send(response)
+                except StopIteration:
+                    break
+
+                if command == pytuya.SET:
+                    dps.update(data)
+
+                    response = None
+                else:
+                    if status is None:
+                        status = yield (command, data)
+
+                    response = self._overlay(status, dps)
+
+        if not dps:
+            return None
+
+        return (yield (pytuya.SET, dps))
+
+    def _overlay(self, status, dps):
+        """
+        Lay {dps} over {status}
+
+        :param(dict) status - Decoded pytuya status
+        :param(dict) dps - dps written so far
+
+        :returns(dict) - Status reflecting {dps}
+        """
+
+        if not dps or not status:
+            return status
+
+        return \
+        {
+            **status,
+            constants.status_keys.DPS: \
+            {
+                **status.get(constants.status_keys.DPS, {}),
+                **dps,
+            },
+        }
+
+    async def _await_result(self, result):
+        """
+        Await {result}, then store it as self.result
+        """
+
+        self.result = await result
+
+        return self.result
@@ -0,0 +1,213 @@
+from .. import pytuya
+from .. import constants
+import logging
+import socket
+import threading
+import time
+
+"""
+Imports:
+    ..pytuya
+    ..constants
+    logging
+    socket
+    threading
+    time
+
+Contains:
+    <Watcher>
+"""
+
+log = logging.getLogger(__name__)
+
+class Watcher(object):
+    """
+    Holds a long-lived connection to a Bulb, on a background thread,
+    ... so the Bulb can push its changes (e.g. from the phone app or a
+    ... wall switch) as they happen
+
+    Reads the Bulb's status on connecting, then sends a heartbeat
+    ... whenever the connection has been quiet for {heartbeat_interval}
+    ... seconds. Every frame received goes to <BulbDevice>._pushed
+
+    A lost connection (or an unanswered heartbeat) is reopened, backing
+    ... off as the <BulbDevice>'s retry_policy says
+    """
+
+    def __init__(self, device, heartbeat_interval=constants.networking.HEARTBEAT_INTERVAL):
+        """
+        Initialise self
+
+        :param(BulbDevice) device - Bulb to watch
+        :param(float) heartbeat_interval - Seconds between heartbeats
+
+        :returns - None
+        """
+
+        self.device = device
+        self.heartbeat_interval = heartbeat_interval
+
+        self.connects = 0
+        self.heartbeats = 0
+        self.frames = 0
+
+        self._connection = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <Watcher(device)[running]>
+        """
+
+        status = 'running' if self.running else 'stopped'
+
+        return f'<{self.__class__.__name__}({self.device!r})[{status}]>'
+
+    @property
+    def running(self):
+        """
+        Whether self is watching the Bulb
+        """
+
+        return self._thread is not None
+
+    def start(self):
+        """
+        Start watching on a background thread
+
+        :returns - None
+        """
+
+        if self.running:
+            return
+
+        self._stop.clear()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching, closing the connection
+
+        :returns - None
+        """
+
+        thread = self._thread
+
+        if thread is None:
+            return
+
+        self._stop.set()
+
+        connection = self._connection
+
+        if connection is not None:
+            connection.close() # Wakes the thread up
+
+        if thread is not threading.current_thread():
+            thread.join()
+
+        self._thread = None
+
+    def stats(self):
+        """
+        Returns the watcher counters as a dict
+        """
+
+        return \
+        {
+            'connects': self.connects,
+            'heartbeats': self.heartbeats,
+            'frames': self.frames,
+        }
+
+    def _run(self):
+        """
+        (Re)connect and watch until self.stop is called
+        """
+
+        failures = 0
+
+        while not self._stop.is_set():
+            try:
+                self._watch()
+
+                failures = 0
+            except OSError:
+                failures += 1
+            except Exception:
+                log.exception('Watching %r failed', self.device) # e.g. a bad frame, keep watching
+
+                failures += 1
+
+            if self._stop.is_set():
+                break
+
+            self._stop.wait(self.device.retry_policy.delay(max(failures, 1)))
+
+    def _watch(self):
+        """
+        Watch the Bulb over a single connection, until it is lost
+
+        Raises OSError if the connection fails
+        """
+
+        device = self.device
+
+        connection = device.connection_pool.connect \
+        (
+            device.address,
+            device.port,
+            device.connection_timeout,
+        )
+
+        self._connection = connection
+        self.connects += 1
+
+        try:
+            if self._stop.is_set():
+                return
+
+            generation = device.cache.generation
+
+            connection.send(device.generate_payload(pytuya.STATUS))
+
+            awaiting_heartbeat = False
+            next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+            while not self._stop.is_set():
+                connection.socket.settimeout(max(next_heartbeat - time.monotonic(), 0.001))
+
+                try:
+                    frame = connection.receive()
+                except socket.timeout:
+                    if awaiting_heartbeat:
+                        raise ConnectionResetError('heartbeat went unanswered')
+
+                    connection.send(device.generate_payload(pytuya.HEARTBEAT))
+
+                    self.heartbeats += 1
+
+                    awaiting_heartbeat = True
+                    next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+                    continue
+
+                if not frame:
+                    return # The Bulb hung up, reconnect
+
+                self.frames += 1
+
+                awaiting_heartbeat = False
+                next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+                if device._pushed(frame, generation):
+                    generation = None # Only the first status answers the request
+        finally:
+            self._connection = None
+
+            connection.close()
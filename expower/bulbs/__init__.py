@@ -1,8 +1,38 @@
 """
 Imports:
+    .Transaction.Transaction
+    .StateCache.StateCache
+    .State.State
+    .DeviceHealth.DeviceHealth
+    .DeviceHealth.CircuitOpenError
+    .CommandQueue.CommandQueue
+    .CommandQueue.QueueFullError
+    .SingleFlight.SingleFlight
+    .Subscription.Subscription
+    .Watcher.Watcher
     .BulbDevice.BulbDevice
     .Bulb.Bulb
+    .AsyncBulbDevice.AsyncBulbDevice
+    .AsyncBulb.AsyncBulb
+    .BulbGroup.BulbGroup
+    .BulbGroup.BulbResult
+    .Poller.Poller
 """
 
+from .Transaction import Transaction
+from .StateCache import StateCache
+from .State import State
+from .DeviceHealth import DeviceHealth
+from .DeviceHealth import CircuitOpenError
+from .CommandQueue import CommandQueue
+from .CommandQueue import QueueFullError
+from .SingleFlight import SingleFlight
+from .Subscription import Subscription
+from .Watcher import Watcher
 from .BulbDevice import BulbDevice
 from .Bulb import Bulb
+from .AsyncBulbDevice import AsyncBulbDevice
+from .AsyncBulb import AsyncBulb
+from .BulbGroup import BulbGroup
+from .BulbGroup import BulbResult
+from .Poller import Poller
@@ -1,6 +0,0 @@
-"""
-Imports:
-    .on_connection_reset.on_connection_reset
-"""
-
-from .on_connection_reset import on_connection_reset
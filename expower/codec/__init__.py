@@ -0,0 +1,12 @@
+"""
+Imports:
+    .tables
+    .levels.*
+    .colour.*
+    .flash_scenes.*
+"""
+
+from . import tables
+from .levels import *
+from .colour import *
+from .flash_scenes import *
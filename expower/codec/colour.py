@@ -0,0 +1,87 @@
+import colorsys
+import struct
+
+"""
+Imports:
+    colorsys
+    struct
+
+Contains:
+    encode_rgb()
+    decode_rgb()
+    encode_colour()
+    decode_colour()
+"""
+
+# colour_data/scene_data: r, g, b, hue (0 to 360), saturation, value
+COLOUR_DATA = struct.Struct('>3BH2B')
+
+def encode_rgb(r, g, b):
+    """
+    Encode an RGB colour as hex
+
+    :param(int) r - Red (0 to 255)
+    :param(int) g - Green (0 to 255)
+    :param(int) b - Blue (0 to 255)
+
+    :returns(str) - Hexvalue in the form {rr}{gg}{bb}
+
+    Raises ValueError if a value is out of range
+    """
+
+    return bytes((int(r), int(g), int(b))).hex()
+
+def decode_rgb(hexvalue):
+    """
+    Decode the leading {rr}{gg}{bb} of {hexvalue}
+
+    :param(str) hexvalue - Hexvalue, e.g. colour_data
+
+    :returns(tuple) - Colour as (r, g, b)
+    """
+
+    return tuple(bytes.fromhex(hexvalue[:6]))
+
+def encode_colour(r, g, b):
+    """
+    Encode an RGB colour as colour_data (or scene_data)
+
+    :param(int) r - Red (0 to 255)
+    :param(int) g - Green (0 to 255)
+    :param(int) b - Blue (0 to 255)
+
+    :returns(str) - Hexvalue in the form {rr}{gg}{bb}{hhhh}{ss}{vv}
+        ... Where the HSV values are scaled to 360 (h) and 255 (s and v)
+
+    Raises ValueError if a value is out of range
+
+    Note: Backs <pytuya.BulbDevice>._rgb_to_hexvalue, with the same output
+    """
+
+    if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+        raise ValueError(f'RGB values must be between 0 and 255, got {(r, g, b)}')
+
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+
+    data = COLOUR_DATA.pack \
+    (
+        int(r),
+        int(g),
+        int(b),
+        int(h * 360),
+        int(s * 255),
+        int(v * 255),
+    )
+
+    return data.hex()
+
+def decode_colour(hexvalue):
+    """
+    Decode colour_data (or scene_data) to an RGB colour
+
+    :param(str) hexvalue - Hexvalue in the form {rr}{gg}{bb}...
+
+    :returns(tuple) - Colour as (r, g, b)
+    """
+
+    return decode_rgb(hexvalue)
@@ -0,0 +1,139 @@
+from .. import constants
+from . import levels
+
+"""
+Imports:
+    ..constants
+    .levels
+
+Contains:
+    encode_one_colour_flash_scene()
+    decode_one_colour_flash_scene()
+    encode_six_colour_flash_scene()
+    decode_six_colour_flash_scene()
+"""
+
+# Byte between the speed and the colour(s): the number of colours
+ONE_COLOUR = 0x01
+SIX_COLOURS = 0x06
+
+def _encode_header(saturation, brightness, speed, colours):
+    """
+    Encode the {br}{sa}{sp}{nc} bytes shared by every flash scene
+
+    :returns(bytes) - The four header bytes
+    """
+
+    return bytes \
+    (
+        (
+            levels.encode_brightness(brightness),
+            levels.encode_saturation(saturation),
+            levels.encode_speed(speed),
+            colours,
+        )
+    )
+
+def _decode_header(data):
+    """
+    Decode the {br}{sa}{sp} bytes shared by every flash scene
+
+    :returns(tuple) - (brightness, saturation, speed)
+    """
+
+    return \
+    (
+        levels.decode_brightness(data[0]),
+        levels.decode_saturation(data[1]),
+        levels.decode_speed(data[2]),
+    )
+
+def encode_one_colour_flash_scene(saturation, brightness, speed, colour):
+    """
+    Encode a one colour flash scene (soft, exciting)
+
+    :param(int) saturation - Saturation (%)
+    :param(int) brightness - Brightness (%)
+    :param(int) speed - Speed (%)
+    :param(tuple[int]) colour - RGB Colour as (r, g, b)
+
+    :returns(str) - Hexvalue in the form {br}{sa}{sp}[01]{rr}{gg}{bb}
+
+    Raises ValueError if a colour value is out of range
+    """
+
+    header = _encode_header(saturation, brightness, speed, ONE_COLOUR)
+
+    return (header + bytes(int(value) for value in colour[:3])).hex()
+
+def decode_one_colour_flash_scene(hexvalue, flipped=False):
+    """
+    Decode a one colour flash scene (soft, exciting)
+
+    :param(str) hexvalue - Hexvalue in the form {br}{sa}{sp}[01]{co}
+    :param(bool) flipped - Whether {co} is {bb}{gg}{rr} (exciting)
+        ... rather than {rr}{gg}{bb}
+
+    :returns(dict) - Decoded {hexvalue} values ({} if malformed)
+    """
+
+    if len(hexvalue) != 14:
+        return {}
+
+    data = bytes.fromhex(hexvalue)
+
+    brightness, saturation, speed = _decode_header(data)
+
+    rgb = tuple(data[6:3:-1] if flipped else data[4:7])
+
+    return \
+    {
+        constants.state_keys.COLOUR: rgb,
+        constants.state_keys.SPEED: speed,
+        constants.state_keys.BRIGHTNESS: brightness,
+        constants.state_keys.SATURATION: saturation,
+    }
+
+def encode_six_colour_flash_scene(saturation, brightness, speed, colours):
+    """
+    Encode a six colour flash scene (colourful, wonderful)
+
+    :param(int) saturation - Saturation (%)
+    :param(int) brightness - Brightness (%)
+    :param(int) speed - Speed (%)
+    :param(list[tuple[int]]) colours - Six RGB Colours as (r, g, b)
+
+    :returns(str) - Hexvalue in the form {br}{sa}{sp}[06]{c1}...{c6}
+
+    Raises ValueError if a colour value is out of range
+    """
+
+    header = _encode_header(saturation, brightness, speed, SIX_COLOURS)
+
+    return (header + bytes(int(value) for colour in colours for value in colour[:3])).hex()
+
+def decode_six_colour_flash_scene(hexvalue):
+    """
+    Decode a six colour flash scene (colourful, wonderful)
+
+    :param(str) hexvalue - Hexvalue in the form {br}{sa}{sp}[06]{c1}...{c6}
+
+    :returns(dict) - Decoded {hexvalue} values ({} if malformed)
+    """
+
+    if len(hexvalue) != 44:
+        return {}
+
+    data = bytes.fromhex(hexvalue)
+
+    brightness, saturation, speed = _decode_header(data)
+
+    colours = [tuple(data[index:index + 3]) for index in range(4, 22, 3)]
+
+    return \
+    {
+        constants.state_keys.SPEED: speed,
+        constants.state_keys.BRIGHTNESS: brightness,
+        constants.state_keys.SATURATION: saturation,
+        constants.state_keys.COLOURS: colours,
+    }
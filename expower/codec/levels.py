@@ -0,0 +1,124 @@
+from . import tables
+
+"""
+Imports:
+    .tables
+
+Contains:
+    encode_brightness()
+    decode_brightness()
+    encode_saturation()
+    decode_saturation()
+    encode_speed()
+    decode_speed()
+"""
+
+def _lookup(table, value):
+    """
+    Look {value} up in {table}
+
+    :returns(int) - Table entry, or None if {value} isn't an index of it
+        ... (E.g. a float, or a percentage outside 0 to 100)
+    """
+
+    if value.__class__ is int and 0 <= value < len(table):
+        return table[value]
+
+    return None
+
+def encode_brightness(brightness, u=tables.BRIGHTNESS_OFFSET):
+    """
+    Convert {brightness} (%) to the byte used by the Bulb
+
+    :param(int) brightness - Brightness (%), clamped to 0 to 100
+    :param(float) u - Brightness encoding offset
+
+    :returns(int) - Byte (0 to 255)
+
+    Example:
+        >>> encode_brightness(100)
+        >>> 255
+    """
+
+    if u == tables.BRIGHTNESS_OFFSET:
+        byte = _lookup(tables.BRIGHTNESS_TO_BYTE, brightness)
+
+        if byte is not None:
+            return byte
+
+    return tables.brightness_to_byte(brightness, u)
+
+def decode_brightness(byte, u=tables.BRIGHTNESS_OFFSET):
+    """
+    Convert the Bulb's brightness {byte} to brightness (%)
+
+    :param(int) byte - Byte (0 to 255)
+    :param(float) u - Brightness encoding offset
+
+    :returns(int) - Brightness (%)
+    """
+
+    if u == tables.BRIGHTNESS_OFFSET:
+        return tables.BYTE_TO_BRIGHTNESS[byte]
+
+    return tables.byte_to_brightness(byte, u)
+
+def encode_saturation(saturation, u=tables.SATURATION_OFFSET):
+    """
+    Convert {saturation} (%) to the byte used by the Bulb
+
+    :param(int) saturation - Saturation (%), clamped to 0 to 100
+    :param(float) u - Saturation encoding offset
+
+    :returns(int) - Byte (0 to 255)
+    """
+
+    if u == tables.SATURATION_OFFSET:
+        byte = _lookup(tables.SATURATION_TO_BYTE, saturation)
+
+        if byte is not None:
+            return byte
+
+    return tables.saturation_to_byte(saturation, u)
+
+def decode_saturation(byte, u=tables.SATURATION_OFFSET):
+    """
+    Convert the Bulb's saturation {byte} to saturation (%)
+
+    :param(int) byte - Byte (0 to 255)
+    :param(float) u - Saturation encoding offset
+
+    :returns(int) - Saturation (%)
+    """
+
+    if u == tables.SATURATION_OFFSET:
+        return tables.BYTE_TO_SATURATION[byte]
+
+    return tables.byte_to_saturation(byte, u)
+
+def encode_speed(speed):
+    """
+    Convert {speed} (%) to the byte used by the Bulb
+
+    :param(int) speed - Speed (%), clamped to 0 to 100
+
+    :returns(int) - Byte (1 to 101)
+    """
+
+    byte = _lookup(tables.SPEED_TO_BYTE, speed)
+
+    if byte is not None:
+        return byte
+
+    return tables.speed_to_byte(speed)
+
+def decode_speed(byte):
+    """
+    Convert the Bulb's speed {byte} to speed (%)
+
+    :param(int) byte - Byte (0 to 255)
+
+    :returns(int) - Speed (%)
+    """
+
+    return tables.BYTE_TO_SPEED[byte]
@@ -0,0 +1,67 @@
+"""
+Contains:
+    Lookup tables for the Bulb's brightness, saturation and speed bytes
+"""
+
+# Encoding offsets (brute-forced, see <BulbDevice>._brightness_to_hexvalue)
+BRIGHTNESS_OFFSET = 26.9
+SATURATION_OFFSET = 27
+
+def _in_range(value, min=0, max=100):
+    """
+    Make sure {value} is in range {min} to {max}
+    """
+
+    return max if value > max else min if value < min else value
+
+def brightness_to_byte(brightness, u=BRIGHTNESS_OFFSET):
+    """
+    Convert {brightness} (%) to the byte used by the Bulb
+    """
+
+    return int(u + ((255 - u) / 100) * _in_range(brightness))
+
+def byte_to_brightness(byte, u=BRIGHTNESS_OFFSET):
+    """
+    Convert {byte} to brightness (%)
+    """
+
+    return _in_range(int((byte - u) / ((255 - u) / 100)) + 1)
+
+def saturation_to_byte(saturation, u=SATURATION_OFFSET):
+    """
+    Convert {saturation} (%) to the byte used by the Bulb
+    """
+
+    return int(u + ((255 - u) / 100) * _in_range(saturation) + 0.00001)
+
+def byte_to_saturation(byte, u=SATURATION_OFFSET):
+    """
+    Convert {byte} to saturation (%)
+    """
+
+    return _in_range(int((byte - u) / ((255 - u) / 100) + 0.5))
+
+def speed_to_byte(speed):
+    """
+    Convert {speed} (%) to the byte used by the Bulb
+    """
+
+    return 101 - _in_range(speed)
+
+def byte_to_speed(byte):
+    """
+    Convert {byte} to speed (%)
+    """
+
+    return _in_range(101 - byte)
+
+# E.g. BYTE_TO_BRIGHTNESS[0xff] -> 100
+BYTE_TO_BRIGHTNESS = tuple(byte_to_brightness(byte) for byte in range(256))
+BYTE_TO_SATURATION = tuple(byte_to_saturation(byte) for byte in range(256))
+BYTE_TO_SPEED = tuple(byte_to_speed(byte) for byte in range(256))
+
+# E.g. BRIGHTNESS_TO_BYTE[100] -> 0xff
+BRIGHTNESS_TO_BYTE = tuple(brightness_to_byte(percent) for percent in range(101))
+SATURATION_TO_BYTE = tuple(saturation_to_byte(percent) for percent in range(101))
+SPEED_TO_BYTE = tuple(speed_to_byte(percent) for percent in range(101))
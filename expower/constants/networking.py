@@ -1 +1,16 @@
 MAX_CONNECTION_ATTEMPTS = 5
+RETRY_BACKOFF = 0.1
+RETRY_MAX_BACKOFF = 2
+RETRY_DEADLINE = 15
+FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 30
+PROBE_INTERVAL = 2
+PROBE_TIMEOUT = 1
+HEARTBEAT_INTERVAL = 10
+POLL_MIN_INTERVAL = 1
+POLL_MAX_INTERVAL = 60
+POLL_OFFLINE_INTERVAL = 30
+POLL_MAX_OFFLINE_INTERVAL = 300
+POLL_BACKOFF = 1.5
+POLL_RATE = 20
+COMMAND_QUEUE_DEPTH = 64
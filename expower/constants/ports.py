@@ -1,2 +1,4 @@
 PORT_BULB = 6668
 PORT = 6668
+PORT_DISCOVERY = 6666
+PORT_DISCOVERY_ENCRYPTED = 6667
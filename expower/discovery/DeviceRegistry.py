@@ -0,0 +1,264 @@
+import collections
+import threading
+import time
+
+"""
+Imports:
+    collections
+    threading
+    time
+
+Contains:
+    <DiscoveredDevice>
+    <DeviceRegistry>
+"""
+
+class DiscoveredDevice(collections.namedtuple('DiscoveredDevice', ('device_id', 'ip', 'version', 'product_key', 'encrypted', 'last_seen'))):
+    """
+    Where a device was last heard from
+
+    :attr device_id - Device ID (gwId)
+    :attr ip - IP address the device announced
+    :attr version - Protocol version, e.g. '3.1'
+    :attr product_key - Tuya product key, if announced
+    :attr encrypted - Whether the announcement came encrypted (port 6667)
+    :attr last_seen - Registry clock time of the latest announcement
+    """
+
+    __slots__ = ()
+
+class DeviceRegistry(object):
+    """
+    In-memory registry of discovered devices, keyed by device ID
+
+    Bulbs registered with self.track follow their device around: when
+    ... it turns up at a new IP (e.g. after a DHCP change) the Bulb is
+    ... pointed at the new address
+
+    E.g:
+        >>> registry = DeviceRegistry()
+        >>> registry.track(bulb)
+        >>> with Discovery(registry):
+        ...     ...
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Initialise self
+
+        :param(function) clock - Returns the current time (seconds)
+
+        :returns - None
+        """
+
+        self.clock = clock
+
+        self.moves = 0
+
+        self._devices = {}
+        self._tracked = collections.defaultdict(list)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <DeviceRegistry(n devices)>
+        """
+
+        return f'<{self.__class__.__name__}({len(self)} devices)>'
+
+    def __len__(self):
+        """
+        Returns the number of devices discovered
+        """
+
+        return len(self._devices)
+
+    def __iter__(self):
+        """
+        Iterate over the <DiscoveredDevice>s
+        """
+
+        with self._lock:
+            devices = list(self._devices.values())
+
+        return iter(devices)
+
+    def __contains__(self, device_id):
+        """
+        Returns whether {device_id} has been discovered
+        """
+
+        return device_id in self._devices
+
+    def __getitem__(self, device_id):
+        """
+        Returns the <DiscoveredDevice> for {device_id}
+        """
+
+        return self._devices[device_id]
+
+    def get(self, device_id, default=None):
+        """
+        Returns the <DiscoveredDevice> for {device_id}, or {default}
+        """
+
+        return self._devices.get(device_id, default)
+
+    def update(self, device_id, ip, version=None, product_key=None, encrypted=False):
+        """
+        Record that {device_id} announced itself at {ip}
+
+        Tracked Bulbs not at {ip} are moved to it, and listeners called
+        ... if {device_id} is new or has moved
+
+        :param(str) device_id - Device ID
+        :param(str) ip - IP address
+        :param(str) version - Protocol version
+        :param(str) product_key - Tuya product key
+        :param(bool) encrypted - Whether the announcement was encrypted
+
+        :returns(DiscoveredDevice) - The updated entry
+        """
+
+        device = DiscoveredDevice \
+        (
+            device_id,
+            ip,
+            version,
+            product_key,
+            encrypted,
+            self.clock(),
+        )
+
+        with self._lock:
+            previous = self._devices.get(device_id)
+
+            self._devices[device_id] = device
+
+            moved = previous is not None and previous.ip != ip
+
+            if moved:
+                self.moves += 1
+
+            tracked = list(self._tracked.get(device_id, ()))
+            listeners = list(self._listeners)
+
+        for bulb in tracked:
+            if bulb.host != ip:
+                self._move(bulb, ip)
+
+        if previous is None or moved:
+            for listener in listeners:
+                listener(device, previous)
+
+        return device
+
+    def remove(self, device_id):
+        """
+        Forget {device_id}
+
+        :returns(DiscoveredDevice) - The removed entry, or None
+        """
+
+        with self._lock:
+            return self._devices.pop(device_id, None)
+
+    def expire(self, max_age):
+        """
+        Forget every device not heard from for {max_age} seconds
+
+        :returns(list) - The removed <DiscoveredDevice>s
+        """
+
+        cutoff = self.clock() - max_age
+
+        with self._lock:
+            expired = \
+            [
+                device
+                for device in self._devices.values()
+                if device.last_seen < cutoff
+            ]
+
+            for device in expired:
+                del self._devices[device.device_id]
+
+        return expired
+
+    def track(self, bulb):
+        """
+        Keep {bulb}'s address up to date with its announcements
+
+        :param(object) bulb - A <Bulb>, <BulbDevice>, <AsyncBulb>
+            ... or <AsyncBulbDevice>
+
+        :returns - None
+        """
+
+        with self._lock:
+            self._tracked[bulb.device_id].append(bulb)
+
+            device = self._devices.get(bulb.device_id)
+
+        if device is not None and device.ip != bulb.host:
+            self._move(bulb, device.ip)
+
+    def untrack(self, bulb):
+        """
+        Stop keeping {bulb}'s address up to date
+
+        :returns - None
+        """
+
+        with self._lock:
+            tracked = self._tracked.get(bulb.device_id, [])
+
+            if bulb in tracked:
+                tracked.remove(bulb)
+
+    def add_listener(self, listener):
+        """
+        Call {listener} whenever a device is discovered or moves
+
+        :param(function) listener - Called with the new <DiscoveredDevice>
+            ... and the previous one (None for a new device)
+
+        :returns - None
+        """
+
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Stop calling {listener}
+
+        :returns - None
+        """
+
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    @staticmethod
+    def _move(bulb, ip):
+        """
+        Point {bulb}, and any wrapped <BulbDevice>, at {ip}
+
+        :returns - None
+        """
+
+        device = bulb
+
+        while device is not None:
+            if hasattr(device, 'move'):
+                device.move(ip)
+
+                break
+
+            device.host = ip
+
+            device = getattr(device, 'BulbDevice', None)
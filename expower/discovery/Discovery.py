@@ -0,0 +1,259 @@
+from .. import pytuya
+from .. import constants
+from . import DeviceRegistry
+import logging
+import selectors
+import socket
+import threading
+
+"""
+Imports:
+    ..pytuya
+    ..constants
+    .DeviceRegistry
+    logging
+    selectors
+    socket
+    threading
+
+Contains:
+    <Discovery>
+"""
+
+log = logging.getLogger(__name__)
+
+class Discovery(object):
+    """
+    Listens for the announcements Tuya devices broadcast every few
+    ... seconds (on UDP 6666 in plain JSON, 6667 encrypted) and keeps
+    ... a <DeviceRegistry> of where they are
+
+    E.g:
+        >>> with Discovery() as discovery:
+        ...     time.sleep(10)
+        >>> list(discovery.registry)
+        [DiscoveredDevice(device_id='...', ip='192.168.0.10', ...)]
+    """
+
+    def __init__ \
+            (
+                self,
+                registry = None,
+                ports = \
+                (
+                    constants.ports.PORT_DISCOVERY,
+                    constants.ports.PORT_DISCOVERY_ENCRYPTED,
+                ),
+                address = '',
+            ):
+        """
+        Initialise self
+
+        :param(DeviceRegistry) registry - Registry to keep discovered
+            ... devices in, defaults to a new <DeviceRegistry>
+        :param(tuple) ports - UDP ports to listen on
+        :param(str) address - Address to bind to, defaults to all
+
+        :returns - None
+        """
+
+        if registry is None:
+            registry = DeviceRegistry()
+
+        self.registry = registry
+        self.ports = ports
+        self.address = address
+
+        self.received = 0
+        self.errors = 0
+
+        self._sockets = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object
+        ... in the form:
+            <Discovery(udp://address:ports)[n devices]>
+        """
+
+        ports = ','.join(map(str, self.ports))
+
+        return \
+        (
+            f'<{self.__class__.__name__}(udp://{self.address}:{ports})'
+            f'[{len(self.registry)} devices]>'
+        )
+
+    def __enter__(self):
+        """
+        Enter a 'with' block, starting to listen
+        """
+
+        self.start()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Exit a 'with' block, stopping listening
+        """
+
+        self.stop()
+
+    @property
+    def running(self):
+        """
+        Whether self is listening
+        """
+
+        return self._thread is not None
+
+    def start(self):
+        """
+        Bind self.ports and listen on a background thread
+
+        :returns - None
+        """
+
+        if self.running:
+            return
+
+        self._stop.clear()
+
+        try:
+            for port in self.ports:
+                self._sockets.append(self._bind(port))
+        except OSError:
+            self._close()
+
+            raise
+
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop listening and release self.ports
+
+        :returns - None
+        """
+
+        thread = self._thread
+
+        if thread is None:
+            return
+
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+        self._close()
+
+    def discover(self, duration):
+        """
+        Listen for {duration} seconds
+
+        Devices announce themselves about every 5 seconds
+
+        :param(float) duration - Seconds to listen for
+
+        :returns(DeviceRegistry) - self.registry
+        """
+
+        self.start()
+
+        try:
+            self._stop.wait(duration)
+        finally:
+            self.stop()
+
+        return self.registry
+
+    def handle(self, data, address):
+        """
+        Decode the datagram {data} from {address} and update self.registry
+
+        :param(bytes) data - The datagram
+        :param(tuple) address - (ip, port) it was sent from
+
+        :returns(DiscoveredDevice) - Success: The updated entry
+            ... Failure: None (not a device announcement)
+        """
+
+        self.received += 1
+
+        try:
+            announcement = pytuya.decode_broadcast(data)
+
+            device_id = announcement['gwId']
+        except (ValueError, KeyError, TypeError):
+            self.errors += 1
+
+            return None
+
+        return self.registry.update \
+        (
+            device_id,
+            announcement.get('ip', address[0]),
+            version = announcement.get('version'),
+            product_key = announcement.get('productKey'),
+            encrypted = bool(announcement.get('encrypt', False)),
+        )
+
+    def _bind(self, port):
+        """
+        Returns a UDP socket bound to {port}, shared with other listeners
+        """
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+            if hasattr(socket, 'SO_REUSEPORT'):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.bind((self.address, port))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+
+            raise
+
+        return sock
+
+    def _listen(self):
+        """
+        Handle datagrams until self.stop is called
+        """
+
+        with selectors.DefaultSelector() as selector:
+            for sock in self._sockets:
+                selector.register(sock, selectors.EVENT_READ, sock)
+
+            while not self._stop.is_set():
+                for key, _ in selector.select(0.2):
+                    try:
+                        data, address = key.data.recvfrom(4096)
+                    except (BlockingIOError, InterruptedError):
+                        continue
+
+                    try:
+                        self.handle(data, address)
+                    except Exception:
+                        self.errors += 1
+
+                        log.exception('Handling a datagram from %r failed', address)
+
+    def _close(self):
+        """
+        Close every bound socket
+        """
+
+        for sock in self._sockets:
+            sock.close()
+
+        self._sockets = []
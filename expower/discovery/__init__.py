@@ -0,0 +1,10 @@
+"""
+Imports:
+    .DeviceRegistry.DeviceRegistry
+    .DeviceRegistry.DiscoveredDevice
+    .Discovery.Discovery
+"""
+
+from .DeviceRegistry import DeviceRegistry
+from .DeviceRegistry import DiscoveredDevice
+from .Discovery import Discovery
@@ -9,22 +9,40 @@
 # Tested with Python 2.7 and Python 3.6.1 only
 
 
+import asyncio
 import base64
+import collections
 from hashlib import md5
+import itertools
 import json
 import logging
+import random
+import selectors
 import socket
+import struct
 import sys
+import threading
 import time
-import colorsys
+
+from .. import codec
 
 try:
-    #raise ImportError
     import Crypto
-    from Crypto.Cipher import AES  # PyCrypto
+    from Crypto.Cipher import AES  # PyCryptodome (or PyCrypto)
 except ImportError:
     Crypto = AES = None
+try:
+    from cryptography.hazmat.primitives import ciphers
+    from cryptography.hazmat.primitives.ciphers import algorithms, modes
+except ImportError:
+    ciphers = None
+try:
     import pyaes  # https://github.com/ricmoo/pyaes
+except ImportError:
+    pyaes = None
+
+if Crypto is None and ciphers is None and pyaes is None:
+    raise ImportError('No AES implementation found, install pycryptodome, cryptography or pyaes')
 
 
 version_tuple = (7, 0, 3)
@@ -36,56 +54,145 @@ logging.basicConfig()  # TODO include function name/line numbers in log
 #log.setLevel(level=logging.DEBUG)  # Debug hack!
 
 log.info('Python %s on %s', sys.version, sys.platform)
-if Crypto is None:
-    log.info('Using pyaes version %r', pyaes.VERSION)
-    log.info('Using pyaes from %r', pyaes.__file__)
-else:
-    log.info('Using PyCrypto %r', Crypto.version_info)
-    log.info('Using PyCrypto from %r', Crypto.__file__)
 
 SET = 'set'
+STATUS = 'status'
+HEARTBEAT = 'heartbeat'
 
 PROTOCOL_VERSION_BYTES = b'3.1'
 
+FRAME_PREFIX = b'\x00\x00\x55\xaa'
+FRAME_SUFFIX = b'\x00\x00\xaa\x55'
+FRAME_HEADER = struct.Struct('>4I')  # prefix, sequence number, command, length of the rest
+FRAME_RETCODE = struct.Struct('>I')
+FRAME_SEQNO = struct.Struct('>I')
+MAX_FRAME_LENGTH = 0x10000  # anything claiming to be longer is taken to be garbage
+PUSH_COMMAND = 0x08  # frames the device sends unprompted, e.g. the dps it set after a SET
+STATUS_COMMAND = 0x0a
+HEARTBEAT_COMMAND = 0x09  # keeps a connection open, devices drop quiet ones
+CACHEABLE_TYPES = (str, int, float, bool, type(None))  # dps values FrameEncoder caches frames for
+
 IS_PY2 = sys.version_info[0] == 2
 
-class AESCipher(object):
+class PyCryptodomeAES(object):
+    """AES-ECB (no padding) using PyCryptodome, the key schedule is kept"""
     def __init__(self, key):
+        self._cipher = AES.new(key, AES.MODE_ECB)
+
+    def encrypt(self, data):
+        return self._cipher.encrypt(data)
+
+    def decrypt(self, data):
+        return self._cipher.decrypt(data)
+
+
+class CryptographyAES(object):
+    """AES-ECB (no padding) using cryptography, the key schedule is kept"""
+    def __init__(self, key):
+        cipher = ciphers.Cipher(algorithms.AES(key), modes.ECB())
+        # ECB carries nothing between blocks, so one context can be fed forever
+        self._encryptor = cipher.encryptor()
+        self._decryptor = cipher.decryptor()
+        self._lock = threading.Lock()
+
+    def encrypt(self, data):
+        self._check(data)
+        with self._lock:
+            return self._encryptor.update(data)
+
+    def decrypt(self, data):
+        self._check(data)
+        with self._lock:
+            return self._decryptor.update(data)
+
+    @staticmethod
+    def _check(data):
+        # a partial block would be held back in the context, and spoil every later message
+        if len(data) % 16:
+            raise ValueError('Data must be a multiple of 16 bytes long, not %d' % len(data))
+
+
+class PyaesAES(object):
+    """AES-ECB (no padding) using pure Python pyaes, the key schedule is kept"""
+    def __init__(self, key):
+        self._cipher = pyaes.AESModeOfOperationECB(key)
+
+    def encrypt(self, data):
+        encrypt = self._cipher.encrypt
+        return b''.join(encrypt(data[i:i + 16]) for i in range(0, len(data), 16))
+
+    def decrypt(self, data):
+        decrypt = self._cipher.decrypt
+        return b''.join(decrypt(data[i:i + 16]) for i in range(0, len(data), 16))
+
+
+# Available AES backends, fastest first (for messages the size of a SET,
+# cryptography's per call overhead is lower than PyCryptodome's)
+AES_BACKENDS = collections.OrderedDict(
+    (name, backend) for name, backend, module in (
+        ('cryptography', CryptographyAES, ciphers),
+        ('pycryptodome', PyCryptodomeAES, AES),
+        ('pyaes', PyaesAES, pyaes),
+    ) if module is not None
+)
+default_aes_backend = next(iter(AES_BACKENDS))
+log.info('Using AES backend %r (available: %r)', default_aes_backend, list(AES_BACKENDS))
+
+class AESCipher(object):
+    def __init__(self, key, backend=None):
+        """
+        AES-ECB with PKCS#7 padding and base64, as the devices expect.
+
+        The backend (and so the key schedule) is set up once, so keep the
+        AESCipher around rather than making one per message.
+
+        Args:
+            key (bytes): The device's local key.
+            backend (str, optional): One of AES_BACKENDS.
+                Defaults to `default_aes_backend`, the fastest available.
+        """
         #self.bs = 32  # 32 work fines for ON, does not work for OFF. Padding different compared to js version https://github.com/codetheweb/tuyapi/
         self.bs = 16
         self.key = key
+        self.backend = backend or default_aes_backend
+        self._cipher = AES_BACKENDS[self.backend](key)
+
+    def __repr__(self):
+        return '%s(backend=%r)' % (self.__class__.__name__, self.backend)
+
     def encrypt(self, raw):
-        if Crypto:
-            raw = self._pad(raw)
-            cipher = AES.new(self.key, mode=AES.MODE_ECB)
-            crypted_text = cipher.encrypt(raw)
-        else:
-            _ = self._pad(raw)
-            cipher = pyaes.blockfeeder.Encrypter(pyaes.AESModeOfOperationECB(self.key))  # no IV, auto pads to 16
-            crypted_text = cipher.feed(raw)
-            crypted_text += cipher.feed()  # flush final block
-        #print('crypted_text %r' % crypted_text)
-        #print('crypted_text (%d) %r' % (len(crypted_text), crypted_text))
-        crypted_text_b64 = base64.b64encode(crypted_text)
-        #print('crypted_text_b64 (%d) %r' % (len(crypted_text_b64), crypted_text_b64))
-        return crypted_text_b64
+        """Encrypt bytes `raw`, returning base64 encoded bytes"""
+        crypted_text = self._cipher.encrypt(self._pad(raw))
+        return base64.b64encode(crypted_text)
+
+    def encrypt_many(self, raws):
+        """
+        Encrypt each of `raws` with a single call into the backend.
+
+        ECB encrypts every block on its own, so the padded messages can be
+        encrypted as one buffer and split up again afterwards.
+
+        Args:
+            raws(list): Messages (bytes) to encrypt.
+
+        Returns:
+            list: base64 encoded bytes, one per message.
+        """
+        padded = [self._pad(raw) for raw in raws]
+        crypted = memoryview(self._cipher.encrypt(b''.join(padded)))
+        result = []
+        start = 0
+        for message in padded:
+            end = start + len(message)
+            result.append(base64.b64encode(crypted[start:end]))
+            start = end
+        return result
+
     def decrypt(self, enc):
-        enc = base64.b64decode(enc)
-        #print('enc (%d) %r' % (len(enc), enc))
-        #enc = self._unpad(enc)
-        #enc = self._pad(enc)
-        #print('upadenc (%d) %r' % (len(enc), enc))
-        if Crypto:
-            cipher = AES.new(self.key, AES.MODE_ECB)
-            raw = cipher.decrypt(enc)
-            #print('raw (%d) %r' % (len(raw), raw))
-            return self._unpad(raw).decode('utf-8')
-            #return self._unpad(cipher.decrypt(enc)).decode('utf-8')
-        else:
-            cipher = pyaes.blockfeeder.Decrypter(pyaes.AESModeOfOperationECB(self.key))  # no IV, auto pads to 16
-            plain_text = cipher.feed(enc)
-            plain_text += cipher.feed()  # flush final block
-            return plain_text
+        """Decrypt base64 encoded `enc`, returning str (on every backend)"""
+        raw = self._cipher.decrypt(base64.b64decode(enc))
+        return self._unpad(raw).decode('utf-8')
+
     def _pad(self, s):
         padnum = self.bs - len(s) % self.bs
         return s + padnum * chr(padnum).encode()
@@ -123,13 +230,1123 @@ payload_dict = {
       "hexByte": "07",
       "command": {"devId": "", "uid": "", "t": ""}
     },
-    "prefix": "000055aa00000000000000",    # Next byte is command byte ("hexByte") some zero padding, then length of remaining payload, i.e. command + suffix (unclear if multiple bytes used for length, zero padding implies could be more than one byte)
+    "heartbeat": {
+      "hexByte": "09",
+      "command": {}
+    },
+    "prefix": "000055aa00000000000000",    # Magic, a 4 byte sequence number (filled in by FrameEncoder), then zero padding. Next byte is command byte ("hexByte"), then the 4 byte length of remaining payload, i.e. command + suffix
     "suffix": "000000000000aa55"
   }
 }
 
+Frame = collections.namedtuple('Frame', ('seqno', 'command', 'retcode', 'payload'))
+
+def unpack_frame(data):
+    """
+    Split a complete frame, as produced by FrameParser, into its fields.
+
+    Frames from the device usually carry a 4 byte return code ahead of the
+    payload; it is split off when present.
+
+    Args:
+        data(bytes): A complete frame.
+
+    Returns:
+        Frame: (seqno, command, retcode, payload), retcode is None if absent.
+    """
+    _, seqno, command, length = FRAME_HEADER.unpack_from(data)
+    payload = data[FRAME_HEADER.size:FRAME_HEADER.size + length - 8]  # drop CRC and suffix
+    retcode = None
+    if len(payload) >= FRAME_RETCODE.size:
+        code, = FRAME_RETCODE.unpack_from(payload)
+        if code & 0xffffff00 == 0:  # a payload starts with '{' or '3.1', never with zero bytes
+            retcode = code
+            payload = payload[FRAME_RETCODE.size:]
+    return Frame(seqno, command, retcode, payload)
+
+
+def stamp_seqno(frame, seqno):
+    """Return a copy of the complete frame `frame` with sequence number `seqno`"""
+    return frame[:4] + FRAME_SEQNO.pack(seqno) + frame[8:]
+
+
+def pack_frame(seqno, command, payload, retcode=None):
+    """
+    Build a complete frame around `payload`, the inverse of unpack_frame.
+
+    Args:
+        seqno(int): Sequence number.
+        command(int): Command number, e.g. 0x0a for status.
+        payload(bytes): The payload.
+        retcode(int, optional): Return code to put ahead of the payload, as
+            the device does in its replies. Defaults to None (no code).
+    """
+    if retcode is not None:
+        payload = FRAME_RETCODE.pack(retcode) + payload
+    return FRAME_HEADER.pack(0x55aa, seqno, command, len(payload) + 8) + payload + bytes(4) + FRAME_SUFFIX
+
+
+# Devices announce themselves on UDP 6666 in plain JSON, and on 6667 encrypted with this key
+UDP_KEY = md5(b'yGAdlopoPVldABfn').digest()
+_udp_cipher = None
+
+def decode_broadcast(data):
+    """
+    Decode a discovery broadcast, as devices send every few seconds.
+
+    Args:
+        data(bytes): The datagram, a single frame.
+
+    Returns:
+        dict: The announcement, e.g. {'ip': ..., 'gwId': ..., 'version': '3.1', ...}.
+
+    Raises:
+        ValueError: `data` is not a discovery broadcast.
+    """
+    global _udp_cipher
+    if len(data) < FRAME_HEADER.size + 8 or not data.startswith(FRAME_PREFIX):
+        raise ValueError('not a frame: %r' % data[:FRAME_HEADER.size])
+    payload = unpack_frame(data).payload
+    try:
+        return json.loads(payload.decode('utf-8'))
+    except ValueError:
+        pass
+    if _udp_cipher is None:
+        _udp_cipher = AES_BACKENDS[default_aes_backend](UDP_KEY)
+    payload = AESCipher._unpad(_udp_cipher.decrypt(payload))
+    return json.loads(payload.decode('utf-8'))
+
+
+class FrameParser(object):
+    def __init__(self, size=1024):
+        """
+        Incrementally splits a byte stream into complete frames.
+
+        Bytes are received into one reusable buffer, so a frame may arrive
+        over several reads and one read may hold several frames. Anything
+        which is not a well formed 0x000055aa ... 0x0000aa55 frame is skipped.
+
+        Args:
+            size (int, optional): Initial buffer size, it grows to fit the
+                largest frame seen. Defaults to 1024.
+        """
+        self._buffer = bytearray(size)
+        self._start = 0  # first byte not yet handed out
+        self._end = 0  # end of the bytes received
+
+    def __len__(self):
+        return self._end - self._start
+
+    def recv_into(self, s, size=1024):
+        """
+        Receive up to `size` bytes from socket `s` into the buffer.
+
+        Returns:
+            int: Bytes received, 0 if the connection was closed.
+        """
+        self._reserve(size)
+        with memoryview(self._buffer) as view:
+            n = s.recv_into(view[self._end:self._end + size])
+        self._end += n
+        return n
+
+    def feed(self, data):
+        """Append `data` to the buffer"""
+        self._reserve(len(data))
+        self._buffer[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def clear(self):
+        """Discard everything buffered"""
+        self._start = self._end = 0
+
+    def next_frame(self):
+        """
+        Take the next complete frame from the buffer.
+
+        Returns:
+            bytes: The frame, or None if no complete frame is buffered yet.
+        """
+        buffer = self._buffer
+        while self._end - self._start >= FRAME_HEADER.size:
+            if buffer[self._start:self._start + 4] != FRAME_PREFIX:
+                index = buffer.find(FRAME_PREFIX, self._start, self._end)
+                if index == -1:
+                    index = max(self._start, self._end - 3)  # the prefix may be split across reads
+                log.debug('skipping %d bytes before frame prefix', index - self._start)
+                self._start = index
+                continue
+            _, _, _, length = FRAME_HEADER.unpack_from(buffer, self._start)
+            if not 8 <= length <= MAX_FRAME_LENGTH:
+                log.error('Unexpected frame length=%r', length)
+                self._start += 4
+                continue
+            end = self._start + FRAME_HEADER.size + length
+            if end > self._end:
+                return None
+            if buffer[end - 4:end] != FRAME_SUFFIX:
+                log.error('Frame is missing its suffix, skipping it')
+                self._start += 4
+                continue
+            frame = bytes(buffer[self._start:end])
+            self._start = end
+            return frame
+        return None
+
+    def frames(self):
+        """Yield every complete frame in the buffer"""
+        frame = self.next_frame()
+        while frame is not None:
+            yield frame
+            frame = self.next_frame()
+
+    def _reserve(self, size):
+        """Make room for `size` more bytes after the end of the buffer"""
+        if self._start == self._end:
+            self._start = self._end = 0
+        if len(self._buffer) - self._end >= size:
+            return
+        buffered = self._end - self._start
+        if self._start:
+            self._buffer[:buffered] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, buffered
+        if len(self._buffer) - self._end < size:
+            self._buffer.extend(bytes(self._end + size - len(self._buffer)))
+
+
+def frame_answers(frame, request):
+    """
+    Whether `frame` is the device's reply to the frame `request`.
+
+    Devices echo the request's sequence number, but some answer with 0,
+    so a reply to the same command is accepted unless its sequence number
+    shows it answers an earlier request.
+    """
+    _, seqno, command, _ = FRAME_HEADER.unpack_from(frame)
+    _, request_seqno, request_command, _ = FRAME_HEADER.unpack_from(request)
+    if command != request_command:
+        return False
+    return seqno == request_seqno or not 0 < seqno < request_seqno
+
+
+class Connection(object):
+    def __init__(self, s):
+        """
+        A socket to a device together with the FrameParser reading it.
+
+        Args:
+            s (socket.socket): A connected socket.
+        """
+        self.socket = s
+        self.parser = FrameParser()
+
+    def send(self, payload):
+        self.socket.sendall(payload)
+
+    def receive(self):
+        """
+        Block until a complete frame has been received.
+
+        Returns:
+            bytes: The frame, or b'' if the device closed the connection.
+        """
+        frame = self.parser.next_frame()
+        while frame is None:
+            if not self.parser.recv_into(self.socket):
+                return b''
+            frame = self.parser.next_frame()
+        return frame
+
+    def drain(self):
+        """
+        Buffer anything the device sent unprompted, without blocking.
+
+        Returns:
+            bool: False if the device has closed the connection.
+        """
+        self.socket.setblocking(False)
+        try:
+            while True:
+                if not self.parser.recv_into(self.socket):
+                    return False
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+        finally:
+            self.socket.setblocking(True)
+
+    def close(self):
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool(object):
+    def __init__(self, idle_timeout=20, max_idle=1):
+        """
+        Keeps TCP connections to devices open so they can be reused.
+
+        Sockets are keyed by (address, port). Devices drop connections that
+        have been quiet for a while, so idle sockets older than
+        `idle_timeout` are evicted rather than handed out again.
+
+        Args:
+            idle_timeout (float, optional): Seconds an unused socket is kept.
+                Defaults to 20.
+            max_idle (int, optional): Idle sockets kept per (address, port).
+                Defaults to 1, devices rarely cope with more.
+
+        Attributes:
+            hits (int): Requests served over an already open socket.
+            misses (int): Requests which had to open a new socket.
+            evictions (int): Idle sockets closed for being stale or surplus.
+            reconnects (int): Requests retried on a new socket after a reset.
+        """
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reconnects = 0
+
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.stats())
+
+    def acquire(self, address, port, timeout, connect_timeout=None):
+        """
+        Check out a connection, reusing an idle one where possible.
+
+        Args:
+            address (str): The network address.
+            port (int): The port to connect to.
+            timeout (float): Socket timeout to apply.
+            connect_timeout (float, optional): Timeout for opening a new
+                socket. Defaults to `timeout`.
+
+        Returns:
+            tuple: (Connection, reused) where `reused` is True for a pool hit.
+        """
+        key = (address, port)
+        now = time.monotonic()
+
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                connection, last_used = idle.pop()
+                if now - last_used > self.idle_timeout or not connection.drain():
+                    self.evictions += 1
+                    connection.close()
+                    continue
+                self.hits += 1
+                connection.socket.settimeout(timeout)
+                return connection, True
+            self.misses += 1
+
+        return self.connect(address, port, timeout, connect_timeout), False
+
+    def connect(self, address, port, timeout, connect_timeout=None):
+        """
+        Open a new connection, bypassing the idle sockets.
+
+        Args:
+            As acquire.
+
+        Returns:
+            Connection: The new connection, to release or discard as usual.
+        """
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.settimeout(timeout if connect_timeout is None else connect_timeout)
+        try:
+            s.connect((address, port))
+        except Exception:
+            s.close()
+            raise
+        s.settimeout(timeout)
+        return Connection(s)
+
+    def release(self, address, port, connection):
+        """Return a healthy connection to the pool once a request completes"""
+        with self._lock:
+            idle = self._idle.setdefault((address, port), [])
+            if len(idle) < self.max_idle:
+                idle.append((connection, time.monotonic()))
+                return
+            self.evictions += 1
+        connection.close()
+
+    def discard(self, connection):
+        """Close a connection which must not be reused"""
+        connection.close()
+
+    def evict(self):
+        """Close every idle socket which has outlived `idle_timeout`"""
+        now = time.monotonic()
+        with self._lock:
+            for key, idle in self._idle.items():
+                fresh = [(connection, last_used) for connection, last_used in idle if now - last_used <= self.idle_timeout]
+                for connection, last_used in idle:
+                    if now - last_used > self.idle_timeout:
+                        self.evictions += 1
+                        connection.close()
+                self._idle[key] = fresh
+
+    def close(self, address=None, port=None):
+        """
+        Close idle sockets.
+
+        Args:
+            address (str, optional): Only close sockets to this address.
+            port (int, optional): Only close sockets to this port.
+        """
+        with self._lock:
+            for key in list(self._idle):
+                if address is not None and key[0] != address:
+                    continue
+                if port is not None and key[1] != port:
+                    continue
+                for connection, _ in self._idle.pop(key):
+                    connection.close()
+
+    def stats(self):
+        """Return the pool counters as a dict"""
+        with self._lock:
+            idle = sum(len(sockets) for sockets in self._idle.values())
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'reconnects': self.reconnects,
+            'idle': idle,
+            }
+
+
+# Shared by every device unless one is given its own
+default_connection_pool = ConnectionPool()
+
+# Errors worth another attempt: resets, refusals (devices accept one
+# connection at a time) and timeouts
+RETRYABLE_ERRORS = (ConnectionError, socket.timeout, TimeoutError, asyncio.TimeoutError)
+
+RetryAttempt = collections.namedtuple('RetryAttempt', ('attempt', 'elapsed', 'error', 'delay'))
+
+class RetryPolicy(object):
+    def __init__(self, attempts=3, backoff=0.1, factor=2, max_backoff=2.0, jitter=0.5,
+                 deadline=None, retry_on=RETRYABLE_ERRORS, history=100, on_attempt=None,
+                 clock=time.monotonic, random=random.random):
+        """
+        Decides whether, and after how long, a failed request is tried again.
+
+        The n-th retry waits backoff * factor ** (n - 1) seconds (at most
+        `max_backoff`), less a random part of up to `jitter` of that, so
+        many devices failing together don't retry in step. With a
+        `deadline` no retry starts once it would overrun, and each attempt
+        is only given the time left as its timeout.
+
+        The same policy works for the sync (run) and async (run_async)
+        transports and may be shared between devices.
+
+        Args:
+            attempts (int, optional): Most attempts in all. Defaults to 3.
+            backoff (float, optional): Seconds before the first retry.
+                Defaults to 0.1.
+            factor (float, optional): Backoff growth per retry. Defaults to 2.
+            max_backoff (float, optional): Longest backoff. Defaults to 2.
+            jitter (float, optional): Fraction of each backoff to randomise,
+                0 to 1. Defaults to 0.5.
+            deadline (float, optional): Seconds all attempts (and backoffs)
+                together may take. Defaults to None, no limit.
+            retry_on (tuple, optional): Exceptions to retry on, others are
+                raised straight away. Defaults to RETRYABLE_ERRORS.
+            history (int, optional): Attempts to keep in `history`.
+                Defaults to 100.
+            on_attempt (function, optional): Called with a RetryAttempt
+                after every attempt. Defaults to None.
+            clock (function, optional): Monotonic clock (seconds).
+            random (function, optional): Returns a float in [0, 1).
+
+        Attributes:
+            attempts_made (int): Attempts made.
+            retries (int): Attempts which were retried.
+            successes (int): Requests which succeeded (after any retries).
+            failures (int): Requests given up on.
+            history (collections.deque): The latest RetryAttempts.
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.on_attempt = on_attempt
+        self.clock = clock
+        self.random = random
+
+        self.attempts_made = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.history: collections.deque = collections.deque(maxlen=history)
+
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.stats())
+
+    def run(self, func, timeout=None):
+        """
+        Call `func` until it succeeds or the policy gives up.
+
+        Args:
+            func (function): Makes one attempt, called with the timeout
+                (seconds, or None) it should keep to.
+            timeout (float, optional): Timeout for each attempt, cut short
+                by the deadline. Defaults to None.
+
+        Returns:
+            The return value of `func`. The last error is raised on giving up.
+        """
+        started = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            begun = self.clock()
+            try:
+                result = func(self._attempt_timeout(started, timeout))
+            except Exception as error:
+                delay = self._failed(attempt, started, begun, error)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._succeeded(attempt, begun)
+            return result
+
+    async def run_async(self, func, timeout=None):
+        """
+        Async equivalent of run, `func` returns an awaitable.
+
+        As with run, `func` is expected to keep to the timeout it is given.
+        """
+        started = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            begun = self.clock()
+            try:
+                result = await func(self._attempt_timeout(started, timeout))
+            except Exception as error:
+                delay = self._failed(attempt, started, begun, error)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded(attempt, begun)
+            return result
+
+    def delay(self, retry):
+        """Seconds to wait before retry number `retry` (1 for the first)"""
+        delay = min(self.max_backoff, self.backoff * self.factor ** (retry - 1))
+        return delay * (1 - self.jitter * self.random())
+
+    def stats(self):
+        """Return the retry counters as a dict"""
+        return {
+            'attempts': self.attempts_made,
+            'retries': self.retries,
+            'successes': self.successes,
+            'failures': self.failures,
+            }
+
+    def _attempt_timeout(self, started, timeout):
+        """`timeout`, cut down to what is left of the deadline"""
+        if self.deadline is None:
+            return timeout
+        remaining = max(self.deadline - (self.clock() - started), 0.001)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _failed(self, attempt, started, begun, error):
+        """Record a failed attempt, returning the delay before retrying or None to give up"""
+        now = self.clock()
+        delay = None
+        if attempt < self.attempts and isinstance(error, self.retry_on):
+            delay = self.delay(attempt)
+            if self.deadline is not None and now + delay - started >= self.deadline:
+                delay = None
+        with self._lock:
+            self.attempts_made += 1
+            if delay is None:
+                self.failures += 1
+            else:
+                self.retries += 1
+        self._record(RetryAttempt(attempt, now - begun, error, delay))
+        log.debug('attempt %d failed with %r, %s', attempt, error,
+                  'giving up' if delay is None else 'retrying in %.3fs' % delay)
+        return delay
+
+    def _succeeded(self, attempt, begun):
+        """Record a successful attempt"""
+        with self._lock:
+            self.attempts_made += 1
+            self.successes += 1
+        self._record(RetryAttempt(attempt, self.clock() - begun, None, None))
+
+    def _record(self, attempt):
+        self.history.append(attempt)
+        if self.on_attempt is not None:
+            self.on_attempt(attempt)
+
+class RttTracker(object):
+    def __init__(self, window=100, percentile=99, factor=3, floor=0.2, min_samples=10):
+        """
+        Keeps a device's latest round trip times and derives timeouts from them.
+
+        The timeout is the `percentile` of the last `window` samples times
+        `factor`, no shorter than `floor`. Until `min_samples` have been
+        taken there is no timeout to suggest.
+
+        A request which times out records its timeout as a sample, so a
+        device which has become slower quickly earns longer timeouts
+        rather than timing out forever.
+
+        Args:
+            window (int, optional): Samples to keep. Defaults to 100.
+            percentile (float, optional): Percentile to scale. Defaults to 99.
+            factor (float, optional): Multiple of the percentile to wait.
+                Defaults to 3.
+            floor (float, optional): Shortest timeout. Defaults to 0.2.
+            min_samples (int, optional): Samples needed before suggesting a
+                timeout. Defaults to 10.
+        """
+        self.percentile = percentile
+        self.factor = factor
+        self.floor = floor
+        self.min_samples = min_samples
+
+        self.samples = 0
+        self.timeouts = 0
+
+        self._window: collections.deque = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.stats())
+
+    def __len__(self):
+        return len(self._window)
+
+    def record(self, rtt, timed_out=False):
+        """
+        Record a round trip of `rtt` seconds.
+
+        Args:
+            rtt (float): Seconds taken, or waited before timing out.
+            timed_out (bool, optional): Whether the request timed out.
+                Defaults to False.
+        """
+        with self._lock:
+            self._window.append(rtt)
+            self.samples += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def quantile(self, percentile):
+        """The `percentile` of the recorded samples, None if there are none"""
+        with self._lock:
+            ordered = sorted(self._window)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))
+        return ordered[index]
+
+    def timeout(self, ceiling=None):
+        """
+        Suggest a timeout.
+
+        Args:
+            ceiling (float, optional): Longest timeout, also returned while
+                there are too few samples. Defaults to None.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if len(self._window) < self.min_samples:
+            return ceiling
+        timeout = max(self.floor, self.quantile(self.percentile) * self.factor)
+        return timeout if ceiling is None else min(timeout, ceiling)
+
+    def clear(self):
+        with self._lock:
+            self._window.clear()
+
+    def stats(self):
+        """Return the recorded percentiles and counters as a dict"""
+        return {
+            'samples': self.samples,
+            'timeouts': self.timeouts,
+            'p50': self.quantile(50),
+            'p95': self.quantile(95),
+            'p99': self.quantile(99),
+            'timeout': self.timeout(),
+            }
+
+
+class HedgePolicy(object):
+    def __init__(self, percentile=95, commands=(STATUS_COMMAND,)):
+        """
+        Decides when a read is sent a second time, to cut tail latency.
+
+        If no reply has arrived once the `percentile` of the device's round
+        trips has passed, the same request goes out again on a fresh
+        connection. The first reply wins and the other request is
+        abandoned, its connection closed.
+
+        Only read-only `commands` are hedged, and only once the device's
+        RttTracker has enough samples.
+
+        Args:
+            percentile (float, optional): Round trip percentile to wait
+                before hedging. Defaults to 95.
+            commands (tuple, optional): Frame commands which may be hedged.
+                Defaults to status requests only.
+
+        Attributes:
+            hedges (int): Hedge requests sent.
+            wins (int): Hedge requests answered first.
+        """
+        self.percentile = percentile
+        self.commands = commands
+
+        self.hedges = 0
+        self.wins = 0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.stats())
+
+    def delay(self, payload, rtt, timeout=None):
+        """
+        Seconds to wait for a reply before hedging request `payload`.
+
+        Args:
+            payload (bytes): The request frame.
+            rtt (RttTracker): The device's round trip times.
+            timeout (float, optional): The request's timeout, there is no
+                hedging if it would run out first. Defaults to None.
+
+        Returns:
+            float: Seconds to wait, None not to hedge.
+        """
+        if FRAME_HEADER.unpack_from(payload)[2] not in self.commands:
+            return None
+        if len(rtt) < rtt.min_samples:
+            return None
+        delay = rtt.quantile(self.percentile)
+        if timeout is not None and delay >= timeout:
+            return None
+        return delay
+
+    def record(self, won):
+        """Count a hedge request, `won` if it was answered first"""
+        with self._lock:
+            self.hedges += 1
+            if won:
+                self.wins += 1
+
+    def stats(self):
+        """Return the hedging counters as a dict"""
+        return {
+            'hedges': self.hedges,
+            'wins': self.wins,
+            'win_ratio': self.wins / self.hedges if self.hedges else 0.0,
+            }
+
+
+class AsyncConnection(object):
+    def __init__(self, address, port, on_unsolicited=None, rtt=None, connect_rtt=None):
+        """
+        A single asyncio connection to a device, kept open between requests.
+
+        Requests are pipelined: several may be in flight at once and each
+        reply is matched back to its request by sequence number (falling
+        back to the command for devices which answer with sequence number
+        0), so a cancelled or timed out request just abandons its reply.
+        Anything else the device sends is handed to `on_unsolicited`.
+
+        Args:
+            address (str): The network address.
+            port (int): The port to connect to.
+            on_unsolicited (function, optional): Called with each frame
+                the device sends unprompted. Defaults to None.
+            rtt (RttTracker, optional): Records each request's round trip.
+                Defaults to None.
+            connect_rtt (RttTracker, optional): Records the time taken to
+                connect. Defaults to None.
+        """
+        self.address = address
+        self.port = port
+        self.on_unsolicited = on_unsolicited
+        self.rtt = rtt
+        self.connect_rtt = connect_rtt
+
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = collections.OrderedDict()  # seqno -> (command, future)
+        self._last_seqno = 0
+        self._sent_commands: set = set()  # commands a late reply could be to
+        self._open_lock = None
+        self._write_lock = None
+        self._parser = FrameParser()
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, (self.address, self.port))
+
+    @property
+    def in_flight(self):
+        """Number of requests awaiting a reply"""
+        return len(self._pending)
+
+    async def send_receive(self, payload, retry_policy=None, timeout=None, connect_timeout=None,
+                           hedge_policy=None):
+        """
+        Send single frame `payload` and receive the device's reply to it.
+
+        Frames the device sends unprompted go to on_unsolicited. A kept-open
+        connection the device has since reset is replaced without counting
+        as an attempt.
+
+        Args:
+            payload(bytes): Frame to send, as built by generate_payload.
+            retry_policy(RetryPolicy, optional): When to try again.
+                Defaults to None, a single attempt.
+            timeout(float, optional): Time to wait for each reply.
+                Defaults to None.
+            connect_timeout(float, optional): Time to wait for the connection
+                to open. Defaults to `timeout`.
+            hedge_policy(HedgePolicy, optional): When to send a read again on
+                a second connection. Needs `rtt`. Defaults to None, never.
+
+        Returns:
+            bytes: The complete reply frame, b'' if the device hung up.
+        """
+        if retry_policy is None:
+            retry_policy = RetryPolicy(attempts=1)
+        return await retry_policy.run_async(
+            lambda timeout: self._send_receive(payload, timeout, connect_timeout, hedge_policy),
+            timeout)
+
+    async def _send_receive(self, payload, timeout=None, connect_timeout=None, hedge_policy=None):
+        """A single attempt at send_receive"""
+        if connect_timeout is None or timeout is not None and timeout < connect_timeout:
+            connect_timeout = timeout
+        if self._open_lock is None or self._write_lock is None:
+            self._open_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+        open_lock, write_lock = self._open_lock, self._write_lock
+
+        _, seqno, command, _ = FRAME_HEADER.unpack_from(payload)
+        while True:
+            reused = self._writer is not None
+            future = asyncio.get_running_loop().create_future()
+            self._pending[seqno] = (command, future)
+            self._last_seqno = max(self._last_seqno, seqno)
+            self._sent_commands.add(command)
+            try:
+                async with open_lock:
+                    writer = self._writer
+                    if writer is None:
+                        reused = False
+                        writer = await _timed(self._open(), connect_timeout, self.connect_rtt)
+                async with write_lock:
+                    writer.write(payload)
+                    await writer.drain()
+                hedge_after = None
+                if hedge_policy is not None and self.rtt is not None:
+                    hedge_after = hedge_policy.delay(payload, self.rtt, timeout)
+                if hedge_after is None:
+                    data = await _timed(future, timeout, self.rtt)
+                else:
+                    data = await _timed(self._hedged(payload, future, timeout, hedge_after, hedge_policy),
+                                        timeout, self.rtt)
+                if not data and reused:
+                    raise ConnectionResetError('connection closed by device')
+            except (ConnectionResetError, BrokenPipeError):
+                await self.close()
+                if not reused:
+                    raise
+                continue
+            finally:
+                if self._pending.get(seqno, (None, None))[1] is future:
+                    del self._pending[seqno]
+            return data
+
+    async def _hedged(self, payload, future, timeout, hedge_after, hedge_policy):
+        """
+        Await `future`, the reply to `payload`, sending `payload` again on a
+        second connection if it takes longer than `hedge_after` seconds.
+        """
+        done, _ = await asyncio.wait((future,), timeout=hedge_after)
+        if done:
+            return future.result()
+        remaining = None if timeout is None else timeout - hedge_after
+        hedge = AsyncConnection(self.address, self.port, self.on_unsolicited)
+        task = asyncio.ensure_future(hedge._send_receive(payload, remaining))
+        try:
+            done, _ = await asyncio.wait((future, task), return_when=asyncio.FIRST_COMPLETED)
+            if future in done:
+                hedge_policy.record(False)
+                return future.result()
+            if task.exception() is not None:
+                log.debug('hedge to %r failed: %r', (self.address, self.port), task.exception())
+                return await future
+            hedge_policy.record(True)
+            return task.result()
+        finally:
+            task.cancel()
+            await hedge.close()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def close(self):
+        """Close the connection, if open, failing any requests in flight"""
+        writer, read_task = self._writer, self._read_task
+        self._reader = self._writer = self._read_task = None
+        self._parser.clear()
+        if read_task is not None and read_task is not asyncio.current_task():
+            read_task.cancel()
+        self._fail_pending(ConnectionResetError('connection closed'))
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _open(self):
+        self._reader, self._writer = await asyncio.open_connection(self.address, self.port)
+        s = self._writer.get_extra_info('socket')
+        if s is not None:
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._read_task = asyncio.ensure_future(self._read(self._reader))
+        return self._writer
+
+    async def _read(self, reader):
+        """Hand each frame received to the request it answers"""
+        try:
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                self._parser.feed(data)
+                for frame in self._parser.frames():
+                    self._dispatch(frame)
+        except asyncio.CancelledError:
+            return
+        except OSError as error:
+            log.debug('connection to %r failed: %r', (self.address, self.port), error)
+        if self._reader is reader:
+            self._reader = self._writer = self._read_task = None
+            self._parser.clear()
+            self._fail_pending(None)
+
+    def _dispatch(self, frame):
+        _, seqno, command, _ = FRAME_HEADER.unpack_from(frame)
+        pending = self._pending.get(seqno)
+        if pending is not None and pending[0] != command:
+            pending = None
+        if pending is None and seqno == 0:
+            # the device doesn't echo sequence numbers, answer the oldest request for the command
+            pending = next((p for p in self._pending.values() if p[0] == command and not p[1].done()), None)
+        elif pending is None and command in self._sent_commands and seqno <= self._last_seqno:
+            # a reply to a request which was given up on, anything else (e.g. a push) is unsolicited
+            log.debug('dropped late reply seqno=%r', seqno)
+            return
+        if pending is None:
+            log.debug('unsolicited frame=%r', frame)
+            if self.on_unsolicited is not None:
+                self.on_unsolicited(frame)
+            return
+        if not pending[1].done():
+            pending[1].set_result(frame)
+
+    def _fail_pending(self, error):
+        """Fail every request in flight, with `error` or b'' if None"""
+        for command, future in list(self._pending.values()):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(b'')
+            else:
+                future.set_exception(error)
+
+
+async def _timed(awaitable, timeout, rtt=None):
+    """Await `awaitable` for at most `timeout` seconds, recording how long it took in `rtt`"""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        if rtt is not None:
+            rtt.record(timeout, timed_out=True)
+        raise
+    if rtt is not None:
+        rtt.record(time.perf_counter() - started)
+    return result
+
+class FrameEncoder(object):
+    def __init__(self, dev_id, dev_type, cipher, clock=time.time, cache_size=64):
+        """
+        Builds the frames sent to one device.
+
+        The JSON templates are copied out of payload_dict once, into tuples,
+        and nothing is changed afterwards, so one encoder can be used from
+        many threads at once.
+
+        Built frames are kept in a small LRU cache keyed by (command, dps,
+        timestamp second), only for dps of plain values (str, int, float,
+        bool or None), so sending the same command again within the
+        second only costs a lookup and a new sequence number.
+
+        Args:
+            dev_id (str): The device id.
+            dev_type (str): Key of the device's templates in payload_dict.
+            cipher (AESCipher): Cipher for the device's local key.
+            clock (function, optional): Returns the time (seconds since the
+                epoch) to stamp frames with. Defaults to time.time.
+            cache_size (int, optional): Most frames to cache, 0 disables
+                the cache. Defaults to 64.
+        """
+        self.dev_id = dev_id
+        self.dev_type = dev_type
+        self.cipher = cipher
+        self.clock = clock
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()  # (command, t, typed dps items) -> frame
+        self._lock = threading.Lock()
+        self._templates = {}  # command -> (command number, ((field, value), ...))
+        for command, template in payload_dict[dev_type].items():
+            if not isinstance(template, dict):
+                continue
+            fields = tuple(
+                (field, None if field == 't' else dev_id)  # uid is the id too, no seperate uid
+                for field in template['command']
+            )
+            self._templates[command] = (int(template['hexByte'], 16), fields)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, (self.dev_id, self.dev_type))
+
+    def encode(self, command, data=None, seqno=0):
+        """
+        Build a complete frame, or take it from the cache.
+
+        Args:
+            command(str): The type of command, one of payload_dict.
+            data(dict, optional): Passed via the 'dps' entry.
+            seqno(int, optional): Sequence number. Defaults to 0.
+        """
+        number, fields = self._templates[command]
+        t = int(self.clock()) if any(value is None for _, value in fields) else None
+        key = self._cache_key(command, t, data)
+        if key is not None:
+            with self._lock:
+                frame = self._cache.get(key)
+                if frame is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+            if frame is not None:
+                return stamp_seqno(frame, seqno)
+        payload = self.json_payload(command, data, t)
+        if command == SET:
+            payload = self.sign(self.cipher.encrypt(payload))
+        frame = pack_frame(seqno, number, payload)
+        if key is not None:
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = frame
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return frame
+
+    def clear(self):
+        """Empty the frame cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def _cache_key(self, command, t, data):
+        """The frame cache key for `data`, None if it can't be cached"""
+        if not self.cache_size:
+            return None
+        if data is None:
+            return (command, t, None)
+        items = []
+        for field, value in data.items():
+            if not isinstance(value, CACHEABLE_TYPES):  # e.g. a list in the dps
+                return None
+            # True == 1 == 1.0, but they're sent as true, 1 and 1.0
+            items.append((type(field), field, type(value), value))
+        return (command, t, tuple(items))
+
+    def encode_many(self, command, data_list, seqnos):
+        """
+        Build a frame for each of `data_list`, as encode would.
+
+        SET payloads are encrypted together, in one call into the AES backend.
+
+        Args:
+            command(str): The type of command, one of payload_dict.
+            data_list(list): The data (dps) for each frame.
+            seqnos(list): The sequence number for each frame.
+        """
+        number, _ = self._templates[command]
+        payloads = [self.json_payload(command, data) for data in data_list]
+        if command == SET:
+            payloads = [self.sign(encrypted) for encrypted in self.cipher.encrypt_many(payloads)]
+        return [pack_frame(seqno, number, payload) for seqno, payload in zip(seqnos, payloads)]
+
+    def json_payload(self, command, data=None, t=None):
+        """
+        Build the (plain) JSON payload for `command`.
+
+        Args:
+            command(str): The type of command, one of payload_dict.
+            data(dict, optional): Passed via the 'dps' entry.
+            t(int, optional): Timestamp for the 't' entry.
+                Defaults to the clock's current second.
+        """
+        _, fields = self._templates[command]
+        if t is None:
+            t = int(self.clock())
+        json_data = {field: str(t) if value is None else value for field, value in fields}
+        if data is not None:
+            json_data['dps'] = data
+        # the device does not respond to JSON with spaces between items
+        json_payload = json.dumps(json_data, separators=(',', ':')).encode('utf-8')
+        log.debug('json_payload=%r', json_payload)
+        return json_payload
+
+    def sign(self, encrypted):
+        """Prefix the encrypted payload `encrypted` with the version and its MD5 signature"""
+        preMd5String = b'data=' + encrypted + b'||lpv=' + PROTOCOL_VERSION_BYTES + b'||' + self.cipher.key
+        hexdigest = md5(preMd5String).hexdigest()
+        return PROTOCOL_VERSION_BYTES + hexdigest[8:24].encode('latin1') + encrypted
+
+
 class XenonDevice(object):
-    def __init__(self, dev_id, address, local_key=None, dev_type=None, connection_timeout=10):
+    def __init__(self, dev_id, address, local_key=None, dev_type=None, connection_timeout=10,
+                 connection_pool=None, connection_attempts=1, aes_backend=None, clock=time.time,
+                 frame_cache_size=64, retry_policy=None, adaptive_timeouts=True, hedge_policy=None):
         """
         Represents a Tuya device.
 
@@ -140,9 +1357,28 @@ class XenonDevice(object):
             dev_type (str, optional): The device type.
                 It will be used as key for lookups in payload_dict.
                 Defaults to None.
+            connection_pool (ConnectionPool, optional): Pool to keep
+                connections in. Defaults to `default_connection_pool`.
+            connection_attempts (int, optional): Times to try a request, for
+                the default retry_policy. Defaults to 1.
+            aes_backend (str, optional): One of AES_BACKENDS.
+                Defaults to `default_aes_backend`.
+            clock (function, optional): Returns the time to stamp frames
+                with. Defaults to time.time.
+            frame_cache_size (int, optional): Most built frames to keep for
+                reuse, 0 disables the cache. Defaults to 64.
+            retry_policy (RetryPolicy, optional): When to try a failed request
+                again. Defaults to a RetryPolicy of `connection_attempts`.
+            adaptive_timeouts (bool, optional): Derive timeouts from the
+                measured round trip times, `connection_timeout` being the
+                longest. Defaults to True.
+            hedge_policy (HedgePolicy, optional): When to send a read again on
+                a second connection. Defaults to None, never.
 
         Attributes:
             port (int): The port to connect to.
+            rtt (RttTracker): Round trip times of requests.
+            connect_rtt (RttTracker): Times taken to connect.
         """
         self.id = dev_id
         self.address = address
@@ -150,6 +1386,23 @@ class XenonDevice(object):
         self.local_key = local_key.encode('latin1')
         self.dev_type = dev_type
         self.connection_timeout = connection_timeout
+        if connection_pool is None:
+            connection_pool = default_connection_pool
+        self.connection_pool = connection_pool
+        self.connection_attempts = connection_attempts
+        if retry_policy is None:
+            retry_policy = RetryPolicy(attempts=connection_attempts)
+        self.retry_policy = retry_policy
+        self.aes_backend = aes_backend
+        self.clock = clock
+        self.frame_cache_size = frame_cache_size
+        self.adaptive_timeouts = adaptive_timeouts
+        self.hedge_policy = hedge_policy
+        self.rtt = RttTracker()
+        self.connect_rtt = RttTracker()
+        self._cipher = None
+        self._encoder = None
+        self._seqno = itertools.count(1)
 
         self.port = 6668  # default - do not expect caller to pass in
 
@@ -158,111 +1411,266 @@ class XenonDevice(object):
 
     def _send_receive(self, payload):
         """
-        Send single buffer `payload` and receive a single buffer.
+        Send single frame `payload` and receive the device's reply to it.
+
+        The connection is taken from (and handed back to) the connection
+        pool. Frames the device sends unprompted (before the reply, or
+        already received after it) are handed to _unsolicited. A pooled
+        connection the device has since reset is replaced without counting
+        as an attempt, other failures are retried as the retry_policy says.
 
         Args:
-            payload(bytes): Data to send.
+            payload(bytes): Frame to send.
+
+        Returns:
+            bytes: The complete reply frame, b'' if the device hung up.
         """
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        s.settimeout(self.connection_timeout)
-        s.connect((self.address, self.port))
-        s.send(payload)
-        data = s.recv(1024)
-        s.close()
-        return data
+        return self.retry_policy.run(lambda timeout: self._send_receive_once(payload, timeout),
+                                     self._read_timeout())
+
+    def _send_receive_once(self, payload, timeout):
+        """A single attempt at _send_receive, with socket timeout `timeout`"""
+        pool = self.connection_pool
+        connect_timeout = self._connect_timeout()
+        if connect_timeout is None or timeout is not None and timeout < connect_timeout:
+            connect_timeout = timeout
+        while True:
+            started = time.perf_counter()
+            try:
+                connection, reused = pool.acquire(self.address, self.port, timeout, connect_timeout)
+            except socket.timeout:
+                self.connect_rtt.record(connect_timeout, timed_out=True)
+                raise
+            if not reused:
+                self.connect_rtt.record(time.perf_counter() - started)
+            try:
+                started = time.perf_counter()
+                connection.send(payload)
+                hedge_after = None
+                if self.hedge_policy is not None:
+                    hedge_after = self.hedge_policy.delay(payload, self.rtt, timeout)
+                if hedge_after is None:
+                    data = connection.receive()
+                else:
+                    connection, data = self._receive_hedged(connection, payload, timeout, hedge_after)
+                while data and not frame_answers(data, payload):
+                    self._unsolicited(data)
+                    data = connection.receive()
+                if not data and reused:
+                    raise ConnectionResetError('connection closed by device')
+                self.rtt.record(time.perf_counter() - started)
+            except socket.timeout:
+                self.rtt.record(timeout, timed_out=True)
+                pool.discard(connection)
+                raise
+            except (ConnectionResetError, BrokenPipeError):
+                pool.discard(connection)
+                if not reused:
+                    raise
+                pool.reconnects += 1
+                continue
+            except Exception:
+                pool.discard(connection)
+                raise
+            if data and connection.drain():
+                for frame in connection.parser.frames():
+                    self._unsolicited(frame)
+                pool.release(self.address, self.port, connection)
+            else:
+                pool.discard(connection)
+            return data
+
+    def _receive_hedged(self, connection, payload, timeout, hedge_after):
+        """
+        Receive the reply to `payload` on `connection`, sending `payload`
+        again on a second connection if it takes longer than `hedge_after`
+        seconds. The connection answered last is closed, the one returned
+        is left with the full `timeout` again.
+
+        Returns:
+            tuple: (Connection, bytes) the connection answered first and its
+                reply, b'' if the device hung up.
+        """
+        connection.socket.settimeout(hedge_after)
+        try:
+            data = connection.receive()
+        except socket.timeout:
+            pass
+        else:
+            connection.socket.settimeout(timeout)
+            return connection, data
+        remaining = None if timeout is None else timeout - hedge_after
+        connection.socket.settimeout(remaining)
+        try:
+            hedge = self.connection_pool.connect(self.address, self.port, remaining)
+        except OSError as error:
+            log.debug('hedge to %r failed: %r', (self.address, self.port), error)
+            data = connection.receive()
+            connection.socket.settimeout(timeout)
+            return connection, data
+        try:
+            hedge.send(payload)
+            winner, data = self._first_reply((connection, hedge), payload, remaining)
+        except Exception:
+            hedge.close()
+            raise
+        self.hedge_policy.record(winner is hedge)
+        loser = connection if winner is hedge else hedge
+        self.connection_pool.discard(loser)
+        winner.socket.settimeout(timeout)
+        return winner, data
+
+    def _first_reply(self, connections, payload, timeout):
+        """
+        Wait for the first of `connections` to answer `payload`.
+
+        Returns:
+            tuple: (Connection, bytes) the connection and its reply, b'' if
+                the device hung up on every connection.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            for connection in connections:
+                selector.register(connection.socket, selectors.EVENT_READ, connection)
+            while selector.get_map():
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    raise socket.timeout('timed out')
+                for key, _ in selector.select(wait):
+                    connection = key.data
+                    if not connection.parser.recv_into(connection.socket):
+                        selector.unregister(connection.socket)
+                        continue
+                    for frame in connection.parser.frames():
+                        if frame_answers(frame, payload):
+                            return connection, frame
+                        self._unsolicited(frame)
+        return connections[0], b''
+
+    def _read_timeout(self):
+        """Seconds to wait for a reply, override to choose timeouts differently"""
+        if not self.adaptive_timeouts:
+            return self.connection_timeout
+        return self.rtt.timeout(self.connection_timeout)
+
+    def _connect_timeout(self):
+        """Seconds to wait for a connection, override to choose timeouts differently"""
+        if not self.adaptive_timeouts:
+            return self.connection_timeout
+        return self.connect_rtt.timeout(self.connection_timeout)
+
+    def rtt_stats(self):
+        """Return the round trip statistics, and the timeouts they give, as a dict"""
+        return {
+            'rtt': self.rtt.stats(),
+            'connect': self.connect_rtt.stats(),
+            'read_timeout': self._read_timeout(),
+            'connect_timeout': self._connect_timeout(),
+            'hedging': None if self.hedge_policy is None else self.hedge_policy.stats(),
+            }
 
-    def generate_payload(self, command, data=None):
+    def _unsolicited(self, frame):
+        """
+        Handle a frame the device sent unprompted.
+
+        Devices push the dps they changed (command PUSH_COMMAND), e.g. in
+        answer to a SET. Such frames are only logged here, subclasses
+        can override this to make use of them.
+
+        Args:
+            frame(bytes): The complete frame.
+        """
+        log.debug('unsolicited frame=%r', frame)
+
+    @property
+    def cipher(self):
+        """The device's AESCipher, kept for as long as local_key is unchanged"""
+        cipher = self._cipher
+        if cipher is None or cipher.key != self.local_key:
+            cipher = self._cipher = AESCipher(self.local_key, self.aes_backend)
+        return cipher
+
+    @property
+    def encoder(self):
+        """The device's FrameEncoder, rebuilt if its id, type or key changes"""
+        encoder, cipher = self._encoder, self.cipher
+        if encoder is None or encoder.cipher is not cipher or encoder.dev_id != self.id \
+                or encoder.dev_type != self.dev_type:
+            encoder = self._encoder = FrameEncoder(self.id, self.dev_type, cipher, self.clock,
+                                                   self.frame_cache_size)
+        return encoder
+
+    def close(self):
+        """Close any idle pooled connections to the device"""
+        self.connection_pool.close(self.address, self.port)
+
+    def next_seqno(self):
+        """Return the next sequence number to stamp on a frame"""
+        return next(self._seqno) & 0xffffffff
+
+    def generate_payload(self, command, data=None, seqno=None):
         """
         Generate the payload to send.
 
+        Safe to call from several threads at once, see FrameEncoder.
+
         Args:
             command(str): The type of command.
                 This is one of the entries from payload_dict
             data(dict, optional): The data to be send.
                 This is what will be passed via the 'dps' entry
+            seqno(int, optional): Sequence number for the frame, the
+                device echoes it in its reply.
+                Defaults to the device's next sequence number.
         """
-        json_data = payload_dict[self.dev_type][command]['command']
+        if seqno is None:
+            seqno = self.next_seqno()
+        return self.encoder.encode(command, data, seqno)
 
-        if 'gwId' in json_data:
-            json_data['gwId'] = self.id
-        if 'devId' in json_data:
-            json_data['devId'] = self.id
-        if 'uid' in json_data:
-            json_data['uid'] = self.id  # still use id, no seperate uid
-        if 't' in json_data:
-            json_data['t'] = str(int(time.time()))
+    def generate_payloads(self, command, data_list):
+        """
+        Generate a frame for each of `data_list`, as generate_payload would.
 
-        if data is not None:
-            json_data['dps'] = data
+        SET payloads are encrypted together, in one call into the AES
+        backend, so building many frames costs little more than building one.
 
-        # Create byte buffer from hex data
-        json_payload = json.dumps(json_data)
-        #print(json_payload)
-        json_payload = json_payload.replace(' ', '')  # if spaces are not removed device does not respond!
-        json_payload = json_payload.encode('utf-8')
-        log.debug('json_payload=%r', json_payload)
+        Args:
+            command(str): The type of command.
+                This is one of the entries from payload_dict
+            data_list(iterable): The data (dps) for each frame.
 
-        if command == SET:
-            # need to encrypt
-            #print('json_payload %r' % json_payload)
-            self.cipher = AESCipher(self.local_key)  # expect to connect and then disconnect to set new
-            json_payload = self.cipher.encrypt(json_payload)
-            #print('crypted json_payload %r' % json_payload)
-            preMd5String = b'data=' + json_payload + b'||lpv=' + PROTOCOL_VERSION_BYTES + b'||' + self.local_key
-            #print('preMd5String %r' % preMd5String)
-            m = md5()
-            m.update(preMd5String)
-            #print(repr(m.digest()))
-            hexdigest = m.hexdigest()
-            #print(hexdigest)
-            #print(hexdigest[8:][:16])
-            json_payload = PROTOCOL_VERSION_BYTES + hexdigest[8:][:16].encode('latin1') + json_payload
-            #print('data_to_send')
-            #print(json_payload)
-            #print('crypted json_payload (%d) %r' % (len(json_payload), json_payload))
-            #print('json_payload  %r' % repr(json_payload))
-            #print('json_payload len %r' % len(json_payload))
-            #print(bin2hex(json_payload))
-            self.cipher = None  # expect to connect and then disconnect to set new
-
-
-        postfix_payload = hex2bin(bin2hex(json_payload) + payload_dict[self.dev_type]['suffix'])
-        #print('postfix_payload %r' % postfix_payload)
-        #print('postfix_payload %r' % len(postfix_payload))
-        #print('postfix_payload %x' % len(postfix_payload))
-        #print('postfix_payload %r' % hex(len(postfix_payload)))
-        assert len(postfix_payload) <= 0xff
-        postfix_payload_hex_len = '%x' % len(postfix_payload)  # TODO this assumes a single byte 0-255 (0x00-0xff)
-        buffer = hex2bin( payload_dict[self.dev_type]['prefix'] +
-                          payload_dict[self.dev_type][command]['hexByte'] +
-                          '000000' +
-                          postfix_payload_hex_len ) + postfix_payload
-        #print('command', command)
-        #print('prefix')
-        #print(payload_dict[self.dev_type][command]['prefix'])
-        #print(repr(buffer))
-        #print(bin2hex(buffer, pretty=True))
-        #print(bin2hex(buffer, pretty=False))
-        #print('full buffer(%d) %r' % (len(buffer), buffer))
-        return buffer
+        Returns:
+            list: The frames, each with its own sequence number.
+        """
+        data_list = list(data_list)
+        seqnos = [self.next_seqno() for _ in data_list]
+        return self.encoder.encode_many(command, data_list, seqnos)
 
 class Device(XenonDevice):
-    def __init__(self, dev_id, address, local_key=None, dev_type=None):
-        super(Device, self).__init__(dev_id, address, local_key, dev_type)
+    def __init__(self, dev_id, address, local_key=None, dev_type=None, **kwargs):
+        super(Device, self).__init__(dev_id, address, local_key, dev_type, **kwargs)
 
     def status(self):
         log.debug('status() entry')
         # open device, send request, then close connection
-        payload = self.generate_payload('status')
+        payload = self.generate_payload(STATUS)
 
         data = self._send_receive(payload)
         log.debug('status received data=%r', data)
 
+        return self._decode_status(data)
+
+    def _decode_status(self, data):
+        """
+        Decode the device's reply to a status request.
+
+        Args:
+            data(bytes): Data received from the device.
+        """
         if not data:
             return
 
-        result = data[20:-8]  # hard coded offsets
+        result = unpack_frame(data).payload
         log.debug('result=%r', result)
         #result = data[data.find('{'):data.rfind('}')+1]  # naive marker search, hope neither { nor } occur in header/footer
         #print('result %r' % result)
@@ -277,8 +1685,7 @@ class Device(XenonDevice):
             # NOTE dps.2 may or may not be present
             result = result[len(PROTOCOL_VERSION_BYTES):]  # remove version header
             result = result[16:]  # remove (what I'm guessing, but not confirmed is) 16-bytes of MD5 hexdigest of payload
-            cipher = AESCipher(self.local_key)
-            result = cipher.decrypt(result)
+            result = self.cipher.decrypt(result)
             log.debug('decrypted result=%r', result)
             if not isinstance(result, str):
                 result = result.decode()
@@ -338,9 +1745,9 @@ class Device(XenonDevice):
         return data
 
 class OutletDevice(Device):
-    def __init__(self, dev_id, address, local_key=None):
+    def __init__(self, dev_id, address, local_key=None, **kwargs):
         dev_type = 'device'
-        super(OutletDevice, self).__init__(dev_id, address, local_key, dev_type)
+        super(OutletDevice, self).__init__(dev_id, address, local_key, dev_type, **kwargs)
 
 class BulbDevice(Device):
     DPS_INDEX_ON         = '1'
@@ -353,9 +1760,9 @@ class BulbDevice(Device):
     DPS_MODE_COLOUR = 'colour'
     DPS_MODE_WHITE  = 'white'
 
-    def __init__(self, dev_id, address, local_key=None):
+    def __init__(self, dev_id, address, local_key=None, **kwargs):
         dev_type = 'device'
-        super(BulbDevice, self).__init__(dev_id, address, local_key, dev_type)
+        super(BulbDevice, self).__init__(dev_id, address, local_key, dev_type, **kwargs)
 
     @staticmethod
     def _rgb_to_hexvalue(r, g, b):
@@ -373,30 +1780,11 @@ class BulbDevice(Device):
             r(int): Value for the colour red as int from 0-255.
             g(int): Value for the colour green as int from 0-255.
             b(int): Value for the colour blue as int from 0-255.
-        """
-        rgb = [r,g,b]
-        hsv = colorsys.rgb_to_hsv(rgb[0]/255, rgb[1]/255, rgb[2]/255)
-
-        hexvalue = ""
-        for value in rgb:
-            temp = str(hex(int(value))).replace("0x","")
-            if len(temp) == 1:
-                temp = "0" + temp
-            hexvalue = hexvalue + temp
-
-        hsvarray = [int(hsv[0] * 360), int(hsv[1] * 255), int(hsv[2] * 255)]
-        hexvalue_hsv = ""
-        for value in hsvarray:
-            temp = str(hex(int(value))).replace("0x","")
-            if len(temp) == 1:
-                temp = "0" + temp
-            hexvalue_hsv = hexvalue_hsv + temp
-        if len(hexvalue_hsv) == 7:
-            hexvalue = hexvalue + "0" + hexvalue_hsv
-        else:
-            hexvalue = hexvalue + "00" + hexvalue_hsv
 
-        return hexvalue
+        Raises:
+            ValueError: If a value is out of range.
+        """
+        return codec.encode_colour(r, g, b)
 
     @staticmethod
     def _hexvalue_to_rgb(hexvalue):
@@ -437,6 +1825,12 @@ class BulbDevice(Device):
             g(int): Value for the colour green as int from 0-255.
             b(int): Value for the colour blue as int from 0-255.
         """
+        payload = self.generate_payload(SET, self._colour_dps(r, g, b))
+        data = self._send_receive(payload)
+        return data
+
+    def _colour_dps(self, r, g, b):
+        """Validate an RGB colour and return the dps which set it"""
         if not 0 <= r <= 255:
             raise ValueError("The value for red needs to be between 0 and 255.")
         if not 0 <= g <= 255:
@@ -447,11 +1841,9 @@ class BulbDevice(Device):
         #print(BulbDevice)
         hexvalue = BulbDevice._rgb_to_hexvalue(r, g, b)
 
-        payload = self.generate_payload(SET, {
+        return {
             self.DPS_INDEX_MODE: self.DPS_MODE_COLOUR,
-            self.DPS_INDEX_COLOUR: hexvalue})
-        data = self._send_receive(payload)
-        return data
+            self.DPS_INDEX_COLOUR: hexvalue}
 
     def set_white(self, brightness, colourtemp):
         """
@@ -461,18 +1853,22 @@ class BulbDevice(Device):
             brightness(int): Value for the brightness (25-255).
             colourtemp(int): Value for the colour temperature (0-255).
         """
+        payload = self.generate_payload(SET, self._white_dps(brightness, colourtemp))
+
+        data = self._send_receive(payload)
+        return data
+
+    def _white_dps(self, brightness, colourtemp):
+        """Validate white mode settings and return the dps which set them"""
         if not 25 <= brightness <= 255:
             raise ValueError("The brightness needs to be between 25 and 255.")
         if not 0 <= colourtemp <= 255:
             raise ValueError("The colour temperature needs to be between 0 and 255.")
 
-        payload = self.generate_payload(SET, {
+        return {
             self.DPS_INDEX_MODE: self.DPS_MODE_WHITE,
             self.DPS_INDEX_BRIGHTNESS: brightness,
-            self.DPS_INDEX_COLOURTEMP: colourtemp})
-
-        data = self._send_receive(payload)
-        return data
+            self.DPS_INDEX_COLOURTEMP: colourtemp}
 
     def set_brightness(self, brightness):
         """
@@ -481,12 +1877,16 @@ class BulbDevice(Device):
         Args:
             brightness(int): Value for the brightness (25-255).
         """
+        payload = self.generate_payload(SET, self._brightness_dps(brightness))
+        data = self._send_receive(payload)
+        return data
+
+    def _brightness_dps(self, brightness):
+        """Validate a brightness and return the dps which set it"""
         if not 25 <= brightness <= 255:
             raise ValueError("The brightness needs to be between 25 and 255.")
 
-        payload = self.generate_payload(SET, {self.DPS_INDEX_BRIGHTNESS: brightness})
-        data = self._send_receive(payload)
-        return data
+        return {self.DPS_INDEX_BRIGHTNESS: brightness}
 
     def set_colourtemp(self, colourtemp):
         """
@@ -495,12 +1895,16 @@ class BulbDevice(Device):
         Args:
             colourtemp(int): Value for the colour temperature (0-255).
         """
+        payload = self.generate_payload(SET, self._colourtemp_dps(colourtemp))
+        data = self._send_receive(payload)
+        return data
+
+    def _colourtemp_dps(self, colourtemp):
+        """Validate a colour temperature and return the dps which set it"""
         if not 0 <= colourtemp <= 255:
             raise ValueError("The colour temperature needs to be between 0 and 255.")
 
-        payload = self.generate_payload(SET, {self.DPS_INDEX_COLOURTEMP: colourtemp})
-        data = self._send_receive(payload)
-        return data
+        return {self.DPS_INDEX_COLOURTEMP: colourtemp}
 
     def brightness(self):
         """Return brightness value"""
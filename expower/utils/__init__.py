@@ -3,6 +3,8 @@ Imports:
     .chunk.chunk
     .hex_to_int.hex_to_int
     .ping.ping
+    .scan.scan
+    .scan.ScanResult
     .implicitly_inherit.implicitly_inherit
     .int_to_hex.int_to_hex
 """
@@ -10,5 +12,7 @@ Imports:
 from .chunk import chunk
 from .hex_to_int import hex_to_int
 from .ping import ping
+from .scan import scan
+from .scan import ScanResult
 from .implicitly_inherit import implicitly_inherit
 from .int_to_hex import int_to_hex
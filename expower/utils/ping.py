@@ -1,25 +1,25 @@
 from .. import constants
-import socket
+from .scan import scan
 
 """
 Imports:
     ..constants
-    socket
+    .scan.scan
 
 Contains:
     ping()
 """
 
-def ping(host, port=constants.PORT):
+def ping(host, port=constants.PORT, timeout=constants.networking.PROBE_TIMEOUT):
     """
     Ping {port} on {host} to check it's open
 
     :param(str) host - Host IP address
     :param(int) port - Host Port, defaults to 6668
+    :param(float) timeout - Seconds to wait for the connection
+        ... Defaults to PROBE_TIMEOUT, None to wait as long as the OS does
 
     :returns(bool) - Whether {port} is open on {host}
     """
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-
-    return sock.connect_ex((host, port)) == 0
+    return scan(((host, port),), timeout = timeout)[0].reachable
@@ -0,0 +1,169 @@
+from .. import constants
+import collections
+import errno
+import ipaddress
+import selectors
+import socket
+import time
+
+"""
+Imports:
+    ..constants
+    collections
+    errno
+    ipaddress
+    selectors
+    socket
+    time
+
+Contains:
+    <ScanResult>
+    scan()
+"""
+
+class ScanResult(collections.namedtuple('ScanResult', ('host', 'port', 'reachable', 'latency'))):
+    """
+    Outcome of probing one host
+
+    :attr host - Host IP address
+    :attr port - Port probed
+    :attr reachable - Whether {port} accepted a connection
+    :attr latency - Seconds the connection took to open
+        ... (None if it didn't)
+    """
+
+    __slots__ = ()
+
+def scan(hosts, port=constants.PORT, timeout=1, concurrency=256):
+    """
+    Check which of {hosts} have {port} open, probing many at once
+
+    Connections are opened without blocking and waited on together,
+    ... at most {concurrency} at a time, so a /22 of mostly absent
+    ... hosts takes a few multiples of {timeout} rather than the sum
+    ... of every host's connect timeout
+
+    :param(iterable) hosts - Host IP addresses, CIDR ranges
+        ... (e.g. '192.168.0.0/22') and/or (host, port) tuples
+        ... A single str is taken as one address or range
+    :param(int) port - Port for hosts not given one, defaults to 6668
+    :param(float) timeout - Seconds to wait for each host
+        ... None to wait as long as the OS does
+    :param(int) concurrency - Most connections open at once
+
+    :returns(list) - A <ScanResult> per host, in the order given
+    """
+
+    targets = list(_targets(hosts, port))
+    results: list = [None] * len(targets)
+
+    pending = iter(enumerate(targets))
+    in_flight: collections.OrderedDict = collections.OrderedDict() # socket -> (index, started)
+
+    with selectors.DefaultSelector() as selector:
+        try:
+            while True:
+                while len(in_flight) < concurrency:
+                    item = next(pending, None)
+
+                    if item is None:
+                        break
+
+                    index, (host, host_port) = item
+
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setblocking(False)
+
+                    started = time.perf_counter()
+
+                    try:
+                        error = sock.connect_ex((host, host_port))
+                    except OSError as connect_error: # e.g. an unresolvable host
+                        error = connect_error.errno or errno.EIO
+
+                    if error in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+                        selector.register(sock, selectors.EVENT_WRITE, sock)
+
+                        in_flight[sock] = (index, started)
+
+                        continue
+
+                    sock.close()
+
+                    results[index] = ScanResult \
+                    (
+                        host,
+                        host_port,
+                        error == 0,
+                        time.perf_counter() - started if error == 0 else None,
+                    )
+
+                if not in_flight:
+                    break
+
+                wait = None
+
+                if timeout is not None:
+                    _, oldest = next(iter(in_flight.values()))
+
+                    wait = max(oldest + timeout - time.perf_counter(), 0)
+
+                for key, _ in selector.select(wait):
+                    sock = key.data
+                    index, started = in_flight.pop(sock)
+                    host, host_port = targets[index]
+
+                    latency = time.perf_counter() - started
+
+                    reachable = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+
+                    selector.unregister(sock)
+                    sock.close()
+
+                    results[index] = ScanResult \
+                    (
+                        host,
+                        host_port,
+                        reachable,
+                        latency if reachable else None,
+                    )
+
+                if timeout is not None:
+                    now = time.perf_counter()
+
+                    for sock, (index, started) in list(in_flight.items()):
+                        if now - started < timeout:
+                            break # The rest started later still
+
+                        del in_flight[sock]
+
+                        selector.unregister(sock)
+                        sock.close()
+
+                        host, host_port = targets[index]
+
+                        results[index] = ScanResult(host, host_port, False, None)
+        finally:
+            for sock in in_flight:
+                sock.close()
+
+    return results
+
+def _targets(hosts, port):
+    """
+    Expand {hosts} (see scan) into (host, port) tuples
+    """
+
+    if isinstance(hosts, str):
+        hosts = (hosts,)
+
+    for host in hosts:
+        if isinstance(host, tuple):
+            yield host
+        elif '/' in host:
+            network = ipaddress.ip_network(host, strict=False)
+
+            for address in network.hosts() if network.num_addresses > 1 else network:
+                yield (str(address), port)
+        else:
+            yield (host, port)
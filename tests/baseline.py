@@ -0,0 +1,235 @@
+"""
+The original (pre-codec) colour and flash scene formulas, as they were
+... in expower.bulbs.BulbDevice and pytuya.BulbDevice, and the original
+... pytuya AES cipher and frame builder
+
+Kept as a reference for the tests and benchmarks of expower.codec and
+... expower.pytuya
+
+Contains:
+    in_range()
+    rgb_to_hexvalue()
+    hexvalue_to_rgb()
+    brightness_to_hexvalue()
+    hexvalue_to_brightness()
+    saturation_to_hexvalue()
+    hexvalue_to_saturation()
+    speed_to_hexvalue()
+    hexvalue_to_speed()
+    decode_one_colour_flash_scene()
+    decode_six_colour_flash_scene()
+    new_cipher()
+    <AESCipher>
+    generate_payload()
+"""
+
+from expower import pytuya
+from hashlib import md5
+import base64
+import colorsys
+import json
+import time
+
+try:
+    from Crypto.Cipher import AES
+except ImportError: # e.g. only cryptography installed
+    def new_cipher(key):
+        """
+        Returns a new AES-ECB cipher for {key}, from pytuya's fastest backend
+        """
+
+        return pytuya.AES_BACKENDS[pytuya.default_aes_backend](key)
+else:
+    def new_cipher(key):
+        """
+        Returns a new AES-ECB cipher for {key}, as the original did
+        """
+
+        return AES.new(key, AES.MODE_ECB)
+
+def in_range(value, min=0, max=100):
+    if value < min:
+        value = min
+    if value > max:
+        value = max
+
+    return value
+
+def rgb_to_hexvalue(r, g, b):
+    rgb = [r,g,b]
+    hsv = colorsys.rgb_to_hsv(rgb[0]/255, rgb[1]/255, rgb[2]/255)
+
+    hexvalue = ""
+    for value in rgb:
+        temp = str(hex(int(value))).replace("0x","")
+        if len(temp) == 1:
+            temp = "0" + temp
+        hexvalue = hexvalue + temp
+
+    hsvarray = [int(hsv[0] * 360), int(hsv[1] * 255), int(hsv[2] * 255)]
+    hexvalue_hsv = ""
+    for value in hsvarray:
+        temp = str(hex(int(value))).replace("0x","")
+        if len(temp) == 1:
+            temp = "0" + temp
+        hexvalue_hsv = hexvalue_hsv + temp
+    if len(hexvalue_hsv) == 7:
+        hexvalue = hexvalue + "0" + hexvalue_hsv
+    else:
+        hexvalue = hexvalue + "00" + hexvalue_hsv
+
+    return hexvalue
+
+def hexvalue_to_rgb(hexvalue):
+    r = int(hexvalue[0:2], 16)
+    g = int(hexvalue[2:4], 16)
+    b = int(hexvalue[4:6], 16)
+
+    return (r, g, b)
+
+def brightness_to_hexvalue(brightness, u=26.9):
+    brightness = in_range(brightness, min = 0, max = 100)
+
+    return int(u + ((255 - u) / 100) * brightness)
+
+def hexvalue_to_brightness(hexvalue, u=26.9):
+    brightness = int((hexvalue - u) / ((255 - u) / 100)) + 1
+
+    return in_range(brightness, min = 0, max = 100)
+
+def saturation_to_hexvalue(saturation, u=27):
+    saturation = in_range(saturation, min = 0, max = 100)
+
+    return int(u + ((255 - u) / 100) * saturation + 0.00001)
+
+def hexvalue_to_saturation(hexvalue, u=27):
+    saturation = int((hexvalue - u) / ((255 - u) / 100) + 0.5)
+
+    return in_range(saturation, min = 0, max = 100)
+
+def hexvalue_to_speed(hexvalue):
+    return in_range(101 - hexvalue, min = 0, max = 100)
+
+def speed_to_hexvalue(speed):
+    return 101 - in_range(speed, 0, 100)
+
+def _chunk(iterable, size):
+    return [iterable[index:index + size] for index in range(0, len(iterable), size)]
+
+def decode_one_colour_flash_scene(hexvalue, flipped=False):
+    if len(hexvalue) != 14:
+        return {}
+
+    br, sa, sp, _01, rr, gg, bb = _chunk(hexvalue, 2)
+
+    if flipped:
+        rr, bb = bb, rr
+
+    return \
+    {
+        'colour': (int(rr, 16), int(gg, 16), int(bb, 16)),
+        'speed': hexvalue_to_speed(int(sp, 16)),
+        'brightness': hexvalue_to_brightness(int(br, 16)),
+        'saturation': hexvalue_to_saturation(int(sa, 16)),
+    }
+
+def decode_six_colour_flash_scene(hexvalue):
+    if len(hexvalue) != 44:
+        return {}
+
+    br, sa, sp, _06, *cs = _chunk(hexvalue, 2)
+
+    colours = \
+    [
+        (int(rr, 16), int(gg, 16), int(bb, 16))
+        for rr, gg, bb in _chunk(cs, 3)
+    ]
+
+    return \
+    {
+        'speed': hexvalue_to_speed(int(sp, 16)),
+        'brightness': hexvalue_to_brightness(int(br, 16)),
+        'saturation': hexvalue_to_saturation(int(sa, 16)),
+        'colours': colours,
+    }
+
+PROTOCOL_VERSION_BYTES = b'3.1'
+
+PAYLOAD_DICT: dict = \
+{
+    'device':
+    {
+        'status': {'hexByte': '0a', 'command': {'gwId': '', 'devId': ''}},
+        'set': {'hexByte': '07', 'command': {'devId': '', 'uid': '', 't': ''}},
+        'prefix': '000055aa00000000000000',
+        'suffix': '000000000000aa55',
+    },
+}
+
+class AESCipher(object):
+    """
+    The original pytuya AESCipher, which sets up a new AES cipher (and
+    ... key schedule) for every message
+    """
+
+    def __init__(self, key):
+        self.bs = 16
+        self.key = key
+
+    def encrypt(self, raw):
+        crypted_text = new_cipher(self.key).encrypt(self._pad(raw))
+
+        return base64.b64encode(crypted_text)
+
+    def decrypt(self, enc):
+        raw = new_cipher(self.key).decrypt(base64.b64decode(enc))
+
+        return self._unpad(raw).decode('utf-8')
+
+    def _pad(self, s):
+        padnum = self.bs - len(s) % self.bs
+        return s + padnum * chr(padnum).encode()
+
+    @staticmethod
+    def _unpad(s):
+        return s[:-ord(s[len(s)-1:])]
+
+def generate_payload(dev_id, local_key, command, data=None, dev_type='device', clock=time.time):
+    json_data = PAYLOAD_DICT[dev_type][command]['command']
+
+    if 'gwId' in json_data:
+        json_data['gwId'] = dev_id
+    if 'devId' in json_data:
+        json_data['devId'] = dev_id
+    if 'uid' in json_data:
+        json_data['uid'] = dev_id
+    if 't' in json_data:
+        json_data['t'] = str(int(clock()))
+
+    if data is not None:
+        json_data['dps'] = data
+
+    json_payload = json.dumps(json_data).replace(' ', '').encode('utf-8')
+
+    if command == 'set':
+        cipher = AESCipher(local_key)
+        json_payload = cipher.encrypt(json_payload)
+        preMd5String = b'data=' + json_payload + b'||lpv=' + PROTOCOL_VERSION_BYTES + b'||' + local_key
+        m = md5()
+        m.update(preMd5String)
+        hexdigest = m.hexdigest()
+        json_payload = PROTOCOL_VERSION_BYTES + hexdigest[8:][:16].encode('latin1') + json_payload
+
+    postfix_payload = bytes.fromhex(json_payload.hex() + PAYLOAD_DICT[dev_type]['suffix'])
+
+    assert len(postfix_payload) <= 0xff
+
+    postfix_payload_hex_len = '%x' % len(postfix_payload)
+
+    return bytes.fromhex \
+    (
+        PAYLOAD_DICT[dev_type]['prefix'] +
+        PAYLOAD_DICT[dev_type][command]['hexByte'] +
+        '000000' +
+        postfix_payload_hex_len
+    ) + postfix_payload
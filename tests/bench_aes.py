@@ -0,0 +1,44 @@
+"""
+Benchmark of the pytuya AES backends: a cipher set up for every message
+... (as the original AESCipher did) against a cipher kept per device
+
+Usage:
+    python -m tests.bench_aes
+"""
+
+from expower import pytuya
+from . import baseline
+from .bench_codec import best
+
+KEY = b'0123456789abcdef'
+
+# The size of a typical SET payload
+MESSAGE = b'{"devId":"01234567891234567890","uid":"01234567891234567890","t":"1600000000","dps":{"1":true,"3":255}}'
+
+def main():
+    crypted = baseline.AESCipher(KEY).encrypt(MESSAGE)
+
+    old_time = best(lambda: baseline.AESCipher(KEY).encrypt(MESSAGE))
+
+    print(f'{"original encrypt":<24} {old_time:7.2f}us')
+
+    for backend in pytuya.AES_BACKENDS:
+        cipher = pytuya.AESCipher(KEY, backend)
+
+        assert cipher.encrypt(MESSAGE) == crypted
+        assert cipher.decrypt(crypted) == MESSAGE.decode('utf-8')
+
+        number = 5000 if backend == 'pyaes' else 50000
+
+        per_message = best(lambda: pytuya.AESCipher(KEY, backend).encrypt(MESSAGE), number)
+        kept = best(lambda: cipher.encrypt(MESSAGE), number)
+
+        print(f'{backend + " encrypt":<24} {per_message:7.2f}us -> {kept:6.2f}us ({old_time / kept:.1f}x original)')
+
+        per_message = best(lambda: pytuya.AESCipher(KEY, backend).decrypt(crypted), number)
+        kept = best(lambda: cipher.decrypt(crypted), number)
+
+        print(f'{backend + " decrypt":<24} {per_message:7.2f}us -> {kept:6.2f}us')
+
+if __name__ == '__main__':
+    main()
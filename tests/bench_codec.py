@@ -0,0 +1,58 @@
+"""
+Microbenchmark of expower.codec against the original formulas
+
+Usage:
+    python -m tests.bench_codec
+"""
+
+from expower import codec
+from . import baseline
+import timeit
+
+SIX_COLOURS = 'ffff0106ff0000ffe60009ff0000f7fffffffff700ff'
+ONE_COLOUR = '24d10101ff0000'
+
+CASES = \
+(
+    (
+        'decode six colour scene',
+        lambda: baseline.decode_six_colour_flash_scene(SIX_COLOURS),
+        lambda: codec.decode_six_colour_flash_scene(SIX_COLOURS),
+    ),
+    (
+        'decode one colour scene',
+        lambda: baseline.decode_one_colour_flash_scene(ONE_COLOUR),
+        lambda: codec.decode_one_colour_flash_scene(ONE_COLOUR),
+    ),
+    (
+        'rgb -> colour_data',
+        lambda: baseline.rgb_to_hexvalue(12, 200, 99),
+        lambda: codec.encode_colour(12, 200, 99),
+    ),
+    (
+        'brightness -> byte',
+        lambda: baseline.brightness_to_hexvalue(57),
+        lambda: codec.encode_brightness(57),
+    ),
+    (
+        'byte -> speed',
+        lambda: baseline.hexvalue_to_speed(57),
+        lambda: codec.decode_speed(57),
+    ),
+)
+
+def best(func, number=50000, repeat=5):
+    """
+    Returns the best time per call of {func}, in microseconds
+    """
+
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+def main():
+    for name, old, new in CASES:
+        old_time, new_time = best(old), best(new)
+
+        print(f'{name:<24} {old_time:7.2f}us -> {new_time:6.2f}us ({old_time / new_time:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark of building frames with pytuya.FrameEncoder against the
+... original generate_payload
+
+Usage:
+    python -m tests.bench_frames
+"""
+
+from expower import pytuya
+from . import baseline
+from .bench_codec import best
+
+DEV_ID = '01234567891234567890'
+KEY = b'0123456789abcdef'
+
+DPS = {'1': True, '2': 'colour', '5': '0000ff00f0ffff'}
+
+def main():
+    cipher = pytuya.AESCipher(KEY)
+
+    uncached = pytuya.FrameEncoder(DEV_ID, 'device', cipher, cache_size=0)
+    cached = pytuya.FrameEncoder(DEV_ID, 'device', cipher)
+
+    for name, old, new in \
+            (
+                (
+                    'status frame',
+                    lambda: baseline.generate_payload(DEV_ID, KEY, 'status'),
+                    lambda: uncached.encode('status', seqno=1),
+                ),
+                (
+                    'set frame',
+                    lambda: baseline.generate_payload(DEV_ID, KEY, 'set', DPS),
+                    lambda: uncached.encode('set', DPS, seqno=1),
+                ),
+                (
+                    'set frame (cached)',
+                    lambda: baseline.generate_payload(DEV_ID, KEY, 'set', DPS),
+                    lambda: cached.encode('set', DPS, seqno=1),
+                ),
+                (
+                    '10 set frames (batched)',
+                    lambda: [baseline.generate_payload(DEV_ID, KEY, 'set', DPS) for _ in range(10)],
+                    lambda: uncached.encode_many('set', [DPS] * 10, range(10)),
+                ),
+            ):
+        old_time, new_time = best(old, number=20000), best(new, number=20000)
+
+        print(f'{name:<24} {old_time:7.2f}us -> {new_time:6.2f}us ({old_time / new_time:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+A fake Expower Bulb, speaking Tuya protocol 3.1 over TCP on localhost,
+... for the tests to talk to
+
+Contains:
+    DEVICE_ID
+    LOCAL_KEY
+    DPS
+    <FakeBulb>
+"""
+
+from expower import pytuya
+from hashlib import md5
+import json
+import socket
+import threading
+import time
+
+DEVICE_ID = '01234567891234567890'
+LOCAL_KEY = '0123456789abcdef'
+
+DPS = \
+{
+    '1': True,
+    '2': 'white',
+    '3': 100,
+    '4': 100,
+    '5': '320a32012ccc32',
+    '6': '3855b40168ffff',
+    '7': '24d10101ff0000',
+    '8': '78ac0106692626695d26266926266269332669692661',
+    '9': '311b0101ff0000',
+    '10': 'ffff0106ff0000ffe60009ff0000f7fffffffff700ff',
+}
+
+class FakeBulb(object):
+    """
+    Serves the status, set and heartbeat commands from a dps dict,
+    ... on a thread per connection
+
+    Replies echo the request's sequence number. A SET is answered with
+    ... an empty reply, followed by a push of the dps it set
+
+    E.g:
+        >>> with FakeBulb() as fake:
+        ...     bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        ...     bulb.port = fake.port
+    """
+
+    def __init__(self, delay=0, echo=True, close_after=None):
+        """
+        Initialise self, listening on a free port
+
+        :param(float) delay - Seconds to wait before each reply
+        :param(bool) echo - Push the dps set after answering a SET
+        :param(int) close_after - Requests to answer on a connection
+            ... before hanging up, None to never hang up
+
+        :returns - None
+        """
+
+        self.delay = delay
+        self.echo = echo
+        self.close_after = close_after
+
+        self.dps = dict(DPS)
+        self.requests = [] # (seqno, command)
+        self.connections = 0
+        self.silent = set() # Commands to ignore
+        self.hang_ups = 0 # Requests to hang up on, rather than answer
+        self.stalls = 0 # Requests to leave unanswered
+
+        self._cipher = pytuya.AESCipher(LOCAL_KEY.encode())
+        self._clients = []
+        self._lock = threading.Lock()
+
+        self._server = socket.socket()
+        self._server.bind(('127.0.0.1', 0))
+        self._server.listen(64)
+
+        self.port = self._server.getsockname()[1]
+
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stop listening and hang up every connection
+        """
+
+        self._server.close()
+
+        with self._lock:
+            clients, self._clients = self._clients, []
+
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+            client.close()
+
+    def push(self, dps, seqno=0):
+        """
+        Take on {dps} and push them down every open connection
+        """
+
+        self.dps.update(dps)
+
+        frame = self._push_frame(dps, seqno)
+
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.sendall(frame)
+            except OSError:
+                pass
+
+    def commands(self):
+        """
+        Returns the command numbers of the requests received, in order
+        """
+
+        return [command for _, command in self.requests]
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+
+            with self._lock:
+                self.connections += 1
+                self._clients.append(client)
+
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        parser = pytuya.FrameParser()
+        served = 0
+
+        while True:
+            try:
+                data = client.recv(4096)
+            except OSError:
+                return
+
+            if not data:
+                client.close()
+
+                return
+
+            parser.feed(data)
+
+            for frame in parser.frames():
+                seqno, command, _, payload = pytuya.unpack_frame(frame)
+
+                self.requests.append((seqno, command))
+
+                if command in self.silent:
+                    continue
+
+                if self.stalls:
+                    self.stalls -= 1
+
+                    continue
+
+                if self.hang_ups:
+                    self.hang_ups -= 1
+
+                    client.close()
+
+                    return
+
+                if self.delay:
+                    time.sleep(self.delay)
+
+                try:
+                    client.sendall(self._reply(seqno, command, payload))
+                except OSError:
+                    return
+
+                served += 1
+
+                if self.close_after is not None and served >= self.close_after:
+                    client.close()
+
+                    return
+
+    def _reply(self, seqno, command, payload):
+        if command == pytuya.STATUS_COMMAND:
+            body = json.dumps({'devId': DEVICE_ID, 'dps': self.dps}).encode()
+
+            return pytuya.pack_frame(seqno, command, body, retcode=0)
+
+        if command == 0x07: # SET
+            data = json.loads(self._cipher.decrypt(payload[len(pytuya.PROTOCOL_VERSION_BYTES) + 16:]))
+
+            self.dps.update(data['dps'])
+
+            reply = pytuya.pack_frame(seqno, command, b'', retcode=0)
+
+            if self.echo:
+                reply += self._push_frame(data['dps'], seqno)
+
+            return reply
+
+        return pytuya.pack_frame(seqno, command, b'', retcode=0)
+
+    def _push_frame(self, dps, seqno):
+        body = json.dumps({'devId': DEVICE_ID, 'dps': dps, 't': int(time.time())}).encode()
+
+        crypted = self._cipher.encrypt(body)
+
+        signature = md5(b'data=' + crypted + b'||lpv=3.1||' + LOCAL_KEY.encode()).hexdigest()[8:24]
+
+        payload = pytuya.PROTOCOL_VERSION_BYTES + signature.encode() + crypted
+
+        return pytuya.pack_frame(seqno, pytuya.PUSH_COMMAND, payload, retcode=0)
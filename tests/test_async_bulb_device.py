@@ -0,0 +1,83 @@
+"""
+Tests for expower.AsyncBulbDevice and expower.AsyncBulb, against a
+... <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import asyncio
+import expower
+import pytest
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+def test_commands_share_one_connection():
+    async def main(fake):
+        async with expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY) as bulb:
+            bulb.port = fake.port
+
+            await bulb.turn_off()
+            await bulb.set_brightness(50)
+
+            return (await bulb.state()).to_dict()
+
+    with FakeBulb() as fake:
+        state = run(main(fake))
+
+        assert not fake.dps['1']
+        assert fake.connections == 1
+
+    assert (state['on'], state['brightness']) == (False, 50)
+
+def test_async_bulb_matches_the_sync_state():
+    async def main(fake):
+        bulb = expower.AsyncBulb(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        try:
+            return (await bulb.state()).to_dict()
+        finally:
+            await bulb.BulbDevice.close()
+
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        assert run(main(fake)) == bulb.state().to_dict()
+
+def test_watch_yields_pushed_changes():
+    async def push(fake):
+        value = 10
+
+        while True:
+            await asyncio.sleep(0.05)
+
+            fake.push({'3': value})
+
+            value += 1
+
+    async def main(fake):
+        async with expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY) as bulb:
+            bulb.port = fake.port
+
+            pusher = asyncio.ensure_future(push(fake))
+
+            try:
+                async for changes in bulb.watch():
+                    return changes
+            finally:
+                pusher.cancel()
+
+    with FakeBulb() as fake:
+        assert 'brightness' in run(main(fake))
+
+def test_timeout_bounds_the_call():
+    async def main(fake):
+        async with expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, timeout=0.1) as bulb:
+            bulb.port = fake.port
+
+            with pytest.raises(asyncio.TimeoutError):
+                await bulb.status()
+
+    with FakeBulb(delay=0.5) as fake:
+        run(main(fake))
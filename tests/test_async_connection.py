@@ -0,0 +1,64 @@
+"""
+Tests for pytuya.AsyncConnection, against a <FakeBulb>
+"""
+
+from expower import pytuya
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import asyncio
+
+def encoder():
+    return pytuya.FrameEncoder(DEVICE_ID, 'device', pytuya.AESCipher(LOCAL_KEY.encode()))
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+def test_pipelined_replies_are_matched_by_seqno():
+    async def main(fake):
+        connection = pytuya.AsyncConnection('127.0.0.1', fake.port)
+
+        frames = [encoder().encode(pytuya.STATUS, seqno=seqno) for seqno in (1, 2, 3)]
+
+        try:
+            replies = await asyncio.gather(*map(connection.send_receive, frames))
+        finally:
+            await connection.close()
+
+        return [pytuya.unpack_frame(reply).seqno for reply in replies], fake.connections
+
+    with FakeBulb(delay=0.01) as fake:
+        assert run(main(fake)) == ([1, 2, 3], 1)
+
+def test_late_reply_is_dropped_but_pushes_are_not():
+    async def main(fake):
+        unsolicited: list = []
+
+        connection = pytuya.AsyncConnection('127.0.0.1', fake.port, on_unsolicited=unsolicited.append)
+
+        try:
+            fake.delay = 0.3
+
+            try:
+                await connection.send_receive(encoder().encode(pytuya.STATUS, seqno=1), timeout=0.1)
+            except asyncio.TimeoutError:
+                pass
+
+            fake.delay = 0
+
+            reply = await connection.send_receive(encoder().encode(pytuya.STATUS, seqno=2))
+
+            await asyncio.sleep(0.3) # The late reply to seqno 1 arrives
+
+            fake.push({'1': False}, seqno=1) # e.g. the echo of a SET
+
+            for _ in range(100):
+                if unsolicited:
+                    break
+
+                await asyncio.sleep(0.01)
+        finally:
+            await connection.close()
+
+        return pytuya.unpack_frame(reply).seqno, [pytuya.unpack_frame(frame)[:2] for frame in unsolicited]
+
+    with FakeBulb() as fake:
+        assert run(main(fake)) == (2, [(1, pytuya.PUSH_COMMAND)])
@@ -0,0 +1,96 @@
+"""
+Tests for how expower.BulbDevice handles the frames a Bulb pushes
+"""
+
+from .fakes import FakeBulb
+from expower import pytuya
+import expower
+import json
+import threading
+
+DEVICE_ID = '01234567891234567890'
+LOCAL_KEY = '0123456789abcdef'
+
+DPS = \
+{
+    '1': True,
+    '2': 'white',
+    '3': 100,
+    '4': 100,
+    '5': '320a32012ccc32',
+    '6': '3855b40168ffff',
+    '7': '24d10101ff0000',
+    '8': '78ac0106692626695d26266926266269332669692661',
+    '9': '311b0101ff0000',
+    '10': 'ffff0106ff0000ffe60009ff0000f7fffffffff700ff',
+}
+
+def status_frame(**dps):
+    """
+    Returns a STATUS frame carrying DPS, updated with {dps}
+    """
+
+    payload = json.dumps({'devId': DEVICE_ID, 'dps': {**DPS, **dps}}).encode()
+
+    return pytuya.pack_frame(0, pytuya.STATUS_COMMAND, payload, retcode=0)
+
+def cached_dps(bulb):
+    return bulb.cache.value['dps']
+
+def test_failing_subscriber_does_not_stop_the_others():
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+
+    received: list = []
+
+    def fail(changes):
+        raise RuntimeError('subscriber bug')
+
+    bulb._subscribe(fail)
+    bulb._subscribe(received.append)
+
+    bulb._pushed(status_frame(), bulb.cache.generation)
+    bulb._pushed(status_frame(**{'3': 50}))
+
+    assert len(received) == 1
+
+def test_pushed_status_after_a_write_is_applied():
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+
+    bulb.cache.set({'devId': DEVICE_ID, 'dps': dict(DPS)})
+
+    generation = bulb.cache.generation
+
+    bulb.cache.apply({'3': 200}) # A write, after the Watcher asked for the status
+
+    assert bulb._pushed(status_frame(**{'3': 150}), generation) # Stale reply, dropped
+    assert cached_dps(bulb)['3'] == 200
+
+    assert not bulb._pushed(status_frame(**{'3': 50})) # Pushed later
+    assert cached_dps(bulb)['3'] == 50
+
+def test_watch_yields_pushed_changes():
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        stop = threading.Event()
+
+        def push():
+            value = 10
+
+            while not stop.wait(0.1):
+                fake.push({'3': value})
+
+                value += 1
+
+        threading.Thread(target=push, daemon=True).start()
+
+        changes = bulb.watch()
+
+        try:
+            assert 'brightness' in next(changes)
+        finally:
+            stop.set()
+            changes.close()
+
+        assert not bulb._subscriptions
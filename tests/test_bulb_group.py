@@ -0,0 +1,48 @@
+"""
+Tests for expower.BulbGroup, fanning out to several <FakeBulb>s
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import concurrent.futures
+import contextlib
+import expower
+import socket
+import time
+
+def bulb_for(fake):
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+    bulb.port = fake.port
+
+    return bulb
+
+def test_commands_fan_out_concurrently():
+    with contextlib.ExitStack() as stack:
+        fakes = [stack.enter_context(FakeBulb(delay=0.3)) for _ in range(4)]
+
+        with expower.BulbGroup(map(bulb_for, fakes)) as group:
+            start = time.perf_counter()
+
+            results = group.turn_off()
+
+            elapsed = time.perf_counter() - start
+
+        assert [result.bulb.port for result in results] == [fake.port for fake in fakes]
+        assert all(result.ok for result in results)
+        assert not any(fake.dps['1'] for fake in fakes)
+
+    assert elapsed < 0.9 # One after another would take 1.2s
+
+def test_slow_and_unreachable_bulbs_are_reported():
+    with socket.socket() as closed:
+        closed.bind(('127.0.0.1', 0))
+
+        unreachable = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        unreachable.port = closed.getsockname()[1]
+
+    with FakeBulb() as fast, FakeBulb(delay=1) as slow:
+        with expower.BulbGroup([bulb_for(fast), bulb_for(slow), unreachable], timeout=0.5) as group:
+            results = group.status()
+
+    assert results[0].ok and results[0].result['dps'] == list(fast.dps.values())
+    assert isinstance(results[1].error, concurrent.futures.TimeoutError) and results[1].elapsed is None
+    assert isinstance(results[2].error, OSError)
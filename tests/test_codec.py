@@ -0,0 +1,102 @@
+"""
+Tests for expower.codec, against the original formulas in tests.baseline
+"""
+
+from expower import codec
+from expower import pytuya
+from . import baseline
+import pytest
+import random
+
+PERCENTAGES = list(range(-5, 106)) + [0.5, 12.5, 99.9]
+
+@pytest.mark.parametrize('byte', range(256))
+def test_decode_levels_match_baseline(byte):
+    assert codec.decode_brightness(byte) == baseline.hexvalue_to_brightness(byte)
+    assert codec.decode_saturation(byte) == baseline.hexvalue_to_saturation(byte)
+    assert codec.decode_speed(byte) == baseline.hexvalue_to_speed(byte)
+
+@pytest.mark.parametrize('percentage', PERCENTAGES)
+def test_encode_levels_match_baseline(percentage):
+    assert codec.encode_brightness(percentage) == baseline.brightness_to_hexvalue(percentage)
+    assert codec.encode_saturation(percentage) == baseline.saturation_to_hexvalue(percentage)
+    assert codec.encode_speed(percentage) == baseline.speed_to_hexvalue(percentage)
+
+def test_custom_offset_matches_baseline():
+    for value in range(101):
+        assert codec.encode_brightness(value, u=20) == baseline.brightness_to_hexvalue(value, u=20)
+        assert codec.encode_saturation(value, u=20) == baseline.saturation_to_hexvalue(value, u=20)
+
+    for byte in range(256):
+        assert codec.decode_brightness(byte, u=20) == baseline.hexvalue_to_brightness(byte, u=20)
+        assert codec.decode_saturation(byte, u=20) == baseline.hexvalue_to_saturation(byte, u=20)
+
+def test_levels_round_trip():
+    for percentage in range(101):
+        assert codec.decode_speed(codec.encode_speed(percentage)) == percentage
+        assert codec.decode_saturation(codec.encode_saturation(percentage)) == percentage
+
+    for percentage in range(1, 101):
+        assert codec.decode_brightness(codec.encode_brightness(percentage)) == percentage
+
+def test_colour_matches_baseline_and_round_trips():
+    rng = random.Random(1)
+
+    colours = [(0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 0, 1)]
+    colours += [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(5000)]
+
+    for rgb in colours:
+        hexvalue = codec.encode_colour(*rgb)
+
+        assert hexvalue == baseline.rgb_to_hexvalue(*rgb) == pytuya.BulbDevice._rgb_to_hexvalue(*rgb)
+        assert codec.decode_colour(hexvalue) == rgb == baseline.hexvalue_to_rgb(hexvalue)
+        assert codec.decode_rgb(codec.encode_rgb(*rgb)) == rgb
+
+@pytest.mark.parametrize('rgb', [(256, 0, 0), (0, -1, 0)])
+def test_colour_out_of_range(rgb):
+    with pytest.raises(ValueError):
+        codec.encode_colour(*rgb)
+
+def test_flash_scenes_decode_like_baseline():
+    rng = random.Random(2)
+
+    for _ in range(5000):
+        one = bytes(rng.randrange(256) for _ in range(7)).hex()
+        six = bytes(rng.randrange(256) for _ in range(22)).hex()
+
+        assert codec.decode_one_colour_flash_scene(one) == baseline.decode_one_colour_flash_scene(one)
+        assert codec.decode_one_colour_flash_scene(one, True) \
+            == baseline.decode_one_colour_flash_scene(one, flipped=True)
+        assert codec.decode_six_colour_flash_scene(six) == baseline.decode_six_colour_flash_scene(six)
+
+def test_flash_scenes_round_trip():
+    rng = random.Random(3)
+
+    for _ in range(2000):
+        saturation, brightness, speed = rng.randrange(101), rng.randrange(1, 101), rng.randrange(101)
+        colours = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(6)]
+
+        hexvalue = codec.encode_one_colour_flash_scene(saturation, brightness, speed, colours[0])
+
+        assert codec.decode_one_colour_flash_scene(hexvalue) == \
+        {
+            'colour': colours[0],
+            'speed': speed,
+            'brightness': brightness,
+            'saturation': saturation,
+        }
+
+        hexvalue = codec.encode_six_colour_flash_scene(saturation, brightness, speed, colours)
+
+        assert codec.decode_six_colour_flash_scene(hexvalue) == \
+        {
+            'colours': colours,
+            'speed': speed,
+            'brightness': brightness,
+            'saturation': saturation,
+        }
+
+@pytest.mark.parametrize('hexvalue', ['', '00', 'ff' * 8, 'ff' * 21])
+def test_flash_scenes_malformed(hexvalue):
+    assert codec.decode_one_colour_flash_scene(hexvalue) == {}
+    assert codec.decode_six_colour_flash_scene(hexvalue) == {}
@@ -0,0 +1,50 @@
+"""
+Tests for expower.CommandQueue, against a fake device
+"""
+
+import expower
+import threading
+
+class FakeDevice(object):
+    """
+    Records the commands run, blocking the first until released
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.busy = threading.Event()
+        self.release = threading.Event()
+
+    def status(self):
+        self.busy.set()
+        self.release.wait(5)
+        self.calls.append('status')
+
+        return {'dps': {'1': True}}
+
+    def set_brightness(self, brightness):
+        self.calls.append(('set_brightness', brightness))
+
+        return brightness
+
+def test_write_supersedes_only_supersedable_reads():
+    device = FakeDevice()
+
+    with expower.CommandQueue(device) as queue:
+        busy = queue.status() # Keeps the worker busy while the rest queue
+
+        assert device.busy.wait(5)
+
+        read = queue.status()
+        poll = queue.submit('status', supersedable=True)
+        write = queue.set_brightness(40)
+
+        device.release.set()
+
+        assert write.result(5) == 40
+        assert read.result(5) == {'dps': {'1': True}}
+        assert poll.cancelled()
+        assert busy.result(5)
+
+    assert device.calls == ['status', ('set_brightness', 40), 'status']
+    assert queue.stats()['superseded'] == 1
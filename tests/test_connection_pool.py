@@ -0,0 +1,45 @@
+"""
+Tests for pytuya.ConnectionPool, in front of a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+import time
+
+def test_pool_counters():
+    pool = pytuya.ConnectionPool(idle_timeout=60)
+
+    with FakeBulb() as fake:
+        device = pytuya.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, connection_pool=pool)
+        device.port = fake.port
+
+        assert device.status()['dps'] == fake.dps # Miss
+        assert device.status()['dps'] == fake.dps # Hit
+
+        fake.hang_ups = 1
+
+        assert device.status()['dps'] == fake.dps # Hit, reset, reconnected (a miss)
+
+        pool.idle_timeout = 0
+
+        time.sleep(0.01)
+
+        assert device.status()['dps'] == fake.dps # Evicted, miss
+
+        assert fake.connections == 3
+
+    assert pool.stats() == {'hits': 2, 'misses': 3, 'evictions': 1, 'reconnects': 1, 'idle': 1}
+
+def test_pool_keeps_max_idle():
+    pool = pytuya.ConnectionPool(max_idle=1)
+
+    with FakeBulb() as fake:
+        first = pool.connect('127.0.0.1', fake.port, 1)
+        second = pool.connect('127.0.0.1', fake.port, 1)
+
+        pool.release('127.0.0.1', fake.port, first)
+        pool.release('127.0.0.1', fake.port, second) # Surplus
+
+        assert pool.acquire('127.0.0.1', fake.port, 1) == (first, True)
+
+    assert (pool.hits, pool.misses, pool.evictions) == (1, 0, 1)
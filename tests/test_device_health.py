@@ -0,0 +1,116 @@
+"""
+Tests for expower.DeviceHealth, the circuit breaker, on its own and
+... in front of a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import asyncio
+import expower
+import pytest
+import time
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_transitions():
+    clock = Clock()
+
+    health = expower.DeviceHealth(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    health.record_failure()
+
+    assert health.state == health.CLOSED and health.allow()
+
+    health.record_failure()
+
+    assert health.state == health.OPEN and not health.allow()
+
+    with pytest.raises(expower.CircuitOpenError):
+        health.check()
+
+    clock.now = 10
+
+    assert health.allow() and health.state == health.HALF_OPEN
+    assert not health.allow() # Just the one trial
+
+    health.record_failure() # The trial failed
+
+    assert health.state == health.OPEN and not health.allow()
+
+    clock.now = 20
+
+    assert health.allow()
+
+    health.record_success(0.01)
+
+    assert health.state == health.CLOSED and health.allow()
+    assert (health.trips, health.rejected, health.consecutive_failures) == (2, 4, 0)
+
+def test_probe_closes_the_breaker():
+    health = expower.DeviceHealth(failure_threshold=1, reset_timeout=60, probe=lambda: True, probe_interval=0.01)
+
+    health.record_failure()
+
+    for _ in range(500):
+        if health.state == health.CLOSED:
+            break
+
+        time.sleep(0.01)
+
+    assert health.state == health.CLOSED and health.probes >= 1
+
+def half_open(clock):
+    health = expower.DeviceHealth(failure_threshold=1, reset_timeout=10, clock=clock)
+
+    health.record_failure()
+
+    clock.now = 10
+
+    return health
+
+def test_unexpected_error_ends_the_trial(monkeypatch):
+    clock = Clock()
+
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, health=half_open(clock))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('not an OSError')
+
+    monkeypatch.setattr(bulb.connection_pool, 'acquire', fail) # The shared default pool
+
+    with pytest.raises(RuntimeError):
+        bulb.status()
+
+    assert bulb.health.state == bulb.health.OPEN
+
+    clock.now = 20
+
+    assert bulb.health.allow() # Not stuck half open
+
+def test_cancelled_request_ends_the_trial():
+    clock = Clock()
+
+    async def main(fake):
+        bulb = expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, health=half_open(clock))
+        bulb.port = fake.port
+
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(bulb.status(), 0.1)
+        finally:
+            await bulb.close()
+
+        return bulb.BulbDevice.health
+
+    with FakeBulb(delay=0.5) as fake:
+        health = asyncio.run(main(fake))
+
+    assert health.state == health.OPEN
+
+    clock.now = 20
+
+    assert health.allow()
@@ -0,0 +1,109 @@
+"""
+Tests for expower.discovery, using a fake broadcaster on localhost
+"""
+
+from expower import discovery
+from expower import pytuya
+import expower
+import json
+import socket
+import time
+
+DEVICE_ID = '01234567891234567890'
+LOCAL_KEY = '0123456789abcdef'
+
+def announcement(ip, encrypted=False):
+    """
+    Returns a discovery broadcast from DEVICE_ID at {ip}
+    """
+
+    payload = json.dumps({'ip': ip, 'gwId': DEVICE_ID, 'version': '3.1', 'encrypt': encrypted}).encode()
+
+    if encrypted:
+        payload = pytuya.AESCipher(pytuya.UDP_KEY)._pad(payload)
+        payload = pytuya.AES_BACKENDS[pytuya.default_aes_backend](pytuya.UDP_KEY).encrypt(payload)
+
+    return pytuya.pack_frame(0, 0x13, payload, retcode=0)
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+
+        time.sleep(0.01)
+
+def test_handle_decodes_plain_and_encrypted():
+    listener = discovery.Discovery()
+
+    assert listener.handle(announcement('10.0.0.2'), ('10.0.0.2', 6666)).ip == '10.0.0.2'
+    assert listener.handle(announcement('10.0.0.3', True), ('10.0.0.3', 6667)).encrypted
+    assert listener.handle(b'junk', ('10.0.0.4', 6666)) is None
+
+    assert listener.registry[DEVICE_ID].ip == '10.0.0.3'
+    assert (listener.received, listener.errors, listener.registry.moves) == (3, 1, 1)
+
+def test_broadcast_moves_tracked_bulb():
+    bulb = expower.Bulb(DEVICE_ID, '10.0.0.1', LOCAL_KEY)
+
+    registry = discovery.DeviceRegistry()
+    registry.track(bulb)
+
+    ports = (free_udp_port(), free_udp_port())
+
+    with discovery.Discovery(registry, ports=ports, address='127.0.0.1'):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as broadcaster:
+            broadcaster.sendto(announcement('10.0.0.1'), ('127.0.0.1', ports[0]))
+            broadcaster.sendto(announcement('10.0.0.2', True), ('127.0.0.1', ports[1]))
+
+            wait_for(lambda: registry.moves == 1)
+
+    assert bulb.host == bulb.BulbDevice.address == '10.0.0.2'
+
+def test_bulb_follows_its_device_when_moved():
+    bulb = expower.Bulb(DEVICE_ID, '10.0.0.1', LOCAL_KEY)
+    group = expower.BulbGroup([bulb])
+
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+
+        bulb.port = server.getsockname()[1]
+
+        bulb.BulbDevice.move('127.0.0.1')
+
+        assert bulb.host == '127.0.0.1'
+        assert bulb.ping()
+        assert group.ping()[0].reachable
+
+def test_failing_listener_does_not_stop_listening():
+    registry = discovery.DeviceRegistry()
+    seen = []
+
+    def listener(device, previous):
+        seen.append(device.ip)
+
+        if len(seen) == 1:
+            raise RuntimeError('listener bug')
+
+    registry.add_listener(listener)
+
+    port = free_udp_port()
+
+    with discovery.Discovery(registry, ports=(port,), address='127.0.0.1') as listening:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as broadcaster:
+            broadcaster.sendto(announcement('10.0.0.1'), ('127.0.0.1', port))
+
+            wait_for(lambda: listening.errors == 1)
+
+            broadcaster.sendto(announcement('10.0.0.2'), ('127.0.0.1', port))
+
+            wait_for(lambda: registry[DEVICE_ID].ip == '10.0.0.2')
+
+    assert seen == ['10.0.0.1', '10.0.0.2']
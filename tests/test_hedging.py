@@ -0,0 +1,51 @@
+"""
+Tests for pytuya.HedgePolicy, on its own and hedging a <FakeBulb>'s
+... stalled replies
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+import time
+
+def frame(command):
+    return pytuya.pack_frame(1, command, b'', retcode=0)
+
+def measured(*samples):
+    rtt = pytuya.RttTracker(min_samples=len(samples))
+
+    for sample in samples:
+        rtt.record(sample)
+
+    return rtt
+
+def test_delay_is_the_percentile_of_reads_only():
+    policy = pytuya.HedgePolicy(percentile=50)
+
+    rtt = measured(0.1, 0.2, 0.3, 0.4)
+
+    assert policy.delay(frame(pytuya.STATUS_COMMAND), rtt) == 0.3
+    assert policy.delay(frame(0x07), rtt) is None # Writes are never sent twice
+    assert policy.delay(frame(pytuya.STATUS_COMMAND), rtt, timeout=0.3) is None # No time to hedge
+
+    rtt.min_samples = 5
+
+    assert policy.delay(frame(pytuya.STATUS_COMMAND), rtt) is None # Not measured enough yet
+
+def test_stalled_read_is_answered_on_a_second_connection():
+    with FakeBulb() as fake:
+        device = pytuya.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, hedge_policy=pytuya.HedgePolicy())
+        device.port = fake.port
+
+        for _ in range(device.rtt.min_samples):
+            device.status()
+
+        fake.stalls = 1
+
+        start = time.perf_counter()
+
+        assert device.status()['dps'] == fake.dps
+
+        assert time.perf_counter() - start < 1 # Rather than the 10s timeout
+        assert fake.connections == 2
+
+    assert device.hedge_policy.stats() == {'hedges': 1, 'wins': 1, 'win_ratio': 1.0}
@@ -0,0 +1,91 @@
+"""
+Tests for expower.Poller, against a fake Bulb
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import expower
+import logging
+import socket
+import time
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+
+        time.sleep(0.01)
+
+def test_failing_callback_is_logged(caplog):
+    def on_change(bulb, status):
+        raise RuntimeError('callback bug')
+
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        with caplog.at_level(logging.ERROR, 'expower.bulbs.Poller'):
+            with expower.Poller([bulb], min_interval=0.01, rate=None, on_change=on_change) as poller:
+                wait_for(lambda: caplog.records)
+
+                fake.push({'3': 50}) # Changes again, so polls go on
+
+                wait_for(lambda: poller.changes >= 2)
+
+    assert 'callback bug' in caplog.text
+
+def test_interval_stretches_until_the_bulb_changes():
+    changes = []
+
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        poller = expower.Poller \
+        (
+            [bulb],
+            min_interval = 0.01,
+            max_interval = 0.64,
+            backoff = 4,
+            rate = None,
+            on_change = lambda bulb, status: changes.append(status),
+        )
+
+        with poller:
+            wait_for(lambda: poller.interval(bulb) == 0.64)
+
+            fake.dps['3'] = 25
+
+            poller.poll_now(bulb)
+
+            wait_for(lambda: len(changes) == 2)
+
+        assert poller.interval(bulb) < 0.64
+
+    assert changes[1]['dps'][2] == 25
+    assert poller.stats()['changes'] == 2
+
+def test_offline_bulb_backs_off_to_the_offline_interval():
+    errors = []
+
+    with socket.socket() as closed:
+        closed.bind(('127.0.0.1', 0))
+
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, connection_attempts=1)
+        bulb.port = closed.getsockname()[1]
+
+    poller = expower.Poller \
+    (
+        [bulb],
+        offline_interval = 0.01,
+        max_offline_interval = 0.04,
+        rate = None,
+        on_error = lambda bulb, error: errors.append(error),
+    )
+
+    with poller:
+        wait_for(lambda: len(errors) >= 4)
+
+    assert poller.interval(bulb) == 0.04
+    assert isinstance(errors[0], ConnectionRefusedError)
+    assert poller.stats()['offline'] == 1
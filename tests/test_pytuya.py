@@ -0,0 +1,147 @@
+"""
+Tests for expower.pytuya, against the original code in tests.baseline
+"""
+
+from expower import pytuya
+from . import baseline
+import base64
+import pytest
+import socket
+
+KEY = b'0123456789abcdef'
+
+MESSAGES = [b'', b'x', b'{"dps":{"1":true}}', b'0123456789abcdef', bytes(range(200))]
+
+@pytest.mark.parametrize('backend', list(pytuya.AES_BACKENDS))
+def test_aes_backends_match_baseline(backend):
+    cipher = pytuya.AESCipher(KEY, backend)
+
+    for message in MESSAGES:
+        assert cipher.encrypt(message) == baseline.AESCipher(KEY).encrypt(message)
+
+@pytest.mark.parametrize('backend', list(pytuya.AES_BACKENDS))
+def test_aes_round_trip(backend):
+    cipher = pytuya.AESCipher(KEY, backend)
+
+    for message in MESSAGES[:4]:
+        assert cipher.decrypt(cipher.encrypt(message)) == message.decode('utf-8')
+
+    assert cipher.encrypt_many(MESSAGES) == [cipher.encrypt(message) for message in MESSAGES]
+
+@pytest.mark.parametrize('command, data', \
+[
+    ('status', None),
+    ('set', {'1': True}),
+    ('set', {'1': True, '2': 'colour', '5': '0000ff00f0ffff'}),
+    ('set', {'3': 255, '4': 0}),
+])
+def test_frames_match_baseline(command, data):
+    encoder = pytuya.FrameEncoder('01234567891234567890', 'device', pytuya.AESCipher(KEY), clock=lambda: 1600000000)
+
+    expected = baseline.generate_payload('01234567891234567890', KEY, command, data, clock=lambda: 1600000000)
+
+    assert encoder.encode(command, data) == expected
+    assert encoder.encode(command, data) == expected # From the cache
+    assert encoder.encode_many(command, [data], [0]) == [expected]
+
+def test_frame_cache_tells_equal_values_apart():
+    encoder = pytuya.FrameEncoder('01234567891234567890', 'device', pytuya.AESCipher(KEY), clock=lambda: 1600000000)
+
+    for data in ({'1': True}, {'1': 1}, {'1': 1.0}, {1: 1}, {True: 1}):
+        expected = baseline.generate_payload('01234567891234567890', KEY, 'set', data, clock=lambda: 1600000000)
+
+        assert encoder.encode('set', data) == expected
+
+    assert encoder.encode('set', {'1': [1, 2]}) == encoder.encode('set', {'1': [1, 2]}) # Not cached
+    assert (encoder.hits, encoder.misses) == (0, 5)
+
+@pytest.mark.parametrize('backend', list(pytuya.AES_BACKENDS))
+def test_aes_bad_input_does_not_spoil_later_messages(backend):
+    cipher = pytuya.AESCipher(KEY, backend)
+
+    crypted = cipher.encrypt(b'{"dps":{"1":true}}')
+
+    with pytest.raises(ValueError):
+        cipher.decrypt(base64.b64encode(b'x' * 21))
+
+    assert cipher.decrypt(crypted) == '{"dps":{"1":true}}'
+
+def test_junk_broadcast_does_not_spoil_later_ones():
+    payload = pytuya.AESCipher(pytuya.UDP_KEY)._pad(b'{"gwId":"0123","ip":"10.0.0.2"}')
+    payload = pytuya.AES_BACKENDS[pytuya.default_aes_backend](pytuya.UDP_KEY).encrypt(payload)
+
+    with pytest.raises(ValueError):
+        pytuya.decode_broadcast(pytuya.pack_frame(0, 0x13, b'x' * 21, retcode=0))
+
+    assert pytuya.decode_broadcast(pytuya.pack_frame(0, 0x13, payload, retcode=0))['ip'] == '10.0.0.2'
+
+def frames(*payloads):
+    return [pytuya.pack_frame(seqno, pytuya.STATUS_COMMAND, payload, retcode=0) for seqno, payload in enumerate(payloads, 1)]
+
+def test_parser_splits_one_read_into_frames():
+    parser = pytuya.FrameParser()
+
+    expected = frames(b'{"a":1}', b'', b'{"b":2}')
+
+    parser.feed(b''.join(expected))
+
+    assert list(parser.frames()) == expected
+    assert len(parser) == 0
+
+def test_parser_joins_a_frame_split_across_reads():
+    parser = pytuya.FrameParser()
+
+    data = b''.join(frames(b'{"dps":{"1":true}}', b'{"dps":{"1":false}}'))
+
+    received = []
+
+    for index in range(0, len(data), 5):
+        parser.feed(data[index:index + 5])
+
+        received.extend(parser.frames())
+
+    assert received == frames(b'{"dps":{"1":true}}', b'{"dps":{"1":false}}')
+
+def test_parser_grows_for_large_payloads():
+    parser = pytuya.FrameParser(size=64)
+
+    expected = frames(b'x' * 5000, b'y' * 1500)
+
+    data = b''.join(expected)
+
+    parser.feed(data[:3000])
+
+    assert list(parser.frames()) == []
+
+    parser.feed(data[3000:])
+
+    assert list(parser.frames()) == expected
+
+def test_parser_resynchronises_after_garbage():
+    parser = pytuya.FrameParser()
+
+    first, second, third = frames(b'{"a":1}', b'{"b":2}', b'{"c":3}')
+
+    bad_length = pytuya.FRAME_HEADER.pack(0x55aa, 9, 10, 0xfffffff) # Claims to be huge
+    no_suffix = first[:-4] + b'\xde\xad\xbe\xef'
+
+    parser.feed(b'garbage' + first + b'\x00\x00\x55' + bad_length + second + no_suffix)
+    parser.feed(b'\x00\x00' + third)
+
+    assert list(parser.frames()) == [first, second, third]
+
+def test_parser_reads_from_a_socket():
+    parser = pytuya.FrameParser(size=16)
+
+    expected = frames(b'x' * 2000, b'{"a":1}')
+
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        sender.sendall(b''.join(expected))
+        sender.close()
+
+        while parser.recv_into(receiver, 1024):
+            pass
+
+    assert list(parser.frames()) == expected
@@ -0,0 +1,84 @@
+"""
+Tests for pytuya.RetryPolicy, on its own and in front of a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+import pytest
+import socket
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+def test_backoff_grows_and_is_capped():
+    policy = pytuya.RetryPolicy(backoff=0.1, factor=2, max_backoff=0.5, jitter=0.5, random=lambda: 0)
+
+    assert [policy.delay(retry) for retry in range(1, 6)] == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+    policy.random = lambda: 1 # All the jitter
+
+    assert policy.delay(2) == pytest.approx(0.1)
+
+def test_deadline_cuts_attempts_short():
+    clock = Clock()
+    timeouts = []
+
+    def attempt(timeout):
+        timeouts.append(timeout)
+
+        clock.now += 0.4
+
+        raise ConnectionResetError()
+
+    policy = pytuya.RetryPolicy(attempts=10, backoff=0.01, factor=1, jitter=0, deadline=1, clock=clock)
+
+    with pytest.raises(ConnectionResetError):
+        policy.run(attempt, timeout=5)
+
+    assert timeouts == pytest.approx([1, 0.6, 0.2]) # The next backoff would overrun
+    assert policy.stats() == {'attempts': 3, 'retries': 2, 'successes': 0, 'failures': 1}
+
+def test_other_errors_are_not_retried():
+    def attempt(timeout):
+        raise ValueError('bad reply')
+
+    policy = pytuya.RetryPolicy(attempts=3, backoff=0)
+
+    with pytest.raises(ValueError):
+        policy.run(attempt)
+
+    assert (policy.attempts_made, policy.failures) == (1, 1)
+
+def test_device_retries_until_the_bulb_answers():
+    with FakeBulb() as fake:
+        device = pytuya.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        device.port = closed_port()
+
+        def on_attempt(attempt):
+            device.port = fake.port # Back up after the first attempt
+
+        device.retry_policy = pytuya.RetryPolicy(attempts=3, backoff=0.01, on_attempt=on_attempt)
+
+        assert device.status()['dps'] == fake.dps
+
+    assert [attempt.error is None for attempt in device.retry_policy.history] == [False, True]
+    assert isinstance(device.retry_policy.history[0].error, ConnectionRefusedError)
+
+def test_device_gives_up_after_its_attempts():
+    device = pytuya.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, connection_attempts=2)
+    device.port = closed_port()
+
+    with pytest.raises(ConnectionRefusedError):
+        device.status()
+
+    assert device.retry_policy.stats() == {'attempts': 2, 'retries': 1, 'successes': 0, 'failures': 1}
@@ -0,0 +1,60 @@
+"""
+Tests for pytuya.RttTracker and the adaptive timeouts it gives a device
+... talking to a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+import pytest
+import socket
+import time
+
+def test_timeout_is_bounded():
+    rtt = pytuya.RttTracker(window=10, percentile=90, factor=3, floor=0.2, min_samples=5)
+
+    for sample in (0.01, 0.02, 0.03, 0.04):
+        rtt.record(sample)
+
+    assert rtt.timeout() is None and rtt.timeout(5) == 5 # Too few samples
+
+    rtt.record(0.05)
+
+    assert rtt.timeout() == 0.2 # Floor, 3 * 0.05 is shorter
+
+    for _ in range(10):
+        rtt.record(1)
+
+    assert rtt.timeout() == 3 and rtt.timeout(2) == 2 # Ceiling
+    assert len(rtt) == 10
+
+def test_timed_out_requests_lengthen_the_timeout():
+    rtt = pytuya.RttTracker(window=10, factor=2, floor=0, min_samples=1)
+
+    rtt.record(0.1)
+    rtt.record(0.5, timed_out=True)
+
+    assert rtt.timeout() == pytest.approx(1)
+    assert (rtt.samples, rtt.timeouts) == (2, 1)
+
+def test_device_times_out_sooner_once_it_has_measured():
+    with FakeBulb() as fake:
+        device = pytuya.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, connection_timeout=5)
+        device.port = fake.port
+
+        assert device._read_timeout() == 5
+
+        for _ in range(device.rtt.min_samples):
+            device.status()
+
+        assert device._read_timeout() == device.rtt.floor
+
+        fake.silent.add(pytuya.STATUS_COMMAND)
+
+        start = time.perf_counter()
+
+        with pytest.raises(socket.timeout):
+            device.status()
+
+        assert time.perf_counter() - start < 2
+
+    assert device.rtt.timeouts == 1
@@ -0,0 +1,38 @@
+"""
+Tests for expower.utils.scan and expower.utils.ping, against localhost
+"""
+
+from expower import utils
+import socket
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+def test_scan_keeps_order_within_concurrency():
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+
+        open_port = server.getsockname()[1]
+
+        targets = [('127.0.0.1', open_port), ('127.0.0.1', closed_port())] * 3
+
+        for concurrency in (1, 2, 256):
+            results = utils.scan(targets, timeout=1, concurrency=concurrency)
+
+            assert [(result.host, result.port) for result in results] == targets
+            assert [result.reachable for result in results] == [True, False] * 3
+            assert results[0].latency is not None and results[1].latency is None
+
+def test_ping():
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+
+        assert utils.ping('127.0.0.1', server.getsockname()[1])
+
+    assert not utils.ping('127.0.0.1', closed_port())
+    assert not utils.ping('not a host', 6668)
@@ -0,0 +1,96 @@
+"""
+Tests for expower.bulbs.SingleFlight, coalescing reads of a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+from expower.bulbs import SingleFlight
+import asyncio
+import expower
+import pytest
+import threading
+
+def reads(fake):
+    return fake.commands().count(pytuya.STATUS_COMMAND)
+
+def test_concurrent_reads_share_one_request():
+    with FakeBulb(delay=0.2) as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        start = threading.Barrier(8)
+        results = []
+
+        def read():
+            start.wait()
+
+            results.append(bulb.status())
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert reads(fake) == 1
+
+    assert all(result == results[0] for result in results)
+    assert (bulb.flights.leaders, bulb.flights.joined) == (1, 7)
+
+def test_joined_calls_share_the_error():
+    flights = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait()
+
+        raise ConnectionResetError('reset')
+
+    def call():
+        try:
+            flights.run('status', fail)
+        except ConnectionResetError as error:
+            errors.append(error)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+
+    while not flights._flights:
+        release.wait(0.001)
+
+    follower = threading.Thread(target=call)
+    follower.start()
+
+    while not flights.joined:
+        release.wait(0.001)
+
+    release.set()
+
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+def test_async_reads_share_one_request():
+    async def main(fake):
+        async with expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY) as bulb:
+            bulb.port = fake.port
+
+            impatient = asyncio.ensure_future(asyncio.wait_for(bulb.status(), 0.05))
+
+            results = await asyncio.gather(*(bulb.status() for _ in range(4)))
+
+            with pytest.raises(asyncio.TimeoutError):
+                await impatient # Gave up, without cancelling the read for the others
+
+            return results
+
+    with FakeBulb(delay=0.2) as fake:
+        results = asyncio.run(asyncio.wait_for(main(fake), 10))
+
+        assert reads(fake) == 1
+
+    assert all(result == results[0] for result in results)
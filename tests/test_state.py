@@ -0,0 +1,71 @@
+"""
+Tests for expower.State, as read from a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+import expower
+
+STATE = \
+{
+    'on': True,
+    'mode': 'white',
+    'brightness': 100,
+    'temperature': 100,
+    'colour': (50, 10, 50),
+    'scene': (56, 85, 180),
+    'scenes': \
+    {
+        'soft': {'saturation': 80, 'brightness': 4, 'speed': 100, 'colour': (255, 0, 0)},
+        'colourful': \
+        {
+            'saturation': 64,
+            'brightness': 41,
+            'speed': 100,
+            'colours': [(105, 38, 38), (105, 93, 38), (38, 105, 38), (38, 98, 105), (51, 38, 105), (105, 38, 97)],
+        },
+        'exciting': {'saturation': 0, 'brightness': 10, 'speed': 100, 'colour': (0, 0, 255)},
+        'wonderful': \
+        {
+            'saturation': 100,
+            'brightness': 100,
+            'speed': 100,
+            'colours': [(255, 0, 0), (255, 230, 0), (9, 255, 0), (0, 247, 255), (255, 255, 255), (247, 0, 255)],
+        },
+    },
+}
+
+def read_state(fake):
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+    bulb.port = fake.port
+
+    return bulb.state()
+
+def test_fields_are_decoded_on_access():
+    with FakeBulb() as fake:
+        state = read_state(fake)
+
+    assert state['brightness'] == 100
+    assert list(state._values) == ['brightness']
+
+    assert state['scenes']['soft']['colour'] == (255, 0, 0)
+    assert list(state['scenes']._values) == ['soft'] # The other scenes are left alone
+
+def test_to_dict_matches_the_eager_state():
+    with FakeBulb() as fake:
+        state = read_state(fake)
+
+    assert state.to_dict() == STATE
+    assert state == STATE # As a Mapping
+    assert len(state) == len(STATE)
+
+def test_diff_decodes_only_the_changed_fields():
+    with FakeBulb() as fake:
+        before = read_state(fake)
+
+        fake.dps['3'] = 25
+
+        after = read_state(fake)
+
+    assert list(after.diff(before)) == ['brightness']
+    assert list(after._values) == ['brightness']
+    assert after.diff(None) == {**STATE, 'brightness': after['brightness']}
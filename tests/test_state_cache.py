@@ -0,0 +1,80 @@
+"""
+Tests for expower.StateCache, in front of a <FakeBulb>
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import pytuya
+import expower
+import time
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+def cached_bulb(fake, **kwargs):
+    bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY, **kwargs)
+    bulb.port = fake.port
+    bulb.cache.clock = Clock()
+
+    return bulb
+
+def reads(fake):
+    return fake.commands().count(pytuya.STATUS_COMMAND)
+
+def test_fresh_status_is_served_from_the_cache():
+    with FakeBulb() as fake:
+        bulb = cached_bulb(fake, cache_ttl=10)
+
+        bulb.status()
+        bulb.state()
+
+        assert reads(fake) == 1
+
+        bulb.cache.clock.now = 11
+
+        bulb.status()
+
+        assert reads(fake) == 2
+
+    assert (bulb.cache.hits, bulb.cache.misses) == (1, 2)
+
+def test_stale_status_is_served_while_revalidating():
+    with FakeBulb() as fake:
+        bulb = cached_bulb(fake, cache_ttl=1, stale_while_revalidate=True)
+
+        assert bulb.state()['brightness'] == 100
+
+        fake.dps['3'] = 25 # Changed from elsewhere
+
+        bulb.cache.clock.now = 2
+
+        assert bulb.state()['brightness'] == 100 # Stale
+
+        for _ in range(500):
+            if bulb.cache.value['dps']['3'] == 25:
+                break
+
+            time.sleep(0.01)
+
+        assert bulb.state()['brightness'] != 100 # Revalidated, and fresh again
+        assert reads(fake) == 2
+
+    assert (bulb.cache.hits, bulb.cache.stale_hits, bulb.cache.misses) == (1, 1, 1)
+
+def test_write_discards_a_read_from_before_it():
+    with FakeBulb() as fake:
+        bulb = cached_bulb(fake, cache_ttl=10)
+
+        before = bulb.status()
+        generation = bulb.cache.generation
+
+        bulb.turn_off()
+
+        assert bulb.cache.generation > generation
+        assert not bulb.cache.set(before, generation) # Would undo the write
+
+        assert not bulb.state()['on']
+        assert reads(fake) == 1
@@ -0,0 +1,56 @@
+"""
+Tests for expower.Transaction, counting the frames a <FakeBulb> receives
+"""
+
+from .fakes import FakeBulb, DEVICE_ID, LOCAL_KEY
+from expower import codec
+import asyncio
+import expower
+import pytest
+
+SET_COMMAND = 0x07
+
+def test_writes_are_merged_into_one_set():
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        with bulb.transaction() as transaction:
+            transaction.turn_off().set_colour(255, 0, 0)
+            transaction.set_brightness(50)
+
+        assert transaction.result is not None
+        assert fake.commands().count(SET_COMMAND) == 1
+
+        assert not fake.dps['1']
+        assert fake.dps['5'] == codec.encode_colour(255, 0, 0)
+
+        assert bulb.state()['brightness'] == 50
+
+def test_raising_discards_the_writes():
+    with FakeBulb() as fake:
+        bulb = expower.BulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY)
+        bulb.port = fake.port
+
+        with pytest.raises(RuntimeError):
+            with bulb.transaction() as transaction:
+                transaction.turn_off()
+
+                raise RuntimeError('changed my mind')
+
+        assert SET_COMMAND not in fake.commands()
+        assert fake.dps['1']
+
+def test_async_transaction_sends_one_set():
+    async def main(fake):
+        async with expower.AsyncBulbDevice(DEVICE_ID, '127.0.0.1', LOCAL_KEY) as bulb:
+            bulb.port = fake.port
+
+            async with bulb.transaction() as transaction:
+                transaction.turn_off().set_brightness(50)
+
+    with FakeBulb() as fake:
+        asyncio.run(asyncio.wait_for(main(fake), 10))
+
+        assert fake.commands().count(SET_COMMAND) == 1
+        assert not fake.dps['1']